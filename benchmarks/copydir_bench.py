@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Compare common_utils.CopyDir against the tar pipe it replaced, on a
+# synthetic tree resembling an SDT directory (many small dtsi/headers and
+# a few large pdi/bit files).
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(
+    os.path.realpath(__file__))), 'lib'))
+import common_utils
+
+
+def CreateTree(rootdir, small_files, large_files, large_size):
+    for index in range(small_files):
+        subdir = os.path.join(rootdir, 'include', 'dir%s' % (index % 32))
+        common_utils.CreateDir(subdir)
+        with open(os.path.join(subdir, 'file%s.dtsi' % index), 'w') as file_f:
+            file_f.write('/* %s */\n' % index * 64)
+    chunk = os.urandom(1024 * 1024)
+    for index in range(large_files):
+        with open(os.path.join(rootdir, 'design%s.pdi' % index), 'wb') as file_f:
+            for _ in range(large_size):
+                file_f.write(chunk)
+
+
+def TarCopy(indir, outdir, exclude=''):
+    common_utils.CreateDir(outdir)
+    copycmd = "tar --xattrs --xattrs-include='*' --exclude='%s' \
+            -cf - -S -C %s -p . | tar --xattrs --xattrs-include='*' \
+            -xf - -C %s" % (exclude, indir, outdir)
+    subprocess.check_call(copycmd, shell=True, executable='/bin/bash')
+
+
+def TimeCopy(name, func, indir, workdir, runs):
+    timings = []
+    for run in range(runs):
+        outdir = os.path.join(workdir, '%s-%s' % (name, run))
+        start = time.perf_counter()
+        func(indir, outdir)
+        timings.append(time.perf_counter() - start)
+        common_utils.RemoveDir(outdir)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CopyDir vs tar pipe benchmark')
+    parser.add_argument('--small-files', type=int, default=5000)
+    parser.add_argument('--large-files', type=int, default=2)
+    parser.add_argument('--large-size', type=int, default=64, help='Size of large files in MB')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--workdir', help='Directory to run in (defaults to a temporary directory)')
+    parser.add_argument('--json', help='Write the results to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        indir = os.path.join(workdir, 'src')
+        CreateTree(indir, args.small_files, args.large_files, args.large_size)
+
+        results = {
+            'tar': TimeCopy('tar', TarCopy, indir, workdir, args.runs),
+            'copydir': TimeCopy('copydir', common_utils.CopyDir, indir, workdir, args.runs),
+            'copydir-link': TimeCopy('link', lambda i, o: common_utils.CopyDir(
+                                            i, o, hardlink=True), indir, workdir, args.runs),
+        }
+
+    for name, seconds in results.items():
+        print('%-16s %8.3fs  (%.1fx)' % (name, seconds, results['tar'] / seconds))
+    if args.json:
+        with open(args.json, 'w') as json_f:
+            json.dump(results, json_f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Synthetic hardware descriptions and stub tools for the offline
+# benchmarks, no Vivado, bitbake or network is needed.
+
+import os
+import re
+import stat
+import yaml
+
+# Processor and ip names used for each soc family, they match the
+# entries of gen-machine-scripts/data/ipinfo.yaml
+SocFamilies = {
+    'zynqmp': {
+        'proc': 'psu_cortexa53', 'arch': 'aarch64', 'device_id': 'xczu9eg',
+        'memory': ('psu_ddr', 0x0, 0x7fffffff),
+        'serial': 'psu_uart', 'ethernet': 'psu_ethernet',
+        'flash': 'psu_qspi', 'sd': 'psu_sd',
+    },
+    'zynq': {
+        'proc': 'ps7_cortexa9', 'arch': 'arm', 'device_id': '7z020',
+        'memory': ('ps7_ddr', 0x100000, 0x3fffffff),
+        'serial': 'ps7_uart', 'ethernet': 'ps7_ethernet',
+        'flash': 'ps7_qspi', 'sd': 'ps7_sdio',
+    },
+    'versal': {
+        'proc': 'psv_cortexa72', 'arch': 'aarch64', 'device_id': 'xcvc1902',
+        'memory': ('axi_noc', 0x0, 0x7fffffff),
+        'serial': 'psv_sbsauart', 'ethernet': 'psv_ethernet',
+        'flash': 'psv_pmc_qspi', 'sd': None,
+    },
+    'microblaze': {
+        'proc': 'microblaze', 'arch': 'microblaze', 'device_id': '7k325t',
+        'memory': ('mig_7series', 0x80000000, 0xbfffffff),
+        'serial': 'axi_uartlite', 'ethernet': 'axi_ethernet',
+        'flash': 'axi_quad_spi', 'sd': None,
+    },
+}
+
+# Canned lopper outputs, see lop-machine-name.dts and lop-xilinx-id-cpus.dts
+LopperMachineName = 'zynqmp-zcu102-rev1.0 xczu9eg ZynqMP ZCU102 Rev1.0'
+LopperCpus = '''\
+arm,cortex-a53 0 0xf0000000 psu_cortexa53_0 linux
+arm,cortex-a53 1 0xf0000000 psu_cortexa53_1 linux
+arm,cortex-r5 0 0xf0000001 psu_cortexr5_0 baremetal
+arm,cortex-r5 1 0xf0000001 psu_cortexr5_1 baremetal
+pmu-microblaze 0 None psu_pmu_0 baremetal
+'''
+
+
+def CheckCpuInfo(cpu_info):
+    '''The cpu list parsed from the stub lopper output has every LopperCpus
+    entry, otherwise the multiconfig stages time a no-op'''
+    if len(cpu_info) != len(LopperCpus.splitlines()):
+        raise Exception('Parsed %s cpus from the stub lopper, expected %s' % (
+            len(cpu_info), len(LopperCpus.splitlines())))
+    return cpu_info
+
+
+def GenSysHwData(soc_family, processors=1, slaves=5):
+    '''plnx_syshw_data/petalinux_config.yaml contents with the given number
+    of processors and of each serial, ethernet, memory, flash and sd slave'''
+    soc = SocFamilies[soc_family]
+    procdata = {}
+    for proc_index in range(processors):
+        slavesdict = {}
+        memory, baseaddr, highaddr = soc['memory']
+        for index in range(slaves):
+            slavesdict['%s_%s' % (memory, index)] = {
+                'device_type': 'memory', 'ip_name': memory,
+                'baseaddr': hex(baseaddr + index * 0x100000000),
+                'highaddr': hex(highaddr + index * 0x100000000)}
+            for devindex, devtype in enumerate(['serial', 'ethernet', 'flash', 'sd']):
+                if soc[devtype]:
+                    slavesdict['%s_%s' % (soc[devtype], index)] = {
+                        'device_type': devtype, 'ip_name': soc[devtype],
+                        'baseaddr': hex(0xff000000 + devindex * 0x100000 + index * 0x10000)}
+            # Slaves without a supported device type are skipped by
+            # the Kconfig generation, but still parsed
+            slavesdict['axi_gpio_%s' % index] = {'ip_name': 'axi_gpio'}
+        procdata['%s_%s' % (soc['proc'], proc_index)] = {
+            'arch': soc['arch'], 'ip_name': soc['proc'], 'slaves': slavesdict}
+    return {'device_id': soc['device_id'], 'processor': procdata}
+
+
+def WriteSysHwData(filename, soc_family, processors=1, slaves=5):
+    with open(filename, 'w') as file_f:
+        yaml.safe_dump(GenSysHwData(soc_family, processors, slaves), file_f)
+    return filename
+
+
+def GenSystemConfig(template_cfgfile, soc_family, machine='bench'):
+    '''A system config selecting the first synthetic ip of each device
+    type, the stub conf does not resolve the Kconfig defaults'''
+    soc = SocFamilies[soc_family]
+    memory, baseaddr, highaddr = soc['memory']
+    config = ''
+    # Drop the device selections of the template design
+    with open(template_cfgfile, 'r') as file_f:
+        for line in file_f:
+            if not re.match(r'^(# )?CONFIG_SUBSYSTEM_([A-Z-]+_)?(PROCESSOR|SERIAL|'
+                            'ETHERNET|FLASH|PRIMARY_SD|MEMORY)_', line):
+                config += line
+    config += '\n# Synthetic benchmark settings\n'
+    config += 'CONFIG_SUBSYSTEM_PROCESSOR_%s_0_SELECT=y\n' % soc['proc']
+    config += 'CONFIG_SUBSYSTEM_ARCH_%s=y\n' % soc['arch'].upper()
+    config += 'CONFIG_SUBSYSTEM_PROCESSOR0_IP_NAME="%s_0"\n' % soc['proc']
+    config += 'CONFIG_SUBSYSTEM_MEMORY_%s_0_SELECT=y\n' % memory.upper()
+    config += 'CONFIG_SUBSYSTEM_MEMORY_%s_0_BASEADDR=%s\n' % (memory.upper(), hex(baseaddr))
+    config += 'CONFIG_SUBSYSTEM_MEMORY_%s_0_SIZE=%s\n' % (
+        memory.upper(), hex(highaddr - baseaddr + 1))
+    config += 'CONFIG_SUBSYSTEM_MEMORY_%s_0_U__BOOT_TEXTBASE_OFFSET=%s\n' % (
+        memory.upper(), hex(baseaddr + 0x100000))
+    config += 'CONFIG_SUBSYSTEM_MEMORY_IP_NAME="%s_0"\n' % memory
+    config += 'CONFIG_SUBSYSTEM_SERIAL_%s_0_SELECT=y\n' % soc['serial'].upper()
+    config += 'CONFIG_SUBSYSTEM_SERIAL_%s_0_BAUDRATE_115200=y\n' % soc['serial'].upper()
+    config += 'CONFIG_SUBSYSTEM_SERIAL_IP_NAME="%s_0"\n' % soc['serial']
+    for comp in ['FSBOOT', 'FSBL', 'PMUFW', 'PLM', 'TF-A']:
+        config += 'CONFIG_SUBSYSTEM_%s_SERIAL_%s_0_SELECT=y\n' % (comp, soc['serial'].upper())
+        config += 'CONFIG_SUBSYSTEM_SERIAL_%s_IP_NAME="%s_0"\n' % (comp, soc['serial'])
+    config += 'CONFIG_SUBSYSTEM_ETHERNET_%s_0_SELECT=y\n' % soc['ethernet'].upper()
+    config += 'CONFIG_SUBSYSTEM_ETHERNET_%s_0_USE_DHCP=y\n' % soc['ethernet'].upper()
+    config += 'CONFIG_SUBSYSTEM_FLASH_%s_0_SELECT=y\n' % soc['flash'].upper()
+    config += 'CONFIG_SUBSYSTEM_FLASH_IP_NAME="%s_0"\n' % soc['flash']
+    for index, (name, size) in enumerate([('boot', '0x1e00000'), ('bootenv', '0x40000'),
+                                          ('kernel', '0x1600000')]):
+        config += 'CONFIG_SUBSYSTEM_FLASH_%s_0_PART%s_NAME="%s"\n' % (
+            soc['flash'].upper(), index, name)
+        config += 'CONFIG_SUBSYSTEM_FLASH_%s_0_PART%s_SIZE=%s\n' % (
+            soc['flash'].upper(), index, size)
+    if soc['sd']:
+        config += 'CONFIG_SUBSYSTEM_PRIMARY_SD_%s_0_SELECT=y\n' % soc['sd'].upper()
+    config += 'CONFIG_SUBSYSTEM_BOOTARGS_AUTO=y\n'
+    config += 'CONFIG_YOCTO_MACHINE_NAME="%s"\n' % machine
+    return config
+
+
+def GenRootfsConfig(template_rfsfile):
+    '''The rootfs config template with the Kconfig choice defaults the
+    stub conf does not resolve'''
+    with open(template_rfsfile, 'r') as file_f:
+        config = file_f.read()
+    config += '\n# Synthetic benchmark settings\n'
+    config += 'CONFIG_Init-manager-systemd=y\n'
+    return config
+
+
+StubTools = {
+    # lopper prints the canned machine name/cpu list for the lop files
+    'lopper': '''#!/bin/sh
+case "$*" in
+    *lop-machine-name*) echo "%s" ;;
+    *lop-xilinx-id-cpus*) cat <<'EOF'
+%sEOF
+    ;;
+esac
+exit 0
+''' % (LopperMachineName, LopperCpus),
+    # xsct only answers get_soc_info, the other commands write nothing
+    'xsct': '''#!/bin/sh
+case "$*" in
+    *get_soc_info*) echo '{"proc_name": "psu_cortexa53"}' ;;
+esac
+exit 0
+''',
+    # conf/mconf keep the config as it is, without reading the piped answers
+    'conf': '#!/bin/sh\nexit 0\n',
+    'mconf': '#!/bin/sh\nexit 0\n',
+}
+
+
+def MakeStubTools(bindir):
+    '''Write the fake lopper, xsct, conf and mconf executables to bindir,
+    with the lops and embeddedsw directories lopper is checked for'''
+    os.makedirs(bindir, exist_ok=True)
+    prefix = os.path.dirname(bindir)
+    os.makedirs(os.path.join(prefix, 'lib', 'python3', 'site-packages', 'lopper', 'lops'),
+                exist_ok=True)
+    os.makedirs(os.path.join(prefix, 'share', 'embeddedsw'), exist_ok=True)
+    for tool, script in StubTools.items():
+        tool_path = os.path.join(bindir, tool)
+        with open(tool_path, 'w') as tool_f:
+            tool_f.write(script)
+        os.chmod(tool_path, os.stat(tool_path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return bindir
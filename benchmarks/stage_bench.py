@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Time the pure-Python generation stages on synthetic hardware
+# descriptions, using stub lopper/xsct/conf tools. Results are written
+# as json and can be compared against a previous run:
+#
+#   benchmarks/stage_bench.py --json new.json --compare baseline.json
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+scripts_path = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.append(os.path.join(scripts_path, 'lib'))
+sys.path.append(os.path.dirname(os.path.realpath(__file__)))
+import common_utils
+import fixtures
+import kconfig_syshw
+import multiconfigs
+import plnx_machine
+import post_process_config
+import project_config
+import rootfs_config
+import yocto_machine
+
+logger = logging.getLogger('Gen-Machineconf')
+
+
+class Workspace:
+    '''A fresh output/build directory for one run of a stage'''
+
+    def __init__(self, topdir, opts, index):
+        self.output = os.path.join(topdir, 'run%s' % index, 'output')
+        self.config_dir = os.path.join(topdir, 'run%s' % index, 'conf')
+        common_utils.CreateDir(self.output)
+        common_utils.CreateDir(self.config_dir)
+        genmachine_scripts = project_config.GenMachineScriptsPath()
+        self.ipinfo_file = os.path.join(genmachine_scripts, 'data', 'ipinfo.yaml')
+        self.plnx_syshw_file = fixtures.WriteSysHwData(
+            os.path.join(self.output, 'plnx_syshw_data'),
+            opts.soc_family, opts.processors, opts.slaves)
+        self.system_conffile = os.path.join(self.output, 'config')
+        with open(self.system_conffile, 'w') as config_f:
+            config_f.write(fixtures.GenSystemConfig(
+                os.path.join(genmachine_scripts, 'configs',
+                             'config_%s' % opts.soc_family), opts.soc_family))
+        with open(os.path.join(self.output, 'rootfs_config'), 'w') as config_f:
+            config_f.write(fixtures.GenRootfsConfig(
+                os.path.join(genmachine_scripts, 'rootfsconfigs',
+                             'rootfsconfig_%s' % opts.soc_family)))
+        self.hw_file = os.path.join(self.output, 'bench.xsa')
+        with open(self.hw_file, 'w') as hw_f:
+            hw_f.write('synthetic\n')
+        self.args = argparse.Namespace(
+            output=self.output, config_dir=self.config_dir,
+            soc_family=opts.soc_family, soc_variant='', machine='bench',
+            hw_file=self.hw_file, hw_flow='xsct', petalinux=True,
+            add_rootfsconfig=None, menuconfig=None, multiconfigfull=True,
+            localconf=None, xsct_tool=None, s_dir='', src_uri='file://%s' % self.hw_file,
+            sha256sum=None, pl=None, psu_init_path=None, gen_pl_overlay=None,
+            domain_file=None, debug=False)
+        self.args.bbconf_dir = os.path.join(self.config_dir, 'machine', 'include', 'bench')
+        for dirpath in [os.path.join(self.config_dir, 'multiconfig'), self.args.bbconf_dir]:
+            common_utils.CreateDir(dirpath)
+
+
+def StageKconfigSysHW(ws):
+    kconfig_syshw.GenKconfigSysHW(ws.plnx_syshw_file, ws.ipinfo_file,
+                                  os.path.join(ws.output, 'Kconfig.syshw'))
+
+
+def StagePostProcess(ws):
+    post_process_config.PostProcessSysConf(ws.args, ws.system_conffile,
+                                           ws.ipinfo_file, ws.plnx_syshw_file)
+
+
+def GetCpuInfo(ws):
+    sdt_flow = LoadPlugin('sdt_flow')
+    return fixtures.CheckCpuInfo(sdt_flow.CpuInfoToDict(sdt_flow.RunLopperUsingDomainFile(
+        ['lop-xilinx-id-cpus.dts'], ws.output, ws.output, ws.hw_file, '', stream=True)))
+
+
+def StageLopperCpus(ws):
+    GetCpuInfo(ws)
+
+
+def SetupMultiConfigs(ws):
+    mcparser = multiconfigs.ParseMultiConfigFiles(ws.args, GetCpuInfo(ws))
+    bbmctargets, _ = mcparser.ParseCpuDict()
+    with open(ws.system_conffile, 'a') as config_f:
+        for target in bbmctargets:
+            config_f.write('CONFIG_YOCTO_BBMC_%s=y\n' % target.upper().replace('-', '_'))
+    ws.multi_conf_map = mcparser.MultiConfMap
+
+
+def StageMultiConfigs(ws):
+    ws.MultiConfDict = multiconfigs.GenerateMultiConfigFiles(
+        ws.args, ws.multi_conf_map, system_conffile=ws.system_conffile).GenerateMultiConfigs()
+
+
+def StageYoctoMachine(ws):
+    ws.machine_conf_file = yocto_machine.GenerateYoctoMachine(
+        ws.args, ws.system_conffile, ws.plnx_syshw_file, getattr(ws, 'MultiConfDict', {}))
+
+
+def SetupPlnxConfig(ws):
+    StageRootfsKconfig(ws)
+    SetupMultiConfigs(ws)
+    StageMultiConfigs(ws)
+    StageYoctoMachine(ws)
+
+
+def StagePlnxConfig(ws):
+    plnx_machine.GeneratePlnxConfig(ws.args, ws.machine_conf_file)
+
+
+def StageKernelCfg(ws):
+    plnx_machine.system_conffile = ws.system_conffile
+    plnx_machine.GenerateKernelCfg(ws.args)
+
+
+def StageRootfsKconfig(ws):
+    rootfs_config.GenRootfsConfig(ws.args, ws.system_conffile)
+
+
+# name: (setup, stage), the setup is not timed
+Stages = {
+    'GenKconfigSysHW': (None, StageKconfigSysHW),
+    'PostProcessSysConf': (None, StagePostProcess),
+    'LopperCpuList': (None, StageLopperCpus),
+    'MultiConfigs': (SetupMultiConfigs, StageMultiConfigs),
+    'GenerateYoctoMachine': (SetupMultiConfigs, lambda ws: (StageMultiConfigs(ws), StageYoctoMachine(ws))),
+    'GeneratePlnxConfig': (SetupPlnxConfig, StagePlnxConfig),
+    'GenerateKernelCfg': (None, StageKernelCfg),
+    'RootfsKconfig': (None, StageRootfsKconfig),
+}
+
+Plugins = {}
+
+
+def LoadPlugin(name):
+    if name not in Plugins:
+        plugins = []
+        common_utils.load_plugins(plugins, os.path.join(scripts_path, 'lib', 'gen-machineconf'))
+        for plugin in plugins:
+            Plugins[plugin.__name__] = plugin
+    return Plugins[name]
+
+
+def RunStage(name, opts, topdir):
+    setup, stage = Stages[name]
+    timings = []
+    for index in range(opts.runs):
+        ws = Workspace(os.path.join(topdir, name), opts, index)
+        if setup:
+            setup(ws)
+        start = time.perf_counter()
+        stage(ws)
+        timings.append(time.perf_counter() - start)
+    shutil.rmtree(os.path.join(topdir, name), ignore_errors=True)
+    return {'min': min(timings), 'median': statistics.median(timings), 'runs': timings}
+
+
+def Compare(results, baseline_file, threshold):
+    '''Print the ratio against the baseline, True if any stage regressed'''
+    with open(baseline_file, 'r') as baseline_f:
+        baseline = json.load(baseline_f)['stages']
+    regressed = False
+    print('\n%-24s %10s %10s %8s' % ('Stage', 'Baseline', 'Current', 'Ratio'))
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['min'] / baseline[name]['min'] if baseline[name]['min'] else 1.0
+        flag = ''
+        if ratio > threshold:
+            flag = '  REGRESSION'
+            regressed = True
+        print('%-24s %10.4f %10.4f %7.2fx%s' % (name, baseline[name]['min'],
+                                                 result['min'], ratio, flag))
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='gen-machine-conf offline stage benchmarks')
+    parser.add_argument('--soc-family', default='zynqmp', choices=sorted(fixtures.SocFamilies))
+    parser.add_argument('--processors', type=int, default=1, help='Number of processors in the design')
+    parser.add_argument('--slaves', type=int, default=8,
+                        help='Number of slaves of each device type per processor')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--stage', action='append', choices=sorted(Stages),
+                        help='Stage to run, can be repeated (default: all)')
+    parser.add_argument('--workdir', help='Directory to run in (defaults to a temporary directory)')
+    parser.add_argument('--json', help='Write the results to this file')
+    parser.add_argument('--compare', metavar='<baseline.json>', help='Compare against a previous --json result')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='Ratio to the baseline reported as a regression (default: 1.25)')
+    opts = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='[%(levelname)s] %(message)s')
+    common_utils.startBitbake(disabled=True)
+    # Never reach out to the network from the mirrors generation
+    os.environ.pop('XILINX_INT_SITE', None)
+
+    results = {}
+    with tempfile.TemporaryDirectory(dir=opts.workdir) as topdir:
+        bindir = fixtures.MakeStubTools(os.path.join(topdir, 'bin'))
+        os.environ['PATH'] = bindir + os.pathsep + os.environ['PATH']
+        for name in opts.stage or Stages:
+            results[name] = RunStage(name, opts, topdir)
+            print('%-24s min %8.4fs  median %8.4fs' % (
+                name, results[name]['min'], results[name]['median']))
+
+    if opts.json:
+        with open(opts.json, 'w') as json_f:
+            json.dump({'meta': {'soc_family': opts.soc_family, 'processors': opts.processors,
+                                'slaves': opts.slaves, 'runs': opts.runs,
+                                'python': platform.python_version()},
+                       'stages': results}, json_f, indent=2)
+    if opts.compare and Compare(results, opts.compare, opts.threshold):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
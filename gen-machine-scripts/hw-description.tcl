@@ -551,6 +551,7 @@ proc plnx_gen_conf_flash {mapping cpuname cpuslaves} {
 				set bank_baseaddr_property [lindex [get_ip_property_info bank_baseaddr ${bankinfo}] 0]
 				set bank_highaddr_property [lindex [get_ip_property_info bank_highaddr ${bankinfo}] 0]
 				set bank_type_property [lindex [get_ip_property_info bank_type ${bankinfo}] 0]
+				set bank_width_property [lindex [get_ip_property_info bank_width ${bankinfo}] 0]
 				set bankcount [hsi get_property ${banks_property} ${hd}]
 				for {set i 0} {$i < ${bankcount}} {incr i} {
 					set idmap [list "${bankidreplacement}" ${i}]
@@ -565,6 +566,13 @@ proc plnx_gen_conf_flash {mapping cpuname cpuslaves} {
 					set bankbaseaddr [hsi get_property ${basestrmap} ${hd}]
 					set bankhighaddr [hsi get_property ${highstrmap} ${hd}]
 					set flashnode [list "${name}_bank${i}" [list device_type ${devicetype}] [list ip_name ${ipname}] [list baseaddr ${bankbaseaddr}] [list highaddr ${bankhighaddr}]]
+					# Bank width for the flash info, see GetFlashInfo
+					if {"${bank_width_property}" != ""} {
+						set bankwidth [hsi get_property [string map ${idmap} "${bank_width_property}"] ${hd}]
+						if {"${bankwidth}" != ""} {
+							lappend flashnode [list bank_width ${bankwidth}]
+						}
+					}
 					lappend retflashs ${flashnode}
 				}
 			} elseif {"${flash_type}" == "spi"} {
@@ -599,6 +607,9 @@ proc plnx_gen_conf_flash {mapping cpuname cpuslaves} {
 proc get_ipinfo {args} {
 	global scripts_path
 	set ipinfofile "${scripts_path}/data/ipinfo.yaml"
+	if { [catch {plnx_precompiled_data "${ipinfofile}" list} ip_list] == 0 } {
+		return "${ip_list}"
+	}
 	if { [catch {open "${ipinfofile}" r} ipinfof] } {
 		error "Failed to open IP information file ${ipinfofile}."
 	}
@@ -0,0 +1,27 @@
+# Copyright (C) 2026, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Load the data gen-machineconf precompiled from a yaml file (see
+# lib/tcl_data.py), instead of parsing the yaml line by line.
+# The kind is the parser the data replaces: list (hw-description.tcl
+# get_ipinfo), dict (petalinux_hsm.tcl get_ipinfo) or simple
+# (simple_yaml_parser). Errors out when no up to date data is found,
+# the callers then parse the yaml.
+proc plnx_precompiled_data {yamlfile kind} {
+	global env
+	if { ![info exists env(GEN_MACHINECONF_TCL_DATA)] } {
+		error "No precompiled data directory"
+	}
+	set datafile [file join $env(GEN_MACHINECONF_TCL_DATA) "[file tail ${yamlfile}].${kind}.tcl"]
+	if { ![file exists ${datafile}] || [file mtime ${yamlfile}] > [file mtime ${datafile}] } {
+		error "No up to date precompiled data for ${yamlfile}"
+	}
+	set plnx_precompiled_file ""
+	set plnx_precompiled_data ""
+	source ${datafile}
+	if { [file normalize ${plnx_precompiled_file}] ne [file normalize ${yamlfile}] } {
+		error "${datafile} is not generated from ${yamlfile}"
+	}
+	return ${plnx_precompiled_data}
+}
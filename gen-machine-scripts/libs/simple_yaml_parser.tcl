@@ -4,6 +4,9 @@
 # SPDX-License-Identifier: MIT
 
 proc simple_yaml_parser {ip_data_file} {
+	if { [catch {plnx_precompiled_data "${ip_data_file}" simple} mapping_dict] == 0 } {
+		return $mapping_dict
+	}
 	set mapping_dict [dict create]
 	set fp [open $ip_data_file r]
 	set file_data [read $fp]
@@ -3,8 +3,13 @@
 #
 # SPDX-License-Identifier: MIT
 
+source [file join [file dirname [file normalize [info script]]] libs precompiled_data.tcl]
+
 proc get_ipinfo {ipinfofile} {
 
+	if { [catch {plnx_precompiled_data "${ipinfofile}" dict} ipdict] == 0 } {
+		return ${ipdict}
+	}
 	if { [catch {open "${ipinfofile}" r} ipinfof] } {
 		error "Failed to open IP information file ${ipinfofile}."
 	}
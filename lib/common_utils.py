@@ -11,45 +11,145 @@
 import os
 import sys
 import logging
-import importlib
-import importlib.machinery
-import importlib.util
-import glob
-import subprocess
 import shutil
 import re
-import yaml
 import time
+import threading
+import profiler
+import run_report
 
 logger = logging.getLogger('Gen-Machineconf')
 
 # Common bitbake variable
 Bitbake = None
 
+# Help of the built-in subcommands, shared by gen-machine-conf (which lists
+# them without importing their plugins) and the plugins registering them
+SubcommandHelp = {
+    'parse-sdt': 'Parse System devicet-tree file and generate Yocto/PetaLinux configurations.',
+    'parse-xsa': 'Parse xsa file and generate Yocto/PetaLinux configurations.',
+}
+
 # Reference from OE-Core
+def load_plugin(plugins, pluginpath, name):
+    '''Load a single plugin module from pluginpath, unless a plugin with
+    the same name was already loaded'''
+    import importlib.machinery
+    import importlib.util
+    for plugin in plugins:
+        if plugin_name(plugin.__name__) == name:
+            return plugin
+    logger.debug('Loading plugin %s' % name)
+    spec = importlib.machinery.PathFinder.find_spec(
+        name, path=[pluginpath])
+    if not spec:
+        return None
+    plugin = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(plugin)
+    if hasattr(plugin, 'plugin_init'):
+        plugin.plugin_init(plugins)
+    plugins.append(plugin)
+    return plugin
+
+
+def plugin_name(filename):
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
 def load_plugins(plugins, pluginpath):
-    def load_plugin(name):
-        logger.debug('Loading plugin %s' % name)
-        spec = importlib.machinery.PathFinder.find_spec(
-            name, path=[pluginpath])
-        if spec:
-            mod = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(mod)
-            return mod
-
-    def plugin_name(filename):
-        return os.path.splitext(os.path.basename(filename))[0]
-
-    known_plugins = [plugin_name(p.__name__) for p in plugins]
+    import glob
     logger.debug('Loading plugins from %s...' % pluginpath)
     for fn in glob.glob(os.path.join(pluginpath, '*.py')):
         logger.debug(fn)
         name = plugin_name(fn)
-        if name != '__init__' and name not in known_plugins:
-            plugin = load_plugin(name)
-            if hasattr(plugin, 'plugin_init'):
-                plugin.plugin_init(plugins)
-            plugins.append(plugin)
+        if name != '__init__':
+            load_plugin(plugins, pluginpath, name)
+
+
+PluginIndexVersion = 1
+
+
+def ScanPlugin(plugin_file):
+    '''Subcommands a plugin declares in register_commands, read from the
+    source without running it. Plugins with a plugin_init, a syntax error
+    or computed subcommand names are marked to be loaded at startup.'''
+    import ast
+    st = os.stat(plugin_file)
+    entry = {'name': plugin_name(plugin_file), 'path': plugin_file,
+             'mtime': st.st_mtime_ns, 'size': st.st_size,
+             'commands': {}, 'eager': False}
+    try:
+        with open(plugin_file, 'rb') as plugin_f:
+            tree = ast.parse(plugin_f.read(), plugin_file)
+    except (SyntaxError, ValueError):
+        entry['eager'] = True
+        return entry
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef):
+            continue
+        if node.name == 'plugin_init':
+            entry['eager'] = True
+        elif node.name == 'register_commands':
+            for call in ast.walk(node):
+                if not isinstance(call, ast.Call) or \
+                        not isinstance(call.func, ast.Attribute) or \
+                        call.func.attr != 'add_parser':
+                    continue
+                if not call.args or not isinstance(call.args[0], ast.Constant) or \
+                        not isinstance(call.args[0].value, str):
+                    entry['eager'] = True
+                    continue
+                cmd_help = ''
+                for keyword in call.keywords:
+                    if keyword.arg == 'help' and isinstance(keyword.value, ast.Constant):
+                        cmd_help = keyword.value.value
+                entry['commands'][call.args[0].value] = cmd_help
+    return entry
+
+
+def StatPath(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def GetPluginIndex(pluginpaths, cache_file=None):
+    '''Plugins found in pluginpaths with the subcommands they declare, in
+    search order. The index is cached in cache_file and reused while the
+    plugin directories and files keep their mtimes.'''
+    import json
+    dirs = [[pluginpath, StatPath(pluginpath)] for pluginpath in pluginpaths]
+    if cache_file and os.path.isfile(cache_file):
+        try:
+            with open(cache_file, 'r') as cache_f:
+                index = json.load(cache_f)
+            if index.get('version') == PluginIndexVersion and index.get('dirs') == dirs and \
+                    all(StatPath(entry['path']) == entry['mtime'] for entry in index['plugins']):
+                run_report.Count('cache_hits')
+                return index['plugins']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    import glob
+    plugins = []
+    for pluginpath, mtime in dirs:
+        if mtime is None:
+            continue
+        for plugin_file in sorted(glob.glob(os.path.join(pluginpath, '*.py'))):
+            if plugin_name(plugin_file) != '__init__':
+                plugins.append(ScanPlugin(plugin_file))
+    logger.debug('Indexed %s plugins from %s directories' % (len(plugins), len(dirs)))
+    if cache_file:
+        try:
+            CreateDir(os.path.dirname(cache_file))
+            tmp_file = '%s.%s' % (cache_file, os.getpid())
+            with open(tmp_file, 'w') as cache_f:
+                json.dump({'version': PluginIndexVersion, 'dirs': dirs,
+                           'plugins': plugins}, cache_f)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            logger.debug('Unable to write the plugin index %s: %s' % (cache_file, e))
+    return plugins
 
 
 def CreateDir(dirpath):
@@ -92,17 +192,204 @@ def RemoveFile(filepath):
         os.remove(filepath)
 
 
-def CopyDir(indir, outdir, exclude=''):
+def CopyDir(indir, outdir, exclude='', hardlink=False):
     '''Copy Directory to Directory
-    Using tar command to copy dirs which is twice
-    faster than shutil.copytree and support exclude option'''
+    Files are independent copies, reflinked or copied in the kernel where
+    possible, see LinkOrCopyFile. Callers may ask for hardlinks when
+    nothing rewrites the copied files. Supports the tar style exclude
+    option.'''
     if os.path.exists(indir):
         if not os.path.exists(outdir):
             CreateDir(outdir)
-        copycmd = "tar --xattrs --xattrs-include='*' --exclude='%s' \
-                -cf - -S -C %s -p . | tar --xattrs --xattrs-include='*' \
-                -xf - -C %s" % (exclude, indir, outdir)
-        RunCmd(copycmd, os.getcwd(), shell=True)
+        CopyTree(indir, outdir, exclude=exclude, hardlink=hardlink)
+
+
+# linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+# Copy methods known not to work between two devices, {(src_dev, dst_dev): set()}
+CopyUnsupported = {}
+
+
+def ReflinkFile(infile, outfile):
+    '''Clone infile to outfile sharing the data blocks (btrfs, xfs, ...),
+    returns False if the filesystem does not support it'''
+    with open(infile, 'rb') as in_f, open(outfile, 'wb') as out_f:
+        if ReflinkFd(in_f, out_f):
+            return True
+    RemoveFile(outfile)
+    return False
+
+
+def ReflinkFd(in_f, out_f):
+    import fcntl
+    try:
+        fcntl.ioctl(out_f.fileno(), FICLONE, in_f.fileno())
+    except OSError:
+        return False
+    return True
+
+
+def CopyFileData(infile, outfile, methods=None):
+    '''Copy the file contents with a reflink, copy_file_range or sendfile
+    so the data does not go through user space, falling back to a buffered
+    copy. Returns the set of methods which failed.'''
+    unsupported = set()
+    with open(infile, 'rb') as in_f, open(outfile, 'wb') as out_f:
+        size = os.fstat(in_f.fileno()).st_size
+        for method in methods or ['reflink', 'copy_file_range', 'sendfile']:
+            if method == 'reflink':
+                if ReflinkFd(in_f, out_f):
+                    return unsupported
+                unsupported.add(method)
+                continue
+            if not hasattr(os, method):
+                continue
+            offset = 0
+            try:
+                while offset < size:
+                    if method == 'sendfile':
+                        copied = os.sendfile(out_f.fileno(), in_f.fileno(), offset, size - offset)
+                    else:
+                        copied = os.copy_file_range(in_f.fileno(), out_f.fileno(),
+                                                    size - offset, offset, offset)
+                    if not copied:
+                        break
+                    offset += copied
+            except OSError:
+                unsupported.add(method)
+                offset = -1
+            if offset >= size:
+                return unsupported
+            # Not supported for this pair of files, start over
+            out_f.seek(0)
+            out_f.truncate()
+        in_f.seek(0)
+        shutil.copyfileobj(in_f, out_f, 1024 * 1024)
+    return unsupported
+
+
+def LinkOrCopyFile(infile, outfile, hardlink=False):
+    '''Copy infile to outfile with a reflink, a kernel copy or a buffered
+    copy. Permissions, times and xattrs are preserved. With hardlink, infile
+    is hardlinked first, only use it for files nothing rewrites in place.'''
+    # Never write through an existing link to the source
+    if os.path.lexists(outfile):
+        os.unlink(outfile)
+    devices = (os.stat(infile).st_dev, os.stat(os.path.dirname(outfile) or '.').st_dev)
+    unsupported = CopyUnsupported.setdefault(devices, set())
+    if hardlink and 'link' not in unsupported:
+        try:
+            os.link(infile, outfile)
+            return
+        except OSError:
+            unsupported.add('link')
+    methods = [method for method in ['reflink', 'copy_file_range', 'sendfile']
+                    if method not in unsupported]
+    unsupported.update(CopyFileData(infile, outfile, methods))
+    # copystat also copies the extended attributes on Linux
+    shutil.copystat(infile, outfile)
+
+
+def IsExcluded(relpath, exclude):
+    '''tar --exclude semantics, the pattern may match any trailing
+    part of the path'''
+    import fnmatch
+    if not exclude:
+        return False
+    parts = relpath.split(os.path.sep)
+    for index in range(len(parts)):
+        if fnmatch.fnmatch(os.path.sep.join(parts[index:]), exclude):
+            return True
+    return False
+
+
+def CopyTree(indir, outdir, jobs=None, exclude='', hardlink=False):
+    '''Mirror indir into outdir using LinkOrCopyFile for every file,
+    files are copied in parallel'''
+    import concurrent.futures
+    CreateDir(outdir)
+    dirs = []
+    jobs = jobs or os.cpu_count() or 1
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = []
+        for root, subdirs, files in os.walk(indir):
+            relroot = os.path.relpath(root, indir)
+            destroot = os.path.join(outdir, relroot)
+            for subdir in list(subdirs):
+                srcdir = os.path.join(root, subdir)
+                destdir = os.path.join(destroot, subdir)
+                if IsExcluded(os.path.normpath(os.path.join(relroot, subdir)), exclude):
+                    subdirs.remove(subdir)
+                    continue
+                if os.path.islink(srcdir):
+                    files.append(subdir)
+                    continue
+                CreateDir(destdir)
+                dirs.append((srcdir, destdir))
+            for _file in files:
+                if IsExcluded(os.path.normpath(os.path.join(relroot, _file)), exclude):
+                    continue
+                srcfile = os.path.join(root, _file)
+                destfile = os.path.join(destroot, _file)
+                if os.path.islink(srcfile):
+                    if os.path.lexists(destfile):
+                        os.unlink(destfile)
+                    os.symlink(os.readlink(srcfile), destfile)
+                    continue
+                if jobs == 1:
+                    LinkOrCopyFile(srcfile, destfile, hardlink)
+                else:
+                    futures.append(executor.submit(LinkOrCopyFile, srcfile, destfile, hardlink))
+        for future in concurrent.futures.as_completed(futures):
+            future.result()
+    # Directory times change while populating them, restore them last
+    for srcdir, destdir in reversed(dirs):
+        shutil.copystat(srcdir, destdir)
+    shutil.copystat(indir, outdir)
+
+
+def GetPathChecksum(path):
+    '''sha256 of a file, or of the name, size and mtime of every file
+    in a directory. Used to detect an unchanged hw-description input.'''
+    if os.path.isfile(path):
+        return GetFileHashValue(path)
+    import hashlib
+    method = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for _file in sorted(files):
+            filepath = os.path.join(root, _file)
+            try:
+                st = os.lstat(filepath)
+            except OSError:
+                continue
+            method.update(('%s:%s:%s\n' % (os.path.relpath(filepath, path),
+                                           st.st_size, st.st_mtime_ns)).encode())
+    return method.hexdigest()
+
+
+def UnpackStampFile(target):
+    '''Stamp file recording which input has been unpacked/copied to target'''
+    return os.path.join(os.path.dirname(target.rstrip(os.path.sep)),
+                        '.%s.unpack' % os.path.basename(target.rstrip(os.path.sep)))
+
+
+def CheckUnpackStamp(target, checksum):
+    '''Return True if target still holds the unpacked input with checksum'''
+    stamp_file = UnpackStampFile(target)
+    if not checksum or not os.path.exists(target) or not os.path.isfile(stamp_file):
+        return False
+    with open(stamp_file, 'r') as stamp_f:
+        if stamp_f.read().strip() != checksum:
+            return False
+    run_report.Count('cache_hits')
+    return True
+
+
+def WriteUnpackStamp(target, checksum):
+    with open(UnpackStampFile(target), 'w') as stamp_f:
+        stamp_f.write(checksum + '\n')
 
 
 def CopyFile(infile, dest, follow_symlinks=False):
@@ -111,39 +398,164 @@ def CopyFile(infile, dest, follow_symlinks=False):
         shutil.copy2(infile, dest, follow_symlinks=follow_symlinks)
 
 
-def RunCmd(command, out_dir, extraenv=None,
-           failed_msg='', shell=False, checkcall=False):
-    '''Run Shell commands from python'''
+# Number of stdout/stderr lines kept for the error message of a failed command
+CmdTailLines = 200
+
+
+def ToolName(command):
+    '''Name of the tool run by a command, skipping environment assignments'''
+    import shlex
+    words = command
+    if isinstance(command, str):
+        try:
+            words = shlex.split(command)
+        except ValueError:
+            words = command.split()
+    for word in words:
+        if not re.match(r'^[A-Za-z_][A-Za-z0-9_]*=', word):
+            return os.path.basename(word)
+    return 'unknown'
+
+# Running commands, {process: thread ident}
+ActiveCmds = {}
+# Threads not allowed to start new commands, see KillCmds
+CancelledThreads = set()
+CmdLock = threading.Lock()
+
+
+def KillCmds(threads):
+    '''Kill the commands run from the given threads and make any further
+    RunCmd call from them fail'''
+    with CmdLock:
+        CancelledThreads.update(threads)
+        for process, thread in ActiveCmds.items():
+            if thread in threads:
+                logger.debug('Killing %s' % process.args)
+                process.kill()
+
+
+def UncancelThreads(threads):
+    with CmdLock:
+        CancelledThreads.difference_update(threads)
+
+
+def RunCmdLines(command, out_dir, extraenv=None,
+                failed_msg='', shell=False, stderr=None):
+    '''Run Shell commands from python and yield the stdout lines as they
+    are produced. Every line is logged as it arrives and only the tail of
+    the output is kept for the error message. stderr lines are appended
+    to the stderr list if one is given.'''
+    import codecs
+    import collections
+    import selectors
     command = command.split() if not shell else command
     logger.debug(command)
     env = os.environ.copy()
     if extraenv:
         for k in extraenv:
             env[k] = extraenv[k]
-    if checkcall:
-        subprocess.check_call(
-            command, env=extraenv, cwd=out_dir, shell=shell)
-        return
-    else:
+    import subprocess
+    start = time.monotonic()
+    with CmdLock:
+        if threading.get_ident() in CancelledThreads:
+            raise Exception('Cancelled before running: %s' % command)
         process = subprocess.Popen(command,
                                    stdout=subprocess.PIPE,
                                    stderr=subprocess.PIPE,
                                    env=env, shell=shell,
                                    executable='/bin/bash',
                                    cwd=out_dir)
-        stdout, stderr = process.communicate()
-        if process.returncode != 0:
-            raise Exception('\n%s\n%s\n%s' %
-                            (stdout.decode('utf-8'),
-                             stderr.decode('utf-8'),
-                             failed_msg))
-        else:
-            if not stdout is None:
-                stdout = stdout.decode("utf-8")
-            if not stderr is None:
-                stderr = stderr.decode("utf-8")
-        logger.debug('\n%s\n%s\n%s' % (stdout, stderr, failed_msg))
-        return stdout, stderr
+        ActiveCmds[process] = threading.get_ident()
+    tails = {process.stdout: collections.deque(maxlen=CmdTailLines),
+             process.stderr: collections.deque(maxlen=CmdTailLines)}
+    decoders = {stream: codecs.getincrementaldecoder('utf-8')('replace')
+                for stream in tails}
+    partial = {stream: '' for stream in tails}
+    output_bytes = 0
+    # Time spent waiting on the tool, reported to the profiler
+    blocked = 0.0
+    selector = selectors.DefaultSelector()
+    try:
+        for stream in tails:
+            selector.register(stream, selectors.EVENT_READ)
+        while selector.get_map():
+            select_start = time.monotonic()
+            events = selector.select()
+            blocked += time.monotonic() - select_start
+            for key, _ in events:
+                stream = key.fileobj
+                data = os.read(stream.fileno(), 65536)
+                text = partial[stream] + decoders[stream].decode(data, final=not data)
+                if data:
+                    lines = text.splitlines(keepends=True)
+                    partial[stream] = lines.pop() if lines and \
+                        not lines[-1].endswith('\n') else ''
+                else:
+                    selector.unregister(stream)
+                    lines = [text] if text else []
+                for line in lines:
+                    logger.debug(line.rstrip('\n'))
+                    tails[stream].append(line)
+                    output_bytes += len(line)
+                    if stream is process.stdout:
+                        yield line
+                    elif stderr is not None:
+                        stderr.append(line)
+        # Wait without reaping, KillCmds must not signal a reused pid
+        select_start = time.monotonic()
+        os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+        blocked += time.monotonic() - select_start
+        with CmdLock:
+            del ActiveCmds[process]
+        _, status, rusage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    finally:
+        selector.close()
+        with CmdLock:
+            ActiveCmds.pop(process, None)
+        # Consumer stopped early or an error occurred
+        if process.returncode is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+    wall = time.monotonic() - start
+    run_report.AddSpan(ToolName(command), 'tool', start, wall,
+                       command=command, pid=process.pid, returncode=process.returncode,
+                       user=rusage.ru_utime, sys=rusage.ru_stime)
+    profiler.AddBlocked(ToolName(command), blocked)
+    run_report.Count('subprocesses')
+    run_report.Count('tool_output_bytes', output_bytes)
+    logger.debug('Command finished in %.2fs (user %.2fs, sys %.2fs)' % (
+        wall, rusage.ru_utime, rusage.ru_stime))
+    if process.returncode != 0:
+        raise Exception('\n%s\n%s\n%s' %
+                        (''.join(tails[process.stdout]),
+                         ''.join(tails[process.stderr]),
+                         failed_msg))
+
+
+def RunCmd(command, out_dir, extraenv=None,
+           failed_msg='', shell=False, checkcall=False, capture=True):
+    '''Run Shell commands from python. The output is streamed to the log,
+    with capture=False only the tail of stdout/stderr is kept and returned
+    so verbose tools do not grow the memory.'''
+    if checkcall:
+        import subprocess
+        command = command.split() if not shell else command
+        logger.debug(command)
+        subprocess.check_call(
+            command, env=extraenv, cwd=out_dir, shell=shell)
+        return
+    if capture:
+        stdout, stderr = [], []
+    else:
+        import collections
+        stdout = collections.deque(maxlen=CmdTailLines)
+        stderr = collections.deque(maxlen=CmdTailLines)
+    stdout.extend(RunCmdLines(command, out_dir, extraenv,
+                              failed_msg, shell, stderr))
+    return ''.join(stdout), ''.join(stderr)
 
 
 # Check mconf utilities
@@ -176,13 +588,115 @@ def AddNativeSysrootPath(native_sysroot):
     logger.debug("PATH=%s" % os.environ["PATH"])
 
 
-def FindNativeSysroot(recipe):
-    '''Based on oe-find-native-sysroot, purpose is to find a recipes sysroot'''
+# Native sysroots found by earlier runs, {recipe: STAGING_DIR_NATIVE}
+NativeSysrootsFile = None
+if os.environ.get('BUILDDIR'):
+    NativeSysrootsFile = os.path.join(os.environ['BUILDDIR'], 'cache',
+                                      'gen-machineconf-sysroots.json')
+
+
+def ReadNativeSysroots():
+    if not NativeSysrootsFile or not os.path.isfile(NativeSysrootsFile):
+        return {}
+    import json
+    try:
+        with open(NativeSysrootsFile, 'r') as sysroots_f:
+            sysroots = json.load(sysroots_f)
+        if isinstance(sysroots, dict):
+            return sysroots
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def WriteNativeSysroots(sysroots):
+    import json
+    try:
+        os.makedirs(os.path.dirname(NativeSysrootsFile), exist_ok=True)
+        tmp_file = '%s.%s' % (NativeSysrootsFile, os.getpid())
+        with open(tmp_file, 'w') as sysroots_f:
+            json.dump(sysroots, sysroots_f)
+        os.replace(tmp_file, NativeSysrootsFile)
+    except Exception as e:
+        logger.debug('Unable to write %s: %s' % (NativeSysrootsFile, e))
+
+
+def SaveNativeSysroot(recipe, recipe_staging_dir):
+    if not NativeSysrootsFile:
+        return
+    sysroots = ReadNativeSysroots()
+    if sysroots.get(recipe) == recipe_staging_dir:
+        return
+    sysroots[recipe] = recipe_staging_dir
+    WriteNativeSysroots(sysroots)
+
+
+def DropNativeSysroot(recipe):
+    if not NativeSysrootsFile:
+        return
+    sysroots = ReadNativeSysroots()
+    if sysroots.pop(recipe, None) is not None:
+        WriteNativeSysroots(sysroots)
+
+
+def ValidNativeSysroot(recipe_staging_dir, tool):
+    '''Any build of the recipe leaves a recipe-sysroot-native, the tool is
+    only there once addto_recipe_sysroot staged it'''
+    return bool(recipe_staging_dir) and \
+        os.path.isfile(os.path.join(recipe_staging_dir, 'usr', 'bin', tool))
+
+
+def GuessNativeSysroot(recipe, tool):
+    '''STAGING_DIR_NATIVE of a recipe with tool staged, without parsing the
+    recipes, either from an earlier run or from the configuration only
+    variables: ${BASE_WORKDIR}/${BUILD_SYS}/<recipe>/<version>/recipe-sysroot-native'''
+    if not tool:
+        return None
+    recipe_staging_dir = ReadNativeSysroots().get(recipe)
+    if ValidNativeSysroot(recipe_staging_dir, tool):
+        logger.debug('Using the cached %s sysroot %s' % (recipe, recipe_staging_dir))
+        return recipe_staging_dir
+    if recipe_staging_dir:
+        logger.debug('No %s in the cached %s sysroot %s' % (tool, recipe, recipe_staging_dir))
+        DropNativeSysroot(recipe)
+
+    try:
+        base_workdir = Bitbake.getVar('BASE_WORKDIR')
+        build_sys = Bitbake.getVar('BUILD_SYS')
+    except Exception:
+        return None
+    if not base_workdir or not build_sys:
+        return None
+    import glob
+    sysroots = [sysroot for sysroot in glob.glob(os.path.join(
+        glob.escape(base_workdir), glob.escape(build_sys), glob.escape(recipe),
+        '*', 'recipe-sysroot-native')) if ValidNativeSysroot(sysroot, tool)]
+    if len(sysroots) != 1:
+        # Older versions may be left in the workdir, the recipe has to be
+        # parsed to know which one is current
+        return None
+    logger.debug('Found the %s sysroot %s' % (recipe, sysroots[0]))
+    return sysroots[0]
+
+
+def FindNativeSysroot(recipe, tool=None):
+    '''Based on oe-find-native-sysroot, purpose is to find a recipes sysroot,
+    with tool staged in it when given'''
     if not recipe:
         return ""
 
     # That has already been done, don't repeat!
-    if recipe in FindNativeSysroot.recipe_list:
+    if recipe in FindNativeSysroot.recipe_list and (not tool or shutil.which(tool)):
+        return
+
+    # Parsing all the recipes only to get the sysroot path takes minutes,
+    # the path is known when the sysroot was already constructed.
+    recipe_staging_dir = GuessNativeSysroot(recipe, tool)
+    if recipe_staging_dir:
+        AddNativeSysrootPath(recipe_staging_dir)
+        SaveNativeSysroot(recipe, recipe_staging_dir)
+        if recipe not in FindNativeSysroot.recipe_list:
+            FindNativeSysroot.recipe_list.append(recipe)
         return
 
     recipe_staging_dir = None
@@ -198,23 +712,74 @@ def FindNativeSysroot(recipe):
     if not recipe_staging_dir:
         raise Exception("Unable to get required %s sysroot path" % recipe)
 
-    if recipe and not os.path.exists(recipe_staging_dir):
+    if tool:
+        staged = ValidNativeSysroot(recipe_staging_dir, tool)
+    else:
+        staged = os.path.exists(recipe_staging_dir)
+    if not staged:
         # Make sure the sysroot is available to us
         logger.info('Constructing %s recipe sysroot...' % recipe)
 
         Bitbake.runBitbakeCmd(recipe, "addto_recipe_sysroot")
 
-        if not recipe_staging_dir:
-            raise Exception("Unable to get %s sysroot path after building" % recipe)
-
     AddNativeSysrootPath(recipe_staging_dir)
+    SaveNativeSysroot(recipe, recipe_staging_dir)
 
-    FindNativeSysroot.recipe_list.append(recipe)
+    if recipe not in FindNativeSysroot.recipe_list:
+        FindNativeSysroot.recipe_list.append(recipe)
 
 # Default
 FindNativeSysroot.recipe_list = []
 
+def KconfigTools(args):
+    '''[(tool, native recipe)] the project configuration runs, mconf only
+    for --menuconfig'''
+    tools = [('conf', 'kconfig-frontends-native')]
+    if getattr(args, 'menuconfig', None):
+        tools.append(('mconf', 'kconfig-frontends-native'))
+    return tools
+
+
+def PreflightNativeSysroots(tools):
+    '''Construct the sysroots of all the missing [(tool, native recipe)]
+    in one bitbake build, rather than one build per check_tool'''
+    missing = []
+    for tool, recipe in tools:
+        if shutil.which(tool):
+            continue
+        recipe_staging_dir = GuessNativeSysroot(recipe, tool)
+        if recipe_staging_dir:
+            AddNativeSysrootPath(recipe_staging_dir)
+            SaveNativeSysroot(recipe, recipe_staging_dir)
+            if recipe not in FindNativeSysroot.recipe_list:
+                FindNativeSysroot.recipe_list.append(recipe)
+            continue
+        missing.append((tool, recipe))
+
+    recipes = []
+    for tool, recipe in missing:
+        if recipe not in recipes:
+            recipes.append(recipe)
+    if not recipes or not Bitbake or Bitbake.disabled:
+        return
+
+    logger.info('Constructing %s recipe sysroots...' % ', '.join(recipes))
+    try:
+        Bitbake.runBitbakeCmd(recipes, 'addto_recipe_sysroot')
+    except Exception as e:
+        # The check_tool of each tool still reports what is missing
+        logger.warning('Unable to construct the %s recipe sysroots: %s' % (', '.join(recipes), e))
+        return
+
+    for tool, recipe in missing:
+        try:
+            FindNativeSysroot(recipe, tool)
+        except Exception as e:
+            logger.debug(e)
+
+
 def RunMenuconfig(Kconfig, cfgfile, ui, out_dir, component):
+    import subprocess
     if not ui:
         logger.info('Silentconfig %s' % (component))
         cmd = 'yes "" | env KCONFIG_CONFIG=%s conf %s' % (cfgfile, Kconfig)
@@ -236,24 +801,29 @@ def RunMenuconfig(Kconfig, cfgfile, ui, out_dir, component):
                 raise Exception
 
 
+# Config files may be updated from the tool scheduler threads
+ConfigLock = threading.RLock()
+
+
 def UpdateConfigValue(macro, value, filename):
-    lines = []
-    if os.path.exists(filename):
-        with open(filename, 'r') as file_data:
-            lines = file_data.readlines()
+    with ConfigLock:
+        lines = []
+        if os.path.exists(filename):
+            with open(filename, 'r') as file_data:
+                lines = file_data.readlines()
+            file_data.close()
+
+        with open(filename, 'w') as file_data:
+            for line in lines:
+                if re.search('# %s is not set' % macro, line) or re.search('%s=' % macro, line):
+                    continue
+                file_data.write(line)
+            if value == 'disable':
+                file_data.write('# %s is not set\n' % macro)
+            else:
+                file_data.write('%s=%s\n' % (macro, value))
         file_data.close()
 
-    with open(filename, 'w') as file_data:
-        for line in lines:
-            if re.search('# %s is not set' % macro, line) or re.search('%s=' % macro, line):
-                continue
-            file_data.write(line)
-        if value == 'disable':
-            file_data.write('# %s is not set\n' % macro)
-        else:
-            file_data.write('%s=%s\n' % (macro, value))
-    file_data.close()
-
 
 def RemoveConfigs(macro, filename):
     # Remove configs from file if given macro match
@@ -272,10 +842,11 @@ def RemoveConfigs(macro, filename):
 
 def GetConfigValue(macro, filename, Type='bool', end_macro='=y'):
     lines = []
-    if os.path.exists(filename):
-        with open(filename, 'r') as file_data:
-            lines = file_data.readlines()
-        file_data.close()
+    with ConfigLock:
+        if os.path.exists(filename):
+            with open(filename, 'r') as file_data:
+                lines = file_data.readlines()
+            file_data.close()
     value = ''
     if Type == 'bool':
         for line in lines:
@@ -315,6 +886,7 @@ def GetFileHashValue(filename):
         except ValueError:
             # You can't mmap() an empty file so silence this exception
             pass
+        run_report.Count('bytes_read', os.fstat(f.fileno()).st_size)
     return method.hexdigest()
 
 
@@ -326,6 +898,7 @@ def ValidateHashFile(output, macro, infile, update=True):
         if update:
             UpdateConfigValue(macro, new_hashvalue, statistics_file)
         return False
+    run_report.Count('cache_hits')
     return True
 
 
@@ -339,7 +912,7 @@ def check_tool(tool, recipe=None, failed_msg=None, skip_path=False):
     if not tool_path:
         if recipe:
             try:
-                FindNativeSysroot(recipe)
+                FindNativeSysroot(recipe, tool)
             except Exception as e:
                 failed_msg += "\n" + str(e)
 
@@ -384,6 +957,8 @@ def AddStrToFile(filename, string, mode='w'):
 
 
 def ReadYaml(yamlfile):
+    import yaml
+    run_report.Count('bytes_read', os.path.getsize(yamlfile))
     with open(yamlfile, 'r') as yaml_fd:
         try:
             return yaml.safe_load(yaml_fd)
@@ -403,7 +978,110 @@ def GetFilesFromDir(dirpath, file_ext=''):
     return FilesList
 
 
+# Files of a hw description used by the flows, {kind: filename test}
+HwFileKinds = {
+    'xsa': lambda name: name.endswith('.xsa'),
+    'sdt': lambda name: name == 'system-top.dts',
+    'iss': lambda name: name.endswith('.iss'),
+    'pdi': lambda name: name.endswith('.pdi'),
+    'boot_pdi': lambda name: name.endswith('_boot.pdi'),
+    'bit': lambda name: name.endswith('.bit'),
+    'psu_init': lambda name: name in ['psu_init.c', 'psu_init.h', 'ps7_init.c', 'ps7_init.h'],
+    'pl_dtsi': lambda name: name == 'pl.dtsi',
+}
+# Subtrees of an SDT never holding any of these (headers, driver sources)
+HwPruneDirs = ['include', 'drivers']
+# Scanned directories, {dirpath: inventory}, an inventory is rescanned once
+# the mtime of one of its directories changed
+HwInventories = {}
+
+
+def ScanHwDir(dirpath, recursive=True):
+    '''Classify the files of a hw description directory in one scandir
+    pass, in os.walk order. Hidden files and directories and HwPruneDirs
+    are skipped.'''
+    inventory = {'recursive': recursive, 'pruned': [], 'mtimes': {}}
+    for kind in HwFileKinds:
+        inventory[kind] = []
+
+    def scan(path):
+        subdirs = []
+        try:
+            inventory['mtimes'][path] = os.stat(path).st_mtime_ns
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry)
+                        continue
+                    for kind, match in HwFileKinds.items():
+                        if match(entry.name):
+                            inventory[kind].append(entry.path)
+        except OSError:
+            return
+        if not recursive:
+            return
+        for entry in subdirs:
+            if entry.name in HwPruneDirs:
+                inventory['pruned'].append(entry.path)
+            else:
+                scan(entry.path)
+
+    scan(dirpath)
+    return inventory
+
+
+def HwInventoryChanged(inventory):
+    '''True when a file was added to or removed from a scanned directory'''
+    for path, mtime in inventory['mtimes'].items():
+        try:
+            if os.stat(path).st_mtime_ns != mtime:
+                return True
+        except OSError:
+            return True
+    return False
+
+
+def InvalidateHwInventory(dirpath):
+    '''Drop the inventories covering dirpath, after unpacking or copying
+    files into it'''
+    dirpath = os.path.abspath(dirpath).rstrip(os.path.sep) or os.path.sep
+    for root in list(HwInventories):
+        if root == dirpath or root.startswith(dirpath + os.path.sep) or \
+                dirpath.startswith(root + os.path.sep):
+            del HwInventories[root]
+
+
+def GetHwFiles(dirpath, kind, recursive=True):
+    '''Files of the given HwFileKinds kind in dirpath, using the
+    inventory of an already scanned parent directory if there is one'''
+    dirpath = os.path.abspath(dirpath).rstrip(os.path.sep) or os.path.sep
+    inventory = None
+    for root, root_inventory in HwInventories.items():
+        if root == dirpath or (root_inventory['recursive'] and
+                               dirpath.startswith(root + os.path.sep) and
+                               not any(dirpath == pruned or dirpath.startswith(pruned + os.path.sep)
+                                       for pruned in root_inventory['pruned'])):
+            if recursive and not root_inventory['recursive']:
+                continue
+            if HwInventoryChanged(root_inventory):
+                del HwInventories[root]
+                break
+            inventory = root_inventory
+            run_report.Count('cache_hits')
+            break
+    if inventory is None:
+        inventory = HwInventories[dirpath] = ScanHwDir(dirpath, recursive)
+    files = [path for path in inventory[kind]
+             if path.startswith(dirpath + os.path.sep)]
+    if not recursive:
+        files = [path for path in files if os.path.dirname(path) == dirpath]
+    return files
+
+
 def CheckLopperUtilsPaths(lopper):
+    import glob
     lopper_dir = os.path.dirname(lopper)
     _lops_dir = glob.glob(os.path.join(os.path.dirname(lopper_dir),
                                       'lib', 'python*', 'site-packages', 'lopper', 'lops'))
@@ -525,6 +1203,7 @@ class bitbake():
         self.recipes_parsed = False
         # Do NOT reset prepare_args!
 
+    @run_report.Span('bitbake prepare', 'bitbake')
     def prepare(self, config_only=False, prefile=[]):
         logger.debug('Prepare bitbake')
 
@@ -556,6 +1235,7 @@ class bitbake():
         else:
             self.prepare()
 
+    @run_report.Span('bitbake parse recipes', 'bitbake')
     def parse_recipes(self):
         logger.debug('Bitbake parsing recipes')
 
@@ -580,6 +1260,7 @@ class bitbake():
             self.tinfoil.recipes_parsed = True
             self.recipes_parsed = True
 
+    @run_report.Span('bitbake getVar', 'bitbake')
     def getVar(self, variable, recipe=None):
       '''Return back the values of bitbake variables with an optional recipe'''
       if self.disabled:
@@ -603,6 +1284,7 @@ class bitbake():
 
       return d.getVar(variable)
 
+    @run_report.Span('bitbake setVar', 'bitbake')
     def setVar(self, variable, value):
         '''Set a bitbake variable. Note: this can NOT be used to set something that effects recipe parsing!'''
         logger.debug('Set bitbake variable %s to %s' % (variable, value))
@@ -616,6 +1298,7 @@ class bitbake():
 
         d.setVar(variable, value)
 
+    @run_report.Span('bitbake build', 'bitbake')
     def runBitbakeCmd(self, recipe, task=None):
         '''Run a bitbake command.  Note there is a bug that the prefile isn't evaluated prior to parsing if parse_recipes has been run.'''
         '''This may require us to shutdown bitbake, and reconfigure WITHOUT recipe_parsed!'''
@@ -624,8 +1307,29 @@ class bitbake():
         if self.disabled:
             raise Exception("Bitbake is unavailable to build task %s from recipe %s" % (task, recipe))
 
+        if not self.tinfoilPrepared:
+            self.prepare_again()
+
         return self.tinfoil.build_targets(recipe, task)
 
+    def fetchChecksum(self, fetcher):
+        '''Checksum of the fetched local files (and revisions for scm urls),
+        empty if it cannot be computed'''
+        import hashlib
+        method = hashlib.sha256()
+        for url in fetcher.urls:
+            ud = fetcher.ud[url]
+            if not ud.localpath or not os.path.exists(ud.localpath):
+                return ''
+            method.update(('%s\n%s\n' % (url, GetPathChecksum(ud.localpath))).encode())
+            revisions = getattr(ud, 'revisions', None) or {}
+            if not revisions and getattr(ud, 'revision', None):
+                revisions = {'default': ud.revision}
+            for name in sorted(revisions):
+                method.update(('%s:%s\n' % (name, revisions[name])).encode())
+        return method.hexdigest()
+
+    @run_report.Span('bitbake fetch and unpack', 'bitbake')
     def fetchAndUnpackURI(self, uri):
         ''' Use bb.fetch2.Fetch to download the specified URL's
         and unpack to TOPDIR/hw-description if bitbake found.'''
@@ -651,11 +1355,19 @@ class bitbake():
             fetcher = bb.fetch2.Fetch([uri], localdata)
             fetcher.download()
 
-            # Unpack to hw-description
+            # Unpack to hw-description, unless the same input has been
+            # unpacked there already.
             hw_dir = os.path.join(localdata.getVar('TOPDIR'), 'hw-description')
-            RemoveDir(hw_dir)
-            CreateDir(hw_dir)
-            fetcher.unpack(hw_dir)
+            checksum = self.fetchChecksum(fetcher)
+            if CheckUnpackStamp(hw_dir, checksum):
+                logger.info('%s is unchanged, reusing %s' % (uri, hw_dir))
+            else:
+                RemoveFile(UnpackStampFile(hw_dir))
+                RemoveDir(hw_dir)
+                CreateDir(hw_dir)
+                fetcher.unpack(hw_dir)
+                if checksum:
+                    WriteUnpackStamp(hw_dir, checksum)
         except bb.fetch2.FetchError as e:
             raise FetchError(message=e, url=uri)
 
@@ -20,44 +20,57 @@ import post_process_config
 import rootfs_config
 import multiconfigs
 import kconfig_syshw
+import tool_scheduler
+import run_report
 
 logger = logging.getLogger('Gen-Machineconf')
 
 
-def find_file(search_file: str, search_path: str):
+def find_file(kind: str, search_path: str):
     """
     This api find the file in sub-directories and returns absolute path of
     file, if file exists
 
     Args:
-        | search_file: The regex pattern to be searched in file names
+        | kind: The common_utils.HwFileKinds kind of the file
         | search_path: The directory that needs to be searched
     Returns:
-        string: Path of the first file that matches the pattern
+        string: Path of the file found
     """
-    file_list = list(pathlib.Path(search_path).glob(f"**/{search_file}"))
+    file_list = common_utils.GetHwFiles(search_path, kind)
     if len(file_list) > 1:
-        raise Exception('More than one {search_file} found')
+        raise Exception('More than one %s file found in %s' % (kind, search_path))
     elif len(file_list) == 0:
         return None
     elif os.path.isfile(file_list[0]):
         return file_list[0]
 
-def get_domain_name(proc_name: str, yaml_file: str):
+def get_domain_map(yaml_file: str):
+    """
+    Map each cluster cpu found in the domain yaml to its domain name
+
+    Args:
+        | yaml_file: Domain yaml generated by the isospec lopper assist
+    Returns:
+        dict: {cluster_cpu: domain_name}, first domain wins for a cpu
+    """
+    domain_map = {}
     schema = common_utils.ReadYaml(yaml_file)["domains"]
     for subsystem in schema:
         if schema[subsystem].get("domains", {}):
             for dom in schema[subsystem]["domains"]:
-                domain_name = schema[subsystem]["domains"][dom]["cpus"][0]["cluster_cpu"]
-                if domain_name == proc_name:
-                    return dom
-    return None
+                cluster_cpu = schema[subsystem]["domains"][dom]["cpus"][0]["cluster_cpu"]
+                domain_map.setdefault(cluster_cpu, dom)
+    return domain_map
+
+def get_domain_name(proc_name: str, yaml_file: str):
+    return get_domain_map(yaml_file).get(proc_name)
 
 def RunLopperGenDomainYaml(hw_file, iss_file, dts_path, domain_yaml, outdir):
     lopper, lopper_dir, lops_dir, embeddedsw = common_utils.GetLopperUtilsPath()
     cmd = 'LOPPER_DTC_FLAGS="-b 0 -@" %s -O %s -f --enhanced %s -- isospec -v -v --audit %s %s' % (
                              lopper, outdir, hw_file, iss_file, domain_yaml)
-    stdout = common_utils.RunCmd(cmd, outdir, shell=True)
+    stdout = common_utils.RunCmd(cmd, outdir, shell=True, capture=False)
     return stdout
 
 def RunLopperGenDomainDTS(outdir, dts_path, hw_file, dts_file, domain_name, domain_yaml):
@@ -65,11 +78,12 @@ def RunLopperGenDomainDTS(outdir, dts_path, hw_file, dts_file, domain_name, doma
     domain_args = "--auto -x '*.yaml'"
     cmd = 'LOPPER_DTC_FLAGS="-b 0 -@" %s -O %s -f --enhanced -t %s -a domain_access %s -i %s %s %s' % (
                              lopper, outdir, domain_name, domain_args, domain_yaml, hw_file, dts_file)
-    stdout = common_utils.RunCmd(cmd, dts_path, shell=True)
+    stdout = common_utils.RunCmd(cmd, dts_path, shell=True, capture=False)
     return stdout
 
 def RunLopperUsingDomainFile(domain_files, outdir, dts_path, hw_file,
-                             dts_file='', lopper_args='', subcommand_args=''):
+                             dts_file='', lopper_args='', subcommand_args='',
+                             stream=False):
     lopper, lopper_dir, lops_dir, embeddedsw = common_utils.GetLopperUtilsPath()
     domain_args = ''
     for domain in list(filter(None, domain_files)):
@@ -84,6 +98,9 @@ def RunLopperUsingDomainFile(domain_files, outdir, dts_path, hw_file,
     if subcommand_args != '':
         cmd += ' -- %s' % (subcommand_args)
 
+    # Return a generator of the stdout lines
+    if stream:
+        return common_utils.RunCmdLines(cmd, dts_path, shell=True)
     stdout = common_utils.RunCmd(cmd, dts_path, shell=True)
     return stdout
 
@@ -97,14 +114,14 @@ def RunLopperGenLinuxDts(outdir, dts_path, domain_files, hw_file, dts_file, subc
             domain_args += ' -i %s' % domain
     cmd = 'LOPPER_DTC_FLAGS="-b 0 -@" %s --enhanced -O %s %s %s %s %s -- %s' % (
         lopper, outdir, lopper_args, domain_args, hw_file, dts_file, subcommand_args)
-    stdout = common_utils.RunCmd(cmd, dts_path, shell=True)
+    stdout = common_utils.RunCmd(cmd, dts_path, shell=True, capture=False)
     return stdout
 
 def RunLopperSubcommand(outdir, dts_path, hw_file, subcommand_args, lopper_args=''):
     lopper, lopper_dir, lops_dir, embeddedsw = common_utils.GetLopperUtilsPath()
     cmd = 'LOPPER_DTC_FLAGS="-b 0 -@" %s -O %s %s %s -- %s' % (
         lopper, outdir, lopper_args, hw_file, subcommand_args)
-    stdout = common_utils.RunCmd(cmd, dts_path, shell=True)
+    stdout = common_utils.RunCmd(cmd, dts_path, shell=True, capture=False)
     return stdout
 
 def RunLopperPlOverlaycommand(outdir, dts_path, hw_file, ps_dts_file, subcommand_args, lopper_args=''):
@@ -113,7 +130,7 @@ def RunLopperPlOverlaycommand(outdir, dts_path, hw_file, ps_dts_file, subcommand
     sdt_gen_pl_dtsi = f"{hw_dir}/pl.dtsi"
     cmd = 'LOPPER_DTC_FLAGS="-b 0 -@" %s --enhanced -O %s %s %s %s -- %s %s' % (
         lopper, outdir, lopper_args, hw_file, ps_dts_file, subcommand_args, sdt_gen_pl_dtsi)
-    stdout = common_utils.RunCmd(cmd, dts_path, shell=True)
+    stdout = common_utils.RunCmd(cmd, dts_path, shell=True, capture=False)
     return stdout
 
 def CopyPlOverlayfile(outdir, dts_path, pl_overlay_args):
@@ -123,13 +140,50 @@ def CopyPlOverlayfile(outdir, dts_path, pl_overlay_args):
     logger.info('Lopper generated pl overlay file is found in: %s and a copy of pl.dtsi is stored in: %s'
                 % (os.path.join(outdir, 'pl.dtsi'), pl_dt_path))
 
+def GetSdtInputs(hw_file):
+    '''The SDT top dts and the dtsi files it includes'''
+    inputs = []
+    pending = [os.path.realpath(hw_file)]
+    while pending:
+        dts = pending.pop(0)
+        if dts in inputs or not os.path.isfile(dts):
+            continue
+        inputs.append(dts)
+        with open(dts, 'r', errors='replace') as dts_f:
+            for line in dts_f:
+                match = re.match(r'\s*(?:#include|/include/)\s+"([^"]+)"', line)
+                if match:
+                    pending.append(os.path.realpath(os.path.join(
+                        os.path.dirname(dts), match.group(1))))
+    return inputs
+
+def GetPlOverlayKey(hw_file, pl_overlay, cpu_target, outputs=[]):
+    '''Cache key of the pl overlay artifacts, built from the SDT input
+    files, the overlay type and the cpu target. The outputs of the pl
+    overlay step are left out, they may be written next to the SDT.'''
+    import hashlib
+    method = hashlib.sha256()
+    outputs = [os.path.realpath(output) for output in outputs]
+    inputs = GetSdtInputs(hw_file)
+    # lopper reads the pl.dtsi next to the SDT as well
+    sdt_gen_pl_dtsi = os.path.realpath(os.path.join(os.path.dirname(hw_file), 'pl.dtsi'))
+    if sdt_gen_pl_dtsi not in inputs and os.path.isfile(sdt_gen_pl_dtsi):
+        inputs.append(sdt_gen_pl_dtsi)
+    for dts in inputs:
+        if dts in outputs:
+            continue
+        method.update(('%s:%s\n' % (os.path.basename(dts),
+                                    common_utils.GetFileHashValue(dts))).encode())
+    method.update(('%s:%s' % (pl_overlay, cpu_target)).encode())
+    return method.hexdigest()
+
 def GetLopperBaremetalDrvList(cpuname, outdir, dts_path, hw_file, lopper_args=''):
     lopper, lopper_dir, lops_dir, embeddedsw = common_utils.GetLopperUtilsPath()
     cmd = 'LOPPER_DTC_FLAGS="-b 0 -@" %s -O %s -f %s \
                 "%s" -- baremetaldrvlist_xlnx %s "%s"' % (
         lopper, outdir, lopper_args,
         hw_file, cpuname, embeddedsw)
-    stdout = common_utils.RunCmd(cmd, dts_path, shell=True)
+    stdout = common_utils.RunCmd(cmd, dts_path, shell=True, capture=False)
     return stdout
 
 
@@ -156,16 +210,8 @@ class sdtGenerateMultiConfigFiles(multiconfigs.GenerateMultiConfigFiles):
             if lopdts in [ 'lop-r5-imux.dts', 'lop-r52-imux.dts' ]:
                 subcommand_args = ' gen_domain_dts ' + self.cpuname + ' --openamp_no_header '
 
-        if self.domain_yaml:
-            domain_name = get_domain_name(self.cpuname, self.domain_yaml)
-            if domain_name:
-                domain_dts_file = os.path.join(self.args.dts_path, '%s.dts'
-                                               % domain_name.lower())
-                RunLopperGenDomainDTS(self.args.output, self.args.dts_path, self.args.hw_file,
-		                              domain_dts_file, domain_name, self.domain_yaml)
-            else:
-                domain_dts_file = self.args.hw_file
-        else:
+        domain_dts_file = self.GetDomainDts()
+        if not domain_dts_file:
             domain_dts_file = self.args.hw_file
 
         RunLopperUsingDomainFile(domain_files, self.args.output, self.args.dts_path,
@@ -192,9 +238,10 @@ class sdtGenerateMultiConfigFiles(multiconfigs.GenerateMultiConfigFiles):
         extra_conf_str = ''
         if self.os_hint == 'fsbl':
             logger.info('Generating cortex-a9 baremetal configuration for FSBL')
+            psu_init_files = [os.path.basename(psu_init_f) for psu_init_f in common_utils.GetHwFiles(
+                                self.args.psu_init_path, 'psu_init', recursive=False)]
             for psu_init_f in ['ps7_init.c', 'ps7_init.h']:
-                if not os.path.exists(os.path.join(
-                        self.args.psu_init_path, psu_init_f)):
+                if psu_init_f not in psu_init_files:
                     logger.error('Unable to find %s in %s' % (
                         psu_init_f, self.args.psu_init_path))
         else:
@@ -207,9 +254,10 @@ class sdtGenerateMultiConfigFiles(multiconfigs.GenerateMultiConfigFiles):
         extra_conf_str = ''
         if self.os_hint == 'fsbl':
             logger.info('Generating cortex-a53 baremetal configuration for FSBL')
+            psu_init_files = [os.path.basename(psu_init_f) for psu_init_f in common_utils.GetHwFiles(
+                                self.args.psu_init_path, 'psu_init', recursive=False)]
             for psu_init_f in ['psu_init.c', 'psu_init.h']:
-                if not os.path.exists(os.path.join(
-                        self.args.psu_init_path, psu_init_f)):
+                if psu_init_f not in psu_init_files:
                     logger.error('Unable to find %s in %s' % (
                         psu_init_f, self.args.psu_init_path))
         else:
@@ -236,9 +284,10 @@ class sdtGenerateMultiConfigFiles(multiconfigs.GenerateMultiConfigFiles):
         extra_conf_str = ''
         if self.os_hint == 'fsbl':
             logger.info('Generating cortex-r5 baremetal configuration for FSBL')
+            psu_init_files = [os.path.basename(psu_init_f) for psu_init_f in common_utils.GetHwFiles(
+                                self.args.psu_init_path, 'psu_init', recursive=False)]
             for psu_init_f in ['psu_init.c', 'psu_init.h']:
-                if not os.path.exists(os.path.join(
-                        self.args.psu_init_path, psu_init_f)):
+                if psu_init_f not in psu_init_files:
                     logger.error('Unable to find %s in %s' % (
                         psu_init_f, self.args.psu_init_path))
         else:
@@ -286,6 +335,41 @@ class sdtGenerateMultiConfigFiles(multiconfigs.GenerateMultiConfigFiles):
             'Generating cortex-r52 FreeRTOS configuration for core %s [ %s ]' % (self.core, self.domain))
         self.GenLibxilFeatures('lop-r52-imux.dts')
 
+    def GenPlOverlayDts(self, cpu_target, cpu_label):
+        '''Remove the pl nodes from the SDT into an intermediate <hw>-no-pl.dts
+        and generate pl.dtsi. Both are reused as long as the SDT, the overlay
+        type and the cpu target did not change since the last run.'''
+        # Do not overwrite original SDT file during overlay processing, Instead
+        # write out to a intermediate file in output directory and use this
+        # file for lopper pl overlay operation.
+        ps_dts_file = os.path.join(self.args.dts_path, '%s-no-pl.dts'
+                                   % pathlib.Path(self.args.hw_file).stem)
+        pl_dtsi = os.path.join(self.args.output, 'pl.dtsi')
+        statistics_file = os.path.join(self.args.output, '.statistics')
+        overlay_key = GetPlOverlayKey(self.args.hw_file, self.gen_pl_overlay, cpu_target,
+                                      [ps_dts_file, pl_dtsi])
+
+        if not getattr(self.args, 'force_pl_overlay', False) and \
+                os.path.exists(ps_dts_file) and os.path.exists(pl_dtsi) and \
+                common_utils.GetConfigValue('PL_OVERLAY_DTS', statistics_file) == overlay_key:
+            logger.info('pl-overlay [ %s ] is unchanged for %s, reusing intermediate ps dts file: %s'
+                        % (self.gen_pl_overlay, cpu_label, ps_dts_file))
+            run_report.Count('cache_hits')
+        else:
+            RunLopperPlOverlaycommand(self.args.output, self.args.dts_path, self.args.hw_file,
+                                      ps_dts_file, 'xlnx_overlay_pl_dt %s %s'
+                                      % (cpu_target, self.gen_pl_overlay),
+                                      '-f')
+            common_utils.UpdateConfigValue('PL_OVERLAY_DTS', overlay_key, statistics_file)
+            logger.info('pl-overlay [ %s ] is enabled for %s file: %s and stored in intermediate ps dts file: %s'
+                        % (self.gen_pl_overlay, cpu_label, self.args.hw_file, ps_dts_file))
+        # Once RunLopperPlOverlaycommand API is executed pl.dtsi will be
+        # generated in lopper output directory. Hence copy pl.dtsi from
+        # output directory to dts_path/pl-overlay-{full|dfx} directory.
+        # Later user can use this pl.dtsi as input file to firmware recipes.
+        CopyPlOverlayfile(self.args.output, self.args.dts_path, self.gen_pl_overlay)
+        return ps_dts_file
+
     def CortexA9Linux(self):
         mc_name = self.mcname
         if mc_name == '':
@@ -304,22 +388,7 @@ class sdtGenerateMultiConfigFiles(multiconfigs.GenerateMultiConfigFiles):
         # in lopper. This script provides full, dfx(static) pl overlays.
         ps_dts_file = ''
         if self.gen_pl_overlay:
-            # Do not overwrite original SDT file during overlay processing, Instead
-            # write out to a intermediate file in output directory and use this
-            # file for lopper pl overlay operation.
-            ps_dts_file = os.path.join(self.args.dts_path, '%s-no-pl.dts'
-                                       % pathlib.Path(self.args.hw_file).stem)
-            RunLopperPlOverlaycommand(self.args.output, self.args.dts_path, self.args.hw_file,
-                                      ps_dts_file, 'xlnx_overlay_pl_dt cortexa9-zynq %s'
-                                      % (self.gen_pl_overlay),
-                                      '-f')
-            logger.info('pl-overlay [ %s ] is enabled for cortex-a9 file: %s and stored in intermediate ps dts file: %s'
-                        % (self.gen_pl_overlay, self.args.hw_file, ps_dts_file))
-            # Once RunLopperPlOverlaycommand API is executed pl.dtsi will be
-            # generated in lopper output directory. Hence copy pl.dtsi from
-            # output directory to dts_path/pl-overlay-{full|dfx} directory.
-            # Later user can use this pl.dtsi as input file to firmware recipes.
-            CopyPlOverlayfile(self.args.output, self.args.dts_path, self.gen_pl_overlay)
+            ps_dts_file = self.GenPlOverlayDts('cortexa9-zynq', 'cortex-a9')
         else:
             ps_dts_file = self.args.hw_file
             logger.debug('No pl-overlay is enabled for cortex-a9 Linux dts file: %s'
@@ -355,22 +424,7 @@ class sdtGenerateMultiConfigFiles(multiconfigs.GenerateMultiConfigFiles):
         # in lopper. This script provides full, dfx(static) pl overlays.
         ps_dts_file = ''
         if self.gen_pl_overlay:
-            # Do not overwrite original SDT file during overlay processing, Instead
-            # write out to a intermediate file in output directory and use this
-            # file for lopper pl overlay operation.
-            ps_dts_file = os.path.join(self.args.dts_path, '%s-no-pl.dts'
-                                       % pathlib.Path(self.args.hw_file).stem)
-            RunLopperPlOverlaycommand(self.args.output, self.args.dts_path, self.args.hw_file,
-                                      ps_dts_file, 'xlnx_overlay_pl_dt cortexa53-zynqmp %s'
-                                      % (self.gen_pl_overlay),
-                                      '-f')
-            logger.info('pl-overlay [ %s ] is enabled for cortex-a53 file: %s and stored in intermediate ps dts file: %s'
-                        % (self.gen_pl_overlay, self.args.hw_file, ps_dts_file))
-            # Once RunLopperPlOverlaycommand API is executed pl.dtsi will be
-            # generated in lopper output directory. Hence copy pl.dtsi from
-            # output directory to dts_path/pl-overlay-{full|dfx} directory.
-            # Later user can use this pl.dtsi as input file to firmware recipes.
-            CopyPlOverlayfile(self.args.output, self.args.dts_path, self.gen_pl_overlay)
+            ps_dts_file = self.GenPlOverlayDts('cortexa53-zynqmp', 'cortex-a53')
         else:
             ps_dts_file = self.args.hw_file
             logger.debug('No pl-overlay is enabled for cortex-a53 Linux dts file: %s'
@@ -408,31 +462,11 @@ class sdtGenerateMultiConfigFiles(multiconfigs.GenerateMultiConfigFiles):
         # dfx(static) pl overlays.
         ps_dts_file = ''
         if self.domain_yaml:
-            domain_name = get_domain_name(self.cpuname, self.domain_yaml)
-            if domain_name:
-                ps_dts_file = os.path.join(self.args.dts_path, '%s.dts'
-                                           % domain_name.lower())
-                RunLopperGenDomainDTS(self.args.output, self.args.dts_path, self.args.hw_file,
-		                       ps_dts_file, domain_name, self.domain_yaml)
-            else:
+            ps_dts_file = self.GetDomainDts()
+            if not ps_dts_file:
                 ps_dts_file = self.args.hw_file
         elif self.gen_pl_overlay:
-            # Do not overwrite original SDT file during overlay processing, Instead
-            # write out to a intermediate file in output directory and use this
-            # file for lopper pl overlay operation.
-            ps_dts_file = os.path.join(self.args.dts_path, '%s-no-pl.dts'
-                                       % pathlib.Path(self.args.hw_file).stem)
-            RunLopperPlOverlaycommand(self.args.output, self.args.dts_path, self.args.hw_file,
-                                      ps_dts_file, 'xlnx_overlay_pl_dt cortexa72-versal %s'
-                                      % (self.gen_pl_overlay),
-                                      '-f')
-            logger.info('pl-overlay [ %s ] is enabled for cortex-a72 file: %s and stored in intermediate ps dts file: %s'
-                        % (self.gen_pl_overlay, self.args.hw_file, ps_dts_file))
-            # Once RunLopperPlOverlaycommand API is executed pl.dtsi will be
-            # generated in lopper output directory. Hence copy pl.dtsi from
-            # output directory to dts_path/pl-overlay-{full|dfx} directory.
-            # Later user can use this pl.dtsi as input file to firmware recipes.
-            CopyPlOverlayfile(self.args.output, self.args.dts_path, self.gen_pl_overlay)
+            ps_dts_file = self.GenPlOverlayDts('cortexa72-versal', 'cortex-a72')
         else:
             ps_dts_file = self.args.hw_file
             logger.debug('No pl-overlay is enabled for cortex-a72 Linux dts file: %s'
@@ -470,22 +504,7 @@ class sdtGenerateMultiConfigFiles(multiconfigs.GenerateMultiConfigFiles):
         # dfx(static) pl overlays.
         ps_dts_file = ''
         if self.gen_pl_overlay:
-            # Do not overwrite original SDT file during overlay processing, Instead
-            # write out to a intermediate file in output directory and use this
-            # file for lopper pl overlay operation.
-            ps_dts_file = os.path.join(self.args.dts_path, '%s-no-pl.dts'
-                                       % pathlib.Path(self.args.hw_file).stem)
-            RunLopperPlOverlaycommand(self.args.output, self.args.dts_path, self.args.hw_file,
-                                      ps_dts_file, 'xlnx_overlay_pl_dt cortexa78_0 %s'
-                                      % (self.gen_pl_overlay),
-                                      '-f')
-            logger.info('pl-overlay [ %s ] is enabled for cortex-a78 file: %s and stored in intermediate ps dts file: %s'
-                        % (self.gen_pl_overlay, self.args.hw_file, ps_dts_file))
-            # Once RunLopperPlOverlaycommand API is executed pl.dtsi will be
-            # generated in lopper output directory. Hence copy pl.dtsi from
-            # output directory to dts_path/pl-overlay-{full|dfx} directory.
-            # Later user can use this pl.dtsi as input file to firmware recipes.
-            CopyPlOverlayfile(self.args.output, self.args.dts_path, self.gen_pl_overlay)
+            ps_dts_file = self.GenPlOverlayDts('cortexa78_0', 'cortex-a78')
         else:
             ps_dts_file = self.args.hw_file
             logger.debug('No pl-overlay is enabled for cortex-a78 Linux dts file: %s'
@@ -688,9 +707,84 @@ class sdtGenerateMultiConfigFiles(multiconfigs.GenerateMultiConfigFiles):
                 else:
                     logger.warning('Unknown CPU %s' % self.cpu)
 
+    def DomainDtsTargets(self):
+        '''Unique (domain_name, domain_yaml) targets of the selected multiconfigs'''
+        targets = []
+        if not self.domain_yaml or not self.MultiConfUser or not self.MultiConfMap:
+            return targets
+
+        domain_map = self.GetDomainMap()
+        for mc_name in self.MultiConfUser:
+            if mc_name not in self.MultiConfMap:
+                continue
+            cpu = self.MultiConfMap[mc_name]['cpu']
+            os_hint = self.MultiConfMap[mc_name]['os_hint']
+            # Only baremetal/FreeRTOS multiconfigs and the cortex-a72 Linux
+            # consume the domain dts, see GenLibxilFeatures and CortexA72Linux.
+            if cpu == 'xlnx,microblaze':
+                continue
+            if os_hint.startswith('linux') and cpu != 'arm,cortex-a72':
+                continue
+            domain_name = domain_map.get(self.MultiConfMap[mc_name]['cpuname'])
+            if domain_name and (domain_name, self.domain_yaml) not in targets:
+                targets.append((domain_name, self.domain_yaml))
+        return targets
+
+    def BuildDomainDts(self):
+        '''Generate the unique domain dts files concurrently, shared by all
+        the multiconfigs using the same domain'''
+        targets = self.DomainDtsTargets()
+        if not targets:
+            return
+
+        # Make sure lopper is available before fanning out, this may
+        # need to construct the recipe sysroot using bitbake.
+        common_utils.GetLopperUtilsPath()
+
+        logger.info('Generating %s domain device tree(s)' % len(targets))
+        scheduler = tool_scheduler.ToolScheduler()
+        for domain_name, domain_yaml in targets:
+            dts_file = os.path.join(self.args.dts_path, '%s.dts' % domain_name.lower())
+            # Each lopper run gets its own output directory, so the
+            # parallel runs do not overwrite each other's files.
+            outdir = os.path.join(self.args.output, 'domains', domain_name.lower())
+            common_utils.CreateDir(outdir)
+            scheduler.submit(RunLopperGenDomainDTS, outdir, self.args.dts_path,
+                             self.args.hw_file, dts_file, domain_name, domain_yaml,
+                             tool='lopper', name='domain %s' % domain_name)
+            self.DomainDtsFiles[domain_name] = dts_file
+        try:
+            scheduler.run()
+        except Exception:
+            # Do not reuse partially generated files
+            self.DomainDtsFiles = {}
+            raise
+
+    def GetDomainMap(self):
+        if self.DomainMap is None:
+            self.DomainMap = get_domain_map(self.domain_yaml)
+        return self.DomainMap
+
+    def GetDomainDts(self):
+        '''Return the domain dts of the current cpu, building it if it
+        was not generated by BuildDomainDts'''
+        if not self.domain_yaml:
+            return None
+        domain_name = self.GetDomainMap().get(self.cpuname)
+        if not domain_name:
+            return None
+        if domain_name not in self.DomainDtsFiles:
+            dts_file = os.path.join(self.args.dts_path, '%s.dts' % domain_name.lower())
+            RunLopperGenDomainDTS(self.args.output, self.args.dts_path, self.args.hw_file,
+                                  dts_file, domain_name, self.domain_yaml)
+            self.DomainDtsFiles[domain_name] = dts_file
+        return self.DomainDtsFiles[domain_name]
+
     def GenerateMultiConfigs(self):
         multiconfigs.GenerateMultiConfigFiles.GenerateMultiConfigs(self)
 
+        self.BuildDomainDts()
+
         self.ParseCpuDict()
 
         return self.MultiConfDict
@@ -701,7 +795,9 @@ class sdtGenerateMultiConfigFiles(multiconfigs.GenerateMultiConfigFiles):
         self.MBTunesDone = self.GenLinuxDts = False
         self.gen_pl_overlay = None
         self.domain_yaml = None
-        iss_file = find_file("*.iss",  os.path.dirname(self.args.hw_file.rstrip(os.path.sep)))
+        self.DomainDtsFiles = {}
+        self.DomainMap = None
+        iss_file = find_file('iss',  os.path.dirname(self.args.hw_file.rstrip(os.path.sep)))
         if iss_file:
             self.domain_yaml = os.path.join(self.args.config_dir, "domains.yaml")
             RunLopperGenDomainYaml(self.args.hw_file, iss_file, self.args.dts_path,
@@ -721,7 +817,10 @@ def GetProcNameFromCpuInfo(cpuinfo_dict):
 
 def CpuInfoToDict(cpu_info):
     cpu_info_dict = {}
-    for _cpu in cpu_info.splitlines():
+    if isinstance(cpu_info, str):
+        cpu_info = cpu_info.splitlines()
+    for _cpu in cpu_info:
+        _cpu = _cpu.rstrip('\n')
         if not _cpu.startswith('#') or _cpu.startswith('['):
             cpu, core, domain, cpu_name, os_hint = _cpu.split(' ', 4)
             # cpu_name is unique so using it as key
@@ -768,21 +867,26 @@ def ParseSDT(args):
             logger.debug('Using the soc_variant specified by user:%s' % args.soc_variant)
             hw_info['soc_variant'] = args.soc_variant
 
-        # Get machinefile name, device-id and model
-        machine_info = RunLopperUsingDomainFile(['lop-machine-name.dts'],
-                                                             args.output, args.output,
-                                                             args.hw_file, '')[0]
-        local_machine_conf, hw_info['device_id'], hw_info['model'] = machine_info.strip().split(' ', 2)
+        def GetCpuInfo(outdir):
+            return CpuInfoToDict(RunLopperUsingDomainFile(['lop-xilinx-id-cpus.dts'],
+                                                          outdir, outdir,
+                                                          args.hw_file, '', stream=True))
+
+        # Get machinefile name, device-id and model and the CPU list,
+        # the lopper runs are independent and use their own output directory
+        cpus_outdir = os.path.join(args.output, 'lopper-cpus')
+        common_utils.CreateDir(cpus_outdir)
+        scheduler = tool_scheduler.ToolScheduler()
+        scheduler.submit(RunLopperUsingDomainFile, ['lop-machine-name.dts'],
+                         args.output, args.output, args.hw_file, '',
+                         tool='lopper', name='machine name')
+        scheduler.submit(GetCpuInfo, cpus_outdir, tool='lopper', name='cpu list')
+        machine_info, hw_info['cpu_info_dict'] = scheduler.run()
+        local_machine_conf, hw_info['device_id'], hw_info['model'] = machine_info[0].strip().split(' ', 2)
 
         if 'machine' not in hw_info:
             hw_info['machine'] = local_machine_conf
 
-        # Generate CPU list
-        cpu_info = RunLopperUsingDomainFile(['lop-xilinx-id-cpus.dts'],
-                                                         args.output, args.output,
-                                                         args.hw_file, '')[0]
-        hw_info['cpu_info_dict'] = CpuInfoToDict(cpu_info)
-
         # Get proc name
         if 'proc_type' not in hw_info:
             hw_info['proc_type'] = GetProcNameFromCpuInfo(hw_info['cpu_info_dict'])
@@ -833,7 +937,8 @@ def ParseSDT(args):
 
 
     #### Gather:
-    hw_info = gatherHWInfo()
+    with run_report.Span('Gather hw info'):
+        hw_info = gatherHWInfo()
 
     if hw_info['machine']:
         args.machine = hw_info['machine']
@@ -841,7 +946,8 @@ def ParseSDT(args):
     args.soc_variant = hw_info['soc_variant']
 
     #### Generate Kconfig:
-    project_config.GenKconfigProj(args, system_conffile, hw_info)
+    with run_report.Span('Generate Kconfig'):
+        project_config.GenKconfigProj(args, system_conffile, hw_info)
 
     # In case config file exists before prepocess use that
     cfg_machine = common_utils.GetConfigValue('CONFIG_YOCTO_MACHINE_NAME',
@@ -854,14 +960,16 @@ def ParseSDT(args):
 
     # Update the sysconfig with command line arguments
     # to reflect in menuconfig/config
-    project_config.PreProcessSysConf(args, system_conffile, hw_info)
-    common_utils.RunMenuconfig(Kconfig, system_conffile,
-                               True if args.menuconfig == 'project' else False,
-                               args.output, 'project')
+    with run_report.Span('Project config'):
+        project_config.PreProcessSysConf(args, system_conffile, hw_info)
+        common_utils.RunMenuconfig(Kconfig, system_conffile,
+                                   True if args.menuconfig == 'project' else False,
+                                   args.output, 'project')
 
     #### Process the configuration:
-    post_process_config.PostProcessSysConf(
-        args, system_conffile, ipinfo_file, plnx_syshw_file)
+    with run_report.Span('Post process config'):
+        post_process_config.PostProcessSysConf(
+            args, system_conffile, ipinfo_file, plnx_syshw_file)
 
     # In case machine name updated in config
     cfg_machine = common_utils.GetConfigValue('CONFIG_YOCTO_MACHINE_NAME',
@@ -889,7 +997,8 @@ def ParseSDT(args):
         args.dts_path = os.path.realpath(args.dts_path)
 
     if args.petalinux:
-        rootfs_config.GenRootfsConfig(args, system_conffile)
+        with run_report.Span('Rootfs config'):
+            rootfs_config.GenRootfsConfig(args, system_conffile)
 
     #### Generate the configuration:
     MCObject = sdtGenerateMultiConfigFiles(args, hw_info['multiconfigs'], system_conffile=system_conffile)
@@ -901,12 +1010,14 @@ def ParseSDT(args):
 
 def register_commands(subparsers):
     parser_sdt = subparsers.add_parser('parse-sdt',
-                                       help='Parse System devicet-tree file and generate Yocto/PetaLinux configurations.',
+                                       help=common_utils.SubcommandHelp['parse-sdt'],
                                        usage='%(prog)s [--hw-description'
                                        ' <PATH_TO_SDTDIR>] [other options]'
                                        )
     parser_sdt.add_argument('-g', '--gen-pl-overlay', choices=['full', 'dfx'],
                             help='Generate pl overlay for full, dfx configuration using xlnx_overlay_pl_dt lopper script')
+    parser_sdt.add_argument('--force-pl-overlay', action='store_true',
+                            help='Regenerate the pl overlay intermediate files even if the SDT is unchanged')
     parser_sdt.add_argument('-d', '--domain-file', metavar='<domain_file>',
                             help='Path to domain file (.yaml/.dts)', type=os.path.realpath)
     parser_sdt.add_argument('-i', '--psu-init-path', metavar='<psu_init_path>',
@@ -922,4 +1033,5 @@ def register_commands(subparsers):
     parser_sdt.add_argument('--dts-path', metavar='<dts_path>',
                             help='Absolute path or subdirectory of conf/dts to place DTS files in (usually auto detected from DTS)')
 
-    parser_sdt.set_defaults(func=ParseSDT)
+    # [(tool, native recipe)] constructed with the kconfig tools
+    parser_sdt.set_defaults(func=ParseSDT, native_tools=[('lopper', 'esw-conf-native')])
@@ -19,6 +19,10 @@ import rootfs_config
 import subprocess
 import multiconfigs
 import kconfig_syshw
+import run_report
+import xsa_inspector
+import hwh_syshw
+import tcl_data
 
 logger = logging.getLogger('Gen-Machineconf')
 
@@ -128,6 +132,9 @@ def AddXsctUtilsPath(xsct_tool):
 
 
 def GetSocInfo(hw_file):
+    xsa_info = xsa_inspector.InspectXsa(hw_file)
+    if xsa_info:
+        return xsa_info['proc_type']
     genmachine_scripts = project_config.GenMachineScriptsPath()
     cmd = 'xsct -sdx -nodisp %s get_soc_info %s' % \
         (os.path.join(genmachine_scripts, 'hw-description.tcl'),
@@ -154,15 +161,128 @@ def GenXsctSystemHwFile(genmachine_scripts,
     plnx_syshw_file = os.path.join(output, 'plnx_syshw_data')
 
     logger.info('Generating Kconfig for project')
-    cmd = 'xsct -sdx -nodisp %s/hw-description.tcl plnx_gen_hwsysconf %s' % \
-        (genmachine_scripts, hw_file)
-    logger.debug('Generating System HW file')
-    common_utils.RunCmd(cmd, output, shell=True)
+    engine = hwh_syshw.GetEngine()
+    if engine == 'python' and hwh_syshw.WriteSysHwData(hw_file, ipinfo_schema, plnx_syshw_file):
+        logger.debug('Generated System HW file from the hwh')
+    else:
+        cmd = 'xsct -sdx -nodisp %s/hw-description.tcl plnx_gen_hwsysconf %s' % \
+            (genmachine_scripts, hw_file)
+        logger.debug('Generating System HW file')
+        tcl_env = tcl_data.PrecompileTclData([(ipinfo_schema, 'list')], output)
+        common_utils.RunCmd(cmd, output, extraenv=tcl_env, shell=True, capture=False)
+        if engine == 'parity':
+            hwh_syshw.CheckParity(hw_file, ipinfo_schema, plnx_syshw_file)
     kconfig_syshw.GenKconfigSysHW(plnx_syshw_file, ipinfo_schema, Kconfig_syshw)
     if not os.path.exists(Kconfig_syshw):
         raise Exception('Failed to Generate Kconfig_syshw File')
 
 
+def GetPrimaryFlash(config_lines):
+    '''Kconfig name of the selected flash, as get_primary_ip_kconfig'''
+    for line in config_lines:
+        if re.search('^CONFIG_SUBSYSTEM_FLASH_(.*)_SELECT=y', line):
+            flash_kname = line.replace('CONFIG_SUBSYSTEM_FLASH_', '').replace('_SELECT=y', '')
+            return '' if flash_kname == 'MANUAL' else flash_kname
+    return ''
+
+
+def GetFlashPartitions(config_lines, flash_kname):
+    '''The <name>=<offset> <size> of the fpga, boot, kernel and dtb
+    partitions, as get_partitions of petalinux_hsm.tcl'''
+    def first_match(regex):
+        for line in config_lines:
+            if re.search(regex, line):
+                return line
+        return ''
+
+    if not flash_kname:
+        return []
+    part_sizes = [line for line in config_lines if re.search(
+        '^CONFIG_SUBSYSTEM_FLASH_%s_PART(.*)_SIZE=' % flash_kname, line)]
+    poffsets = ['0']
+    psize = []
+    for i in range(len(part_sizes)):
+        tmppsize = first_match('^CONFIG_SUBSYSTEM_FLASH_%s_PART%s_SIZE=' % (flash_kname, i))
+        if not tmppsize:
+            raise Exception('Failed to get the parition size of partition %s.' % i)
+        tmppsize = re.sub('.*=', '', tmppsize)
+        poffsets.append('0x%x' % (int(poffsets[i], 0) + int(tmppsize, 0)))
+        psize.append(tmppsize)
+
+    ret_part_offsets = []
+    autoconfig_prefix = 'CONFIG_SUBSYSTEM_IMAGES_ADVANCED_AUTOCONFIG_%s_PART_NAME=' % flash_kname
+    autoconfig_name = first_match('^' + autoconfig_prefix)
+    for partname in ['fpga', 'boot', 'kernel', 'dtb']:
+        if autoconfig_name:
+            partname = autoconfig_name.replace('"', '').replace(autoconfig_prefix, '')
+        part_id_str = first_match('^CONFIG_SUBSYSTEM_FLASH_%s_PART(.*)_NAME="(.*)%s"' % (
+            flash_kname, partname))
+        if not part_id_str:
+            continue
+        act_part_name = part_id_str.split('"')[1]
+        part_id = int(part_id_str.replace('CONFIG_SUBSYSTEM_FLASH_%s_PART' % flash_kname, '').replace(
+            '_NAME="%s"' % act_part_name, ''))
+        ret_part_offsets.append('%s=%s %s' % (
+            partname, poffsets[part_id] if part_id < len(poffsets) else '',
+            psize[part_id] if part_id < len(psize) else ''))
+    return ret_part_offsets
+
+
+def GetFlashWidth(flash_kname, ipinfo_data, syshw_data):
+    '''flash_type, flash_width and flash_size of the selected flash from
+    plnx_syshw_data, as get_flash_width of petalinux_hsm.tcl. None when
+    plnx_syshw_data does not have them.'''
+    def to_int(value):
+        return value if isinstance(value, int) else int(str(value), 0)
+
+    if not flash_kname:
+        return []
+    flash_name = re.sub('_BANK.*', '', flash_kname).lower()
+    flash_bank = re.sub('.*_BANK', '', flash_kname)
+    slaves = {}
+    for procdata in syshw_data['processor'].values():
+        slaves.update(procdata.get('slaves') or {})
+    bank = slaves.get('%s_bank%s' % (flash_name, flash_bank)) or {}
+    flashnode = slaves.get(flash_name) or bank
+    if not isinstance(flashnode, dict) or 'ip_name' not in flashnode:
+        return None
+    flashinfo = ipinfo_data.get(flashnode['ip_name'], {}).get(
+        'device_type', {}).get('flash', {})
+    if 'flash_type' not in flashinfo:
+        return None
+    retlist = []
+    if flashinfo['flash_type']:
+        retlist.append('flash_type=%s' % flashinfo['flash_type'])
+    bankinfo = flashinfo.get('bank_property') or {}
+    if bankinfo.get('bank_width') or bankinfo.get('bank_baseaddr'):
+        if bankinfo.get('bank_width'):
+            if bank.get('bank_width') is None:
+                return None
+            retlist.append('flash_width=%s' % bank['bank_width'])
+        if bankinfo.get('bank_baseaddr'):
+            if bank.get('baseaddr') is None or bank.get('highaddr') is None:
+                return None
+            retlist.append('flash_size=0x%x' % (
+                to_int(bank['highaddr']) - to_int(bank['baseaddr']) + 1))
+    return retlist
+
+
+def GenFlashInfo(system_conffile, ipinfo_file, plnx_syshw_file):
+    '''flash_parts.txt lines of get_flash_width_parts, from the config
+    and plnx_syshw_data. None when xsct is needed.'''
+    with open(system_conffile, 'r') as config_f:
+        config_lines = config_f.read().split('\n')
+    flash_kname = GetPrimaryFlash(config_lines)
+    flash_parts = GetFlashPartitions(config_lines, flash_kname)
+    if flash_kname and not os.path.exists(plnx_syshw_file):
+        return None
+    flash_widths = GetFlashWidth(flash_kname, common_utils.ReadYaml(ipinfo_file),
+                                 common_utils.ReadYaml(plnx_syshw_file) if flash_kname else {})
+    if flash_widths is None:
+        return None
+    return flash_widths + flash_parts
+
+
 def GetFlashInfo(genmachine_scripts, output, system_conffile, hw_file):
     ipinfo_file = os.path.join(genmachine_scripts, 'data', 'ipinfo.yaml')
     flashinfo_file = os.path.join(output, 'flash_parts.txt')
@@ -171,13 +291,22 @@ def GetFlashInfo(genmachine_scripts, output, system_conffile, hw_file):
             os.path.exists(flashinfo_file):
         return 0
 
+    flash_info = GenFlashInfo(system_conffile, ipinfo_file,
+                              os.path.join(output, 'plnx_syshw_data'))
+    if flash_info is not None:
+        with open(flashinfo_file, 'w') as fp:
+            fp.write(''.join('%s\n' % line for line in flash_info))
+        return 0
+
+    logger.debug('Flash information is not in plnx_syshw_data, using xsct')
     with open(flashinfo_file, 'w') as fp:
         pass
     cmd = 'xsct -sdx -nodisp %s get_flash_width_parts %s %s %s %s' % \
         (os.path.join(genmachine_scripts, 'petalinux_hsm.tcl'),
          system_conffile, ipinfo_file, hw_file,
          flashinfo_file)
-    common_utils.RunCmd(cmd, output, shell=True)
+    tcl_env = tcl_data.PrecompileTclData([(ipinfo_file, 'dict')], output)
+    common_utils.RunCmd(cmd, output, extraenv=tcl_env, shell=True, capture=False)
 
 # Mapping of DeviceId to CPU Dictionary
 SocCpuDict = {
@@ -322,7 +451,8 @@ def ParseXsa(args):
 
 
     #### Gather:
-    hw_info = gatherHWInfo(args)
+    with run_report.Span('Gather hw info'):
+        hw_info = gatherHWInfo(args)
 
     if hw_info['machine']:
         args.machine = hw_info['machine']
@@ -330,20 +460,23 @@ def ParseXsa(args):
     args.soc_variant = hw_info['soc_variant']
 
     #### Generate Kconfig:
-    project_config.GenKconfigProj(args, system_conffile, hw_info)
+    with run_report.Span('Generate Kconfig'):
+        project_config.GenKconfigProj(args, system_conffile, hw_info)
 
     project_config.PrintSystemConfiguration(args, None, hw_info['device_id'], None)
 
     # Update the sysconfig with command line arguments
     # to reflect in menuconfig/config
-    project_config.PreProcessSysConf(args, system_conffile, hw_info)
-    common_utils.RunMenuconfig(Kconfig, system_conffile,
-                               True if args.menuconfig == 'project' else False,
-                               args.output, 'project')
+    with run_report.Span('Project config'):
+        project_config.PreProcessSysConf(args, system_conffile, hw_info)
+        common_utils.RunMenuconfig(Kconfig, system_conffile,
+                                   True if args.menuconfig == 'project' else False,
+                                   args.output, 'project')
 
     #### Process the configuration:
-    post_process_config.PostProcessSysConf(
-        args, system_conffile, ipinfo_file, plnx_syshw_file)
+    with run_report.Span('Post process config'):
+        post_process_config.PostProcessSysConf(
+            args, system_conffile, ipinfo_file, plnx_syshw_file)
 
     # In case machine name updated in config
     cfg_machine = common_utils.GetConfigValue('CONFIG_YOCTO_MACHINE_NAME',
@@ -352,9 +485,13 @@ def ParseXsa(args):
         args.machine = cfg_machine
 
     if args.petalinux:
-        GetFlashInfo(genmachine_scripts, args.output,
-                     system_conffile, args.hw_file)
-        rootfs_config.GenRootfsConfig(args, system_conffile)
+        # Run one after the other: the rootfs config may start an interactive
+        # mconf and it updates the system config the flash info reads.
+        with run_report.Span('Flash info'):
+            GetFlashInfo(genmachine_scripts, args.output,
+                         system_conffile, args.hw_file)
+        with run_report.Span('Rootfs config'):
+            rootfs_config.GenRootfsConfig(args, system_conffile)
 
     #### Generate the configuration:
     MCObject = xsctGenerateMultiConfigFiles(args, hw_info['multiconfigs'], system_conffile=system_conffile)
@@ -366,7 +503,7 @@ def ParseXsa(args):
 
 def register_commands(subparsers):
     parser_xsa = subparsers.add_parser('parse-xsa',
-                                       help='Parse xsa file and generate Yocto/PetaLinux configurations.',
+                                       help=common_utils.SubcommandHelp['parse-xsa'],
                                        usage='%(prog)s [--hw-description'
                                        ' <PATH_TO_XSA>/<xsa_name>.xsa] [other options]'
                                        )
@@ -382,4 +519,6 @@ def register_commands(subparsers):
     parser_xsa.add_argument('--multiconfigenable', action='store_true',
                             help='Enable multiconfig support. default is disabled.')
 
-    parser_xsa.set_defaults(func=ParseXsa)
+    # xsct is installed in XILINX_SDK_TOOLCHAIN by AddXsctUtilsPath, not by
+    # addto_recipe_sysroot, so there are no native tools to construct
+    parser_xsa.set_defaults(func=ParseXsa, native_tools=[])
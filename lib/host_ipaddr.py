@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Resolve the AUTO | AUTO:<interface> specs of the host IP address
+# configs, as gen-machine-scripts/petalinux-find-ipaddr, without running
+# ifconfig. The interfaces and their state come from /sys/class/net and
+# the IPv4 address from the SIOCGIFADDR ioctl.
+
+import logging
+import os
+
+logger = logging.getLogger('Gen-Machineconf')
+
+# Resolved specs of this run, {ifspec: ipaddr}
+IpAddrs = {}
+
+SIOCGIFADDR = 0x8915
+
+
+class InterfaceTable:
+    '''The host network interfaces'''
+    intfs_path = '/sys/class/net'
+
+    def Names(self):
+        try:
+            return sorted(intf for intf in os.listdir(self.intfs_path)
+                          if os.path.isdir(os.path.join(self.intfs_path, intf)))
+        except OSError:
+            return []
+
+    def Exists(self, intf):
+        return os.path.isdir(os.path.join(self.intfs_path, intf))
+
+    def IsUp(self, intf):
+        try:
+            with open(os.path.join(self.intfs_path, intf, 'operstate'), 'r') as state_f:
+                return 'up' in state_f.read()
+        except OSError:
+            return False
+
+    def Ipv4Address(self, intf):
+        '''Primary IPv4 address of intf, empty when it has none'''
+        import fcntl
+        import socket
+        import struct
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                ifreq = fcntl.ioctl(sock.fileno(), SIOCGIFADDR,
+                                    struct.pack('256s', intf[:15].encode()))
+        except (OSError, UnicodeError):
+            return ''
+        return socket.inet_ntoa(ifreq[20:24])
+
+
+class StaticInterfaceTable(InterfaceTable):
+    '''An interface table given as {intf: (operstate, ipaddr)}, to check
+    FindIpAddr without the host network'''
+
+    def __init__(self, interfaces):
+        self.interfaces = interfaces
+
+    def Names(self):
+        return sorted(self.interfaces)
+
+    def Exists(self, intf):
+        return intf in self.interfaces
+
+    def IsUp(self, intf):
+        return 'up' in self.interfaces[intf][0]
+
+    def Ipv4Address(self, intf):
+        return self.interfaces[intf][1] or ''
+
+
+def FindIpAddr(ifspec, table=None):
+    '''IP address of the host for AUTO or AUTO:<interface>, any other
+    ifspec is returned as it is'''
+    if not ifspec:
+        ifspec = 'AUTO'
+    if table is None:
+        if ifspec in IpAddrs:
+            return IpAddrs[ifspec]
+        table = InterfaceTable()
+
+    ipaddr = ''
+    if ifspec[:4] in ['AUTO', 'auto']:
+        # AUTO:<interface> will grab the IP of that interface, if possible
+        intf = ifspec[5:]
+        if intf and not table.Exists(intf):
+            logger.warning('Specified interface %s does not exist, using default' % intf)
+            intf = ''
+        if intf:
+            ipaddr = table.Ipv4Address(intf)
+        else:
+            # The first interface up with an address other than 127.0.0.1
+            for intf in table.Names():
+                if not table.IsUp(intf):
+                    continue
+                ipaddr = table.Ipv4Address(intf) or ipaddr
+                if ipaddr and ipaddr != '127.0.0.1':
+                    break
+    if not ipaddr:
+        ipaddr = ifspec
+    logger.debug('Host IP address of %s: %s' % (ifspec, ipaddr))
+    if isinstance(table, StaticInterfaceTable):
+        return ipaddr
+    IpAddrs[ifspec] = ipaddr
+    return ipaddr
@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Generate plnx_syshw_data from the hwh of an XSA without xsct, following
+# plnx_gen_hwsysconf in hw-description.tcl and driven by ipinfo.yaml.
+#
+# The hwh has the cells, parameters, ports and address map of the block
+# design, the processing system internals (psu_cortexa53, psu_uart, ...)
+# only exist in the HSI part data. Designs with a processing system are
+# therefore left to xsct, the soft processor designs are handled here.
+#
+# GEN_MACHINECONF_SYSHW_ENGINE selects the engine:
+#   xsct:   always run plnx_gen_hwsysconf (default)
+#   python: use this engine when the design is supported, else xsct
+#   parity: run xsct and report the differences with this engine
+#
+# Parity can also be checked offline on sample designs:
+#   lib/hwh_syshw.py <design.xsa> <plnx_syshw_data from xsct>
+
+import fnmatch
+import logging
+import os
+import sys
+
+logger = logging.getLogger('Gen-Machineconf')
+
+Engines = ['xsct', 'python', 'parity']
+# Device types in the plnx_gen_hwsysconf order
+DeviceTypes = ['processor', 'memory', 'serial', 'ethernet', 'flash', 'sd', 'usb']
+# Device types only collected for these processors
+DeviceProcessors = {
+    'sd': ['ps7_cortexa9', 'psu_cortexa53', 'psv_cortexa72', 'psx_cortexa78'],
+}
+# axi_noc DDR address blocks, only the first range of each is kept
+DdrBlocks = ['C*_DDR_LOW0*', 'C*_DDR_LOW1*', 'C*_DDR_LOW2*', 'C*_DDR_LOW3*',
+             'C*_DDR_CH0*', 'C*_DDR_CH1*', 'C*_DDR_CH2*', 'C*_DDR_CH3*']
+
+
+def GetEngine():
+    engine = os.environ.get('GEN_MACHINECONF_SYSHW_ENGINE', 'xsct').lower()
+    if engine not in Engines:
+        raise Exception('Invalid GEN_MACHINECONF_SYSHW_ENGINE %s, expected one of %s' % (
+            engine, ', '.join(Engines)))
+    return engine
+
+
+class Cell:
+    '''A hwh MODULE with the HSI cell properties used by hw-description.tcl'''
+
+    def __init__(self, module):
+        self.name = module.get('INSTANCE', '')
+        self.ip_name = module.get('MODTYPE', '')
+        self.fullname = module.get('FULLNAME', '')
+        self.vlnv = module.get('VLNV', '')
+        self.params = {}
+        for param in module.iterfind('PARAMETERS/PARAMETER'):
+            self.params[param.get('NAME')] = param.get('VALUE', '')
+        self.intr_pins = [port.get('NAME') for port in module.iterfind('PORTS/PORT')
+                          if port.get('DIR') == 'O' and
+                          port.get('SIGIS', '').upper() in ['INTERRUPT', 'INTR']]
+        # Address map, only used for the processors
+        self.memranges = [dict(memrange.attrib) for memrange in
+                          module.iterfind('MEMORYMAP/MEMRANGE')]
+
+
+class HwDesign:
+    '''The cells of a hwh, with the address map of the processor being
+    generated to resolve the slave base/high addresses'''
+
+    def __init__(self, name, device_id, cells):
+        self.name = name
+        self.device_id = device_id
+        self.cells = cells
+        self.cpu = None
+
+    def GetCells(self, ip_name):
+        return [cell for cell in self.cells if cell.ip_name == ip_name]
+
+    def GetCell(self, name):
+        for cell in self.cells:
+            if cell.name == name:
+                return cell
+        return None
+
+    def MemRanges(self, cell):
+        '''Memory ranges of cell in the address map of the current cpu'''
+        if not self.cpu:
+            return []
+        return [memrange for memrange in self.cpu.memranges
+                if memrange.get('INSTANCE') == cell.name]
+
+    def GetProperty(self, prop, cell):
+        if not prop or not cell:
+            return ''
+        if prop == 'VLNV':
+            return cell.vlnv
+        if prop == 'IS_PL':
+            return '1'
+        if prop in ['BASE_VALUE', 'HIGH_VALUE']:
+            memranges = self.MemRanges(cell)
+            key = 'BASEVALUE' if prop == 'BASE_VALUE' else 'HIGHVALUE'
+            return memranges[0].get(key, '') if memranges else ''
+        if prop.startswith('CONFIG.'):
+            param = prop[len('CONFIG.'):]
+            # HSI sets the address parameters from the address map
+            for memrange in self.MemRanges(cell):
+                if memrange.get('BASENAME') == param:
+                    return memrange.get('BASEVALUE', '')
+                if memrange.get('HIGHNAME') == param:
+                    return memrange.get('HIGHVALUE', '')
+            return cell.params.get(param, '')
+        return ''
+
+    def Slaves(self, cpu):
+        slaves = []
+        for memrange in cpu.memranges:
+            instance = memrange.get('INSTANCE')
+            if instance and instance not in slaves and self.GetCell(instance):
+                slaves.append(instance)
+        return slaves
+
+
+def ReadHwDesign(hw_file):
+    '''HwDesign of an XSA, None if it has a processing system or no hwh'''
+    import xml.etree.ElementTree as ET
+    import zipfile
+    import xsa_inspector
+    with zipfile.ZipFile(hw_file) as xsa_zip:
+        hwh_file = xsa_inspector.FindHwh(xsa_zip)
+        if not hwh_file:
+            logger.debug('No hwh found in %s' % hw_file)
+            return None
+        with xsa_zip.open(hwh_file) as hwh_f:
+            root = ET.parse(hwh_f).getroot()
+    sysinfo = root.find('SYSTEMINFO')
+    device_id = sysinfo.get('DEVICE', '') if sysinfo is not None else ''
+    cells = [Cell(module) for module in root.iterfind('MODULES/MODULE')]
+    for cell in cells:
+        if cell.ip_name in xsa_inspector.PsProcessors:
+            logger.debug('%s has a processing system (%s), not supported without xsct'
+                         % (hw_file, cell.name))
+            return None
+    name = os.path.splitext(os.path.basename(hw_file))[0]
+    return HwDesign(name, device_id, cells)
+
+
+def ReadIpInfo(ipinfo_file):
+    import yaml
+    with open(ipinfo_file, 'r') as ipinfo_f:
+        return yaml.safe_load(ipinfo_f)
+
+
+def DeviceInfo(ipinfo, devtype):
+    return (ipinfo.get('device_type') or {}).get(devtype) or {}
+
+
+def PropertyInfo(info, prop):
+    value = info.get(prop, '')
+    return '' if value is None else str(value)
+
+
+def InterruptValidation(design, ipinfo, devtype, cell):
+    if PropertyInfo(DeviceInfo(ipinfo, devtype), 'interrupt_required') != 'y':
+        return True
+    return len(cell.intr_pins) > 0
+
+
+def GenProcessors(design, ipinfo_data, cpu_ips):
+    archs = {'aarch64': [], 'arm': [], 'microblaze': []}
+    for ip_name in cpu_ips:
+        arch = PropertyInfo(DeviceInfo(ipinfo_data[ip_name], 'processor'), 'arch')
+        cells = design.GetCells(ip_name)
+        # Only the first instance of each processor ip
+        if cells and arch in archs:
+            archs[arch].append((cells[0], arch))
+    cpus = archs['aarch64'] or archs['arm'] or archs['microblaze']
+    if not cpus:
+        raise Exception('No CPU can be found in the system. Please review your hardware system. '
+                        'Valid processors are: microblaze, ps7_cortexa9, psu_cortexa53, psv_cortexa72, psx_cortexa78.')
+    retcpus = []
+    for cell, arch in cpus:
+        slaves = design.Slaves(cell)
+        cpudata = [cell.name, ['arch', arch], ['ip_name', cell.ip_name],
+                   ['slaves_strings'] + slaves]
+        if cell.ip_name == 'microblaze':
+            cpudata.append(['instance_path', cell.fullname.lstrip('/')])
+            koptions = ['linux_kernel_properties']
+            for kpname, kprop in (ipinfo_data[cell.ip_name].get('linux_kernel_properties') or {}).items():
+                kprop = str(kprop).split()
+                kval = design.GetProperty(kprop[0], cell)
+                if kval != '':
+                    if kpname == 'XILINX_MICROBLAZE0_HW_VER':
+                        kval = kval.split(':')[-1]
+                    koptions.append([kpname, kval] + kprop[1:2])
+            cpudata.append(koptions)
+        retcpus.append((cell, slaves, cpudata))
+    return retcpus
+
+
+def MemoryNode(name, ip_name, baseaddr, highaddr):
+    return [name, ['device_type', 'memory'], ['ip_name', ip_name],
+            ['baseaddr', baseaddr], ['highaddr', highaddr]]
+
+
+def GenMemory(design, ipinfos, cpu, cpuslaves):
+    retmemories = []
+    for ip_name, ipinfo in ipinfos:
+        devinfo = DeviceInfo(ipinfo, 'memory')
+        has_bank = PropertyInfo(devinfo, 'has_bank')
+        bankinfo = {}
+        if has_bank == 'y':
+            banks_property = PropertyInfo(devinfo, 'number_of_banks')
+            bankinfo = devinfo.get('bank_property') or {}
+            bankidreplacement = PropertyInfo(bankinfo, 'bankid_replacement_str')
+            bank_enabled_property = PropertyInfo(bankinfo, 'bank_enabled')
+            bank_baseaddr_property = PropertyInfo(bankinfo, 'bank_baseaddr')
+            bank_highaddr_property = PropertyInfo(bankinfo, 'bank_highaddr')
+        else:
+            banks_property = ''
+            bankidreplacement = ''
+            bank_baseaddr_property = PropertyInfo(devinfo, 'baseaddr')
+            bank_highaddr_property = PropertyInfo(devinfo, 'highaddr')
+            bank_enabled_property = ''
+        for cell in design.GetCells(ip_name):
+            # As in the Tcl, the fallback properties stay for the next cells
+            if bank_baseaddr_property and not design.GetProperty(bank_baseaddr_property, cell):
+                bank_baseaddr_property = PropertyInfo(devinfo, 'baseaddr1')
+            if bank_highaddr_property and not design.GetProperty(bank_highaddr_property, cell):
+                bank_highaddr_property = PropertyInfo(devinfo, 'highaddr1')
+            if cell.name not in cpuslaves:
+                continue
+            if has_bank == 'n':
+                if 'axi_noc' in ip_name:
+                    seen = set()
+                    addr_list = {}
+                    for memrange in design.MemRanges(cell):
+                        block_name = memrange.get('ADDRESSBLOCK', '')
+                        ddr_block = [block for block in DdrBlocks
+                                     if fnmatch.fnmatchcase(block_name, block)]
+                        if ddr_block:
+                            if ddr_block[0] in seen:
+                                continue
+                            seen.add(ddr_block[0])
+                        if memrange.get('BASEVALUE') and memrange.get('HIGHVALUE'):
+                            addr_list[block_name] = (memrange['BASEVALUE'], memrange['HIGHVALUE'])
+                    for block_name, (baseaddr, highaddr) in addr_list.items():
+                        retmemories.append(MemoryNode('%s_%s' % (cell.name, block_name),
+                                                      ip_name, baseaddr, highaddr))
+                else:
+                    bankbaseaddr = design.GetProperty(bank_baseaddr_property, cell)
+                    bankhighaddr = design.GetProperty(bank_highaddr_property, cell)
+                    if ip_name == 'ps7_ddr':
+                        bankbaseaddr = '0x0'
+                    if bankbaseaddr and bankhighaddr:
+                        retmemories.append(MemoryNode(cell.name, ip_name, bankbaseaddr, bankhighaddr))
+            elif has_bank == 'y' and banks_property:
+                bankcount = design.GetProperty(banks_property, cell)
+                if ip_name == 'axi_emc':
+                    bankcount = len([param for param in cell.params
+                                     if fnmatch.fnmatchcase(param, 'C_S_AXI_MEM*_BASEADDR')])
+                    bank_baseaddr_property = PropertyInfo(bankinfo, 'bank_baseaddr')
+                    bank_highaddr_property = PropertyInfo(bankinfo, 'bank_highaddr')
+                for i in range(int(bankcount or 0)):
+                    if ip_name == 'axi_emc' and \
+                            design.GetProperty('CONFIG.EMC_BOARD_INTERFACE', cell) == 'linear_flash':
+                        continue
+                    bankbaseaddr = design.GetProperty(
+                        bank_baseaddr_property.replace(bankidreplacement, str(i)), cell)
+                    bankhighaddr = design.GetProperty(
+                        bank_highaddr_property.replace(bankidreplacement, str(i)), cell)
+                    if bankbaseaddr and bankhighaddr:
+                        retmemories.append(MemoryNode('%s_bank%s' % (cell.name, i),
+                                                      ip_name, bankbaseaddr, bankhighaddr))
+            else:
+                for i in range(32):
+                    bankenabled = design.GetProperty(
+                        bank_enabled_property.replace(bankidreplacement, str(i)), cell)
+                    if bankenabled == '':
+                        break
+                    elif bankenabled == '0':
+                        continue
+                    bankbaseaddr = design.GetProperty(
+                        bank_baseaddr_property.replace(bankidreplacement, str(i)), cell)
+                    bankhighaddr = design.GetProperty(
+                        bank_highaddr_property.replace(bankidreplacement, str(i)), cell)
+                    if bankbaseaddr and bankhighaddr:
+                        retmemories.append(MemoryNode('%s_bank%s' % (cell.name, i),
+                                                      ip_name, bankbaseaddr, bankhighaddr))
+    return retmemories
+
+
+def GenSerial(design, ipinfos, cpu, cpuslaves):
+    retserials = []
+    for ip_name, ipinfo in ipinfos:
+        devinfo = DeviceInfo(ipinfo, 'serial')
+        baseaddr_property = PropertyInfo(devinfo, 'baseaddr')
+        is_config_uart_property = PropertyInfo(devinfo, 'is_serial_property')
+        for cell in design.GetCells(ip_name):
+            if cell.name not in cpuslaves:
+                continue
+            if is_config_uart_property and \
+                    design.GetProperty(is_config_uart_property, cell) in ['', '0']:
+                continue
+            if not InterruptValidation(design, ipinfo, 'serial', cell):
+                continue
+            serialnode = [cell.name, ['device_type', 'serial'], ['ip_name', ip_name]]
+            if baseaddr_property:
+                serialnode.append(['baseaddr', design.GetProperty(baseaddr_property, cell)])
+            serialnode.append(['is_pl', design.GetProperty('IS_PL', cell)])
+            retserials.append(serialnode)
+    return retserials
+
+
+def GenBasic(design, ipinfos, cpu, cpuslaves, devtype):
+    retdev = []
+    for ip_name, ipinfo in ipinfos:
+        for cell in design.GetCells(ip_name):
+            if cell.name not in cpuslaves:
+                continue
+            if not InterruptValidation(design, ipinfo, devtype, cell):
+                continue
+            retdev.append([cell.name, ['device_type', devtype], ['ip_name', ip_name]])
+    return retdev
+
+
+def GenFlash(design, ipinfos, cpu, cpuslaves):
+    retflashs = []
+    for ip_name, ipinfo in ipinfos:
+        devinfo = DeviceInfo(ipinfo, 'flash')
+        for cell in design.GetCells(ip_name):
+            if cell.name not in cpuslaves:
+                continue
+            if not InterruptValidation(design, ipinfo, 'flash', cell):
+                continue
+            if ip_name == 'axi_emc':
+                bankinfo = devinfo.get('bank_property') or {}
+                bankidreplacement = PropertyInfo(bankinfo, 'bankid_replacement_str')
+                bankcount = design.GetProperty(PropertyInfo(devinfo, 'number_of_banks'), cell)
+                for i in range(int(bankcount or 0)):
+                    if design.GetProperty('CONFIG.EMC_BOARD_INTERFACE', cell) != 'linear_flash':
+                        continue
+                    bankbaseaddr = design.GetProperty(PropertyInfo(
+                        bankinfo, 'bank_baseaddr').replace(bankidreplacement, str(i)), cell)
+                    bankhighaddr = design.GetProperty(PropertyInfo(
+                        bankinfo, 'bank_highaddr').replace(bankidreplacement, str(i)), cell)
+                    flashnode = ['%s_bank%s' % (cell.name, i), ['device_type', 'flash'],
+                                 ['ip_name', ip_name], ['baseaddr', bankbaseaddr],
+                                 ['highaddr', bankhighaddr]]
+                    bankwidth = design.GetProperty(PropertyInfo(
+                        bankinfo, 'bank_width').replace(bankidreplacement, str(i)), cell)
+                    if bankwidth:
+                        flashnode.append(['bank_width', bankwidth])
+                    retflashs.append(flashnode)
+            elif ip_name == 'ps7_sram':
+                chip_sel = 'CONFIG.C_NOR_CHIP_SEL0' if cell.name == 'ps7_sram_0' \
+                    else 'CONFIG.C_NOR_CHIP_SEL1'
+                if design.GetProperty(chip_sel, design.GetCell('ps7_smcc_0')) == '0':
+                    continue
+                retflashs.append([cell.name, ['device_type', 'flash'], ['ip_name', ip_name]])
+            else:
+                # The Tcl spi branch never matches, no cs_bits is written
+                retflashs.append([cell.name, ['device_type', 'flash'], ['ip_name', ip_name]])
+    return retflashs
+
+
+def GenSd(design, ipinfos, cpu, cpuslaves):
+    return GenBasic(design, ipinfos, cpu, cpuslaves, 'sd')
+
+
+def GenUsb(design, ipinfos, cpu, cpuslaves):
+    return GenBasic(design, ipinfos, cpu, cpuslaves, 'usb')
+
+
+DeviceGenerators = {
+    'memory': GenMemory,
+    'serial': GenSerial,
+    'ethernet': lambda design, ipinfos, cpu, cpuslaves:
+        GenBasic(design, ipinfos, cpu, cpuslaves, 'ethernet'),
+    'flash': GenFlash,
+    'sd': GenSd,
+    'usb': GenUsb,
+}
+
+
+def ConvertListToYaml(datanode, prefix=''):
+    '''Same output as plnx_convert_list_to_yaml'''
+    yaml_str = '%s%s:' % (prefix, datanode[0])
+    for node in datanode[1:]:
+        if isinstance(node, list) and len(node) > 1:
+            yaml_str += '\n' + ConvertListToYaml(node, prefix + '    ')
+        elif isinstance(node, list):
+            yaml_str += ' %s' % (node[0] if node else '')
+        else:
+            yaml_str += ' %s' % node
+    return yaml_str
+
+
+def GenSysHwData(hw_file, ipinfo_file):
+    '''plnx_syshw_data contents for hw_file, None if the design needs xsct'''
+    design = ReadHwDesign(hw_file)
+    if not design:
+        return None
+    ipinfo_data = ReadIpInfo(ipinfo_file)
+    devtype_ips = {}
+    for devtype in DeviceTypes:
+        devtype_ips[devtype] = [(ip_name, ipinfo) for ip_name, ipinfo in ipinfo_data.items()
+                                if devtype in (ipinfo.get('device_type') or {})]
+    data = 'device_id: %s\n' % design.device_id
+    data += 'hw_design_name: %s\n' % design.name
+    cpus_nodes = ['processor']
+    for cpu, cpuslaves, cpudata in GenProcessors(
+            design, ipinfo_data, [ip_name for ip_name, ipinfo in devtype_ips['processor']]):
+        design.cpu = cpu
+        retslaves = ['slaves']
+        for devtype in DeviceTypes[1:]:
+            if devtype in DeviceProcessors and cpu.ip_name not in DeviceProcessors[devtype]:
+                continue
+            retslaves += DeviceGenerators[devtype](design, devtype_ips[devtype], cpu, cpuslaves)
+        names = [slave[0] for slave in retslaves[1:]]
+        for slave in cpuslaves:
+            if slave not in names:
+                retslaves.append([slave, ['ip_name', design.GetCell(slave).ip_name]])
+        cpudata.append(retslaves)
+        cpus_nodes.append(cpudata)
+    design.cpu = None
+    data += ConvertListToYaml(cpus_nodes) + '\n'
+    return data
+
+
+def WriteSysHwData(hw_file, ipinfo_file, plnx_syshw_file):
+    '''Write plnx_syshw_file without xsct, False if the design needs xsct'''
+    try:
+        data = GenSysHwData(hw_file, ipinfo_file)
+    except Exception as e:
+        logger.debug('Unable to generate %s from the hwh: %s' % (plnx_syshw_file, e))
+        return False
+    if data is None:
+        return False
+    with open(plnx_syshw_file, 'w') as syshw_f:
+        syshw_f.write(data)
+    logger.debug('Generated %s from the hwh' % plnx_syshw_file)
+    return True
+
+
+def ParityDiff(hw_file, ipinfo_file, plnx_syshw_file):
+    '''Differences between the xsct plnx_syshw_file and this engine,
+    None when the design is not supported'''
+    import difflib
+    import yaml
+    data = GenSysHwData(hw_file, ipinfo_file)
+    if data is None:
+        return None
+    with open(plnx_syshw_file, 'r') as syshw_f:
+        xsct_data = syshw_f.read()
+    # Compare the parsed data, the slave order follows the cell order
+    xsct_yaml = yaml.safe_dump(yaml.safe_load(xsct_data), default_flow_style=False)
+    python_yaml = yaml.safe_dump(yaml.safe_load(data), default_flow_style=False)
+    return list(difflib.unified_diff(xsct_yaml.splitlines(), python_yaml.splitlines(),
+                                     'xsct', 'hwh', lineterm=''))
+
+
+def CheckParity(hw_file, ipinfo_file, plnx_syshw_file):
+    try:
+        diff = ParityDiff(hw_file, ipinfo_file, plnx_syshw_file)
+    except Exception as e:
+        logger.warning('hwh plnx_syshw_data engine failed on %s: %s' % (hw_file, e))
+        return
+    if diff is None:
+        logger.info('hwh plnx_syshw_data engine does not support %s' % hw_file)
+    elif diff:
+        logger.warning('hwh plnx_syshw_data engine differs from xsct for %s:\n%s'
+                       % (hw_file, '\n'.join(diff)))
+    else:
+        logger.info('hwh plnx_syshw_data engine matches xsct for %s' % hw_file)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+    if len(sys.argv) not in [2, 3]:
+        print('Usage: %s <design.xsa> [<plnx_syshw_data from xsct>]' % sys.argv[0])
+        sys.exit(2)
+    ipinfo_file = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+                               'gen-machine-scripts', 'data', 'ipinfo.yaml')
+    if len(sys.argv) == 2:
+        data = GenSysHwData(sys.argv[1], ipinfo_file)
+        if data is None:
+            sys.exit('%s is not supported without xsct' % sys.argv[1])
+        sys.stdout.write(data)
+    else:
+        diff = ParityDiff(sys.argv[1], ipinfo_file, sys.argv[2])
+        if diff is None:
+            sys.exit('%s is not supported without xsct' % sys.argv[1])
+        print('\n'.join(diff) if diff else 'No differences')
+        sys.exit(1 if diff else 0)
@@ -10,6 +10,7 @@
 
 import logging
 import sys
+import run_report
 
 logger = None
 format = logging.Formatter("[%(levelname)s] %(message)s")
@@ -50,3 +51,16 @@ def setup_logger_file(filename):
     file_h.setLevel(logging.DEBUG)
     file_h.setFormatter(logformat)
     logger.addHandler(file_h)
+
+
+class TraceHandler(logging.Handler):
+    def emit(self, record):
+        run_report.AddEvent(record.getMessage()[:200], 'log',
+                            level=record.levelname)
+
+
+def setup_logger_trace():
+    global logger
+    trace_h = TraceHandler()
+    trace_h.setLevel(logging.INFO)
+    logger.addHandler(trace_h)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# SHA-512 crypt ($6$) password hashes, as `openssl passwd -6` and
+# accepted by `useradd -p`, computed in process following
+# https://www.akkadia.org/drepper/SHA-crypt.txt
+#
+# The salt is "xx" so the generated configs only change with the
+# passwords, set GEN_MACHINECONF_RANDOM_SALT=1 to use a random salt per
+# user instead.
+
+import hashlib
+import os
+
+CryptChars = './0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+DefaultSalt = 'xx'
+DefaultRounds = 5000
+
+# Byte order of the final digest in the hash, three bytes per group
+Sha512Order = [
+    (0, 21, 42), (22, 43, 1), (44, 2, 23), (3, 24, 45), (25, 46, 4),
+    (47, 5, 26), (6, 27, 48), (28, 49, 7), (50, 8, 29), (9, 30, 51),
+    (31, 52, 10), (53, 11, 32), (12, 33, 54), (34, 55, 13), (56, 14, 35),
+    (15, 36, 57), (37, 58, 16), (59, 17, 38), (18, 39, 60), (40, 61, 19),
+    (62, 20, 41),
+]
+
+
+def RandomSaltEnabled():
+    return os.environ.get('GEN_MACHINECONF_RANDOM_SALT', '0').lower() in ['1', 'yes', 'true']
+
+
+def RandomSalt(length=16):
+    import secrets
+    return ''.join(secrets.choice(CryptChars) for i in range(length))
+
+
+def B64From24Bit(byte2, byte1, byte0, length):
+    value = (byte2 << 16) | (byte1 << 8) | byte0
+    chars = ''
+    for i in range(length):
+        chars += CryptChars[value & 0x3f]
+        value >>= 6
+    return chars
+
+
+def Sha512Crypt(password, salt=DefaultSalt, rounds=DefaultRounds):
+    '''$6$<salt>$<hash> of password'''
+    key = password.encode('utf-8')
+    salt = salt[:16]
+    salt_bytes = salt.encode('utf-8')
+
+    digest_b = hashlib.sha512(key + salt_bytes + key).digest()
+    ctx_a = hashlib.sha512(key + salt_bytes)
+    ctx_a.update((digest_b * (len(key) // 64 + 1))[:len(key)])
+    length = len(key)
+    while length > 0:
+        ctx_a.update(digest_b if length & 1 else key)
+        length >>= 1
+    digest_a = ctx_a.digest()
+
+    digest_dp = hashlib.sha512(key * len(key)).digest()
+    p_bytes = (digest_dp * (len(key) // 64 + 1))[:len(key)]
+    digest_ds = hashlib.sha512(salt_bytes * (16 + digest_a[0])).digest()
+    s_bytes = (digest_ds * (len(salt_bytes) // 64 + 1))[:len(salt_bytes)]
+
+    digest_c = digest_a
+    for i in range(rounds):
+        ctx_c = hashlib.sha512(p_bytes if i & 1 else digest_c)
+        if i % 3:
+            ctx_c.update(s_bytes)
+        if i % 7:
+            ctx_c.update(p_bytes)
+        ctx_c.update(digest_c if i & 1 else p_bytes)
+        digest_c = ctx_c.digest()
+
+    encoded = ''.join(B64From24Bit(digest_c[b2], digest_c[b1], digest_c[b0], 4)
+                      for b2, b1, b0 in Sha512Order)
+    encoded += B64From24Bit(0, 0, digest_c[63], 2)
+    if rounds != DefaultRounds:
+        return '$6$rounds=%s$%s$%s' % (rounds, salt, encoded)
+    return '$6$%s$%s' % (salt, encoded)
+
+
+def HashPassword(password, salt=None):
+    '''Password hash for useradd -p, with the default or a random salt'''
+    if salt is None:
+        salt = RandomSalt() if RandomSaltEnabled() else DefaultSalt
+    return Sha512Crypt(password, salt)
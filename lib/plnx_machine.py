@@ -14,6 +14,8 @@ import logging
 import xilinx_mirrors
 import re
 import project_config
+import rootfs_packages
+import tcl_data
 from post_process_config import GetIPProperty
 
 
@@ -446,7 +448,11 @@ def GeneratePlnxConfig(args, machine_conf_file):
             cmd = 'xsct -sdx -nodisp %s/petalinux_hsm_bridge.tcl -c %s -a u-boot_bsp -hdf %s -o %s -data %s' % \
                 (genmachine_scripts, system_conffile, os.path.abspath(args.hw_file),
                     auto_uboot_dir, os.path.join(genmachine_scripts, 'data'))
-            common_utils.RunCmd(cmd, args.output, shell=True)
+            tcl_env = tcl_data.PrecompileTclData(
+                [(os.path.join(genmachine_scripts, 'data', '%s.yaml' % db), 'simple')
+                 for db in ['processor', 'intc', 'memory', 'serial', 'reset_gpio', 'flash', 'ethernet']],
+                args.output)
+            common_utils.RunCmd(cmd, args.output, extraenv=tcl_env, shell=True, capture=False)
 
     if arch == 'aarch64':
         override_string += '\n# PetaLinux tool Arm-trusted-firmware variables\n'
@@ -742,7 +748,7 @@ def GeneratePlnxConfig(args, machine_conf_file):
     if is_overlay == 'y' and design_name:
         bitfile_name = design_name + '.bit'
 
-    bitfile = glob.glob(os.path.dirname(args.hw_file) + '/*.bit')
+    bitfile = common_utils.GetHwFiles(os.path.dirname(args.hw_file), 'bit', recursive=False)
     extra_files = '%s:config' % os.path.join(args.output, 'config')
     if bitfile:
         extra_files += ' %s:%s' % (bitfile[0], bitfile_name)
@@ -758,13 +764,8 @@ def GeneratePlnxConfig(args, machine_conf_file):
     override_conf_f.close()
 
     # Rootfs configs
-    rfsconfig_py = os.path.join(genmachine_scripts,
-                                'rootfsconfigs/rootfs_config.py')
     rootfs_conffile = os.path.join(args.output, 'rootfs_config')
-    cmd = 'python3 %s --update_cfg %s %s %s' \
-        % (rfsconfig_py, rootfs_conffile,
-           plnx_conf_path, soc_family)
-    common_utils.RunCmd(cmd, args.output, shell=True)
+    rootfs_packages.UpdateCfg(rootfs_conffile, plnx_conf_path, soc_family)
 
     # Update config and rootfs_config file hash if changed
     # This should call end of the script
@@ -13,6 +13,7 @@ import os
 import re
 import yaml
 import common_utils
+import host_ipaddr
 import project_config
 import logging
 
@@ -187,7 +188,6 @@ def GetSysConsoleBootargs(args, system_conffile, soc_family, soc_variant):
 
 
 def PostProcessSysConf(args, system_conffile, ipinfo_file, plnx_syshw_file):
-    genmachine_scripts = project_config.GenMachineScriptsPath()
     import yaml
     global plnx_syshw_data
     global ipinfo_data
@@ -213,8 +213,7 @@ def PostProcessSysConf(args, system_conffile, ipinfo_file, plnx_syshw_file):
             'CONFIG_SUBSYSTEM_NFSROOT_DIR', system_conffile)
         nfsserverip = common_utils.GetConfigValue(
             'CONFIG_SUBSYSTEM_NFSSERVER_IP', system_conffile)
-        cmd = '%s/petalinux-find-ipaddr %s' % (genmachine_scripts, nfsserverip)
-        nfsserverip = common_utils.RunCmd(cmd, args.output, shell=True)[0].strip()
+        nfsserverip = host_ipaddr.FindIpAddr(nfsserverip)
         use_dhcp = common_utils.GetConfigValue(
             'CONFIG_SUBSYSTEM_ETHERNET_%s_USE_DHCP' % ethdevname, system_conffile)
         static_ip = common_utils.GetConfigValue(
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Profile the subcommand with --profile or GEN_MACHINECONF_PROFILE.
+#
+# cprofile: deterministic profile of the main thread, written as
+#           gen-machineconf.prof (pstats) and gen-machineconf.collapsed
+# sampling: ITIMER_PROF stack sampling of all the threads, written as
+#           gen-machineconf.collapsed
+#
+# Both only count the CPU time of this process, the time spent waiting
+# for the external tools is added to the collapsed stacks as
+# '[blocked] <tool>' frames under the RunCmd caller.
+# The collapsed files can be loaded by flamegraph.pl, speedscope or
+# Perfetto.
+
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger('Gen-Machineconf')
+
+Modes = ['cprofile', 'sampling']
+ProfileFile = 'gen-machineconf.prof'
+CollapsedFile = 'gen-machineconf.collapsed'
+# Sampling interval in seconds of process CPU time
+SampleInterval = 0.005
+
+# Active profiling mode, None when not profiling
+Mode = None
+# Collapsed stack -> weight in microseconds
+Stacks = collections.Counter()
+# Reentrant, the sampler signal handler may interrupt a holder
+StacksLock = threading.RLock()
+
+
+def GetMode(mode=None):
+    '''The profiling mode from --profile, or else from the
+    GEN_MACHINECONF_PROFILE environment variable'''
+    if not mode:
+        mode = os.environ.get('GEN_MACHINECONF_PROFILE', '')
+        if mode.lower() in ['', '0', 'no', 'false']:
+            return None
+        if mode.lower() in ['1', 'yes', 'true']:
+            mode = 'cprofile'
+    if mode not in Modes:
+        raise Exception('Invalid profile mode %s, expected one of %s' % (
+            mode, ', '.join(Modes)))
+    return mode
+
+
+def FrameName(code):
+    return '%s (%s:%d)' % (code.co_name, os.path.basename(code.co_filename),
+                           code.co_firstlineno)
+
+
+def CollapseFrame(frame):
+    '''Collapsed stack of a frame, outermost first'''
+    names = []
+    while frame:
+        names.append(FrameName(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def AddBlocked(tool, seconds):
+    '''Called by RunCmdLines, attribute the time blocked on a tool to the
+    stack which ran it'''
+    if not Mode or seconds <= 0:
+        return
+    # Skip this frame, the RunCmdLines generator is kept to show the wait
+    stack = CollapseFrame(sys._getframe(1))
+    with StacksLock:
+        Stacks['%s;[blocked] %s' % (stack, tool)] += int(seconds * 1e6)
+
+
+def _pstats_stacks(stats):
+    '''Approximate collapsed stacks from the cProfile caller/callee
+    totals, the time of a function is split over its callers'''
+    callees = collections.defaultdict(list)
+    for func, (cc, nc, tt, ct, callers) in stats.items():
+        for caller, caller_stats in callers.items():
+            callees[caller].append((func, caller_stats[3]))
+    roots = [func for func, value in stats.items() if not value[4]]
+
+    def name(func):
+        filename, line, funcname = func
+        if filename == '~':
+            return funcname
+        return '%s (%s:%d)' % (funcname, os.path.basename(filename), line)
+
+    def walk(func, path, total, ancestors):
+        cc, nc, tt, ct, callers = stats[func]
+        if ct <= 0 or total <= 0:
+            return
+        path = '%s;%s' % (path, name(func)) if path else name(func)
+        share = min(total / ct, 1.0)
+        Stacks[path] += int(tt * share * 1e6)
+        if len(ancestors) > 200:
+            return
+        for callee, callee_time in callees.get(func, []):
+            if callee not in ancestors:
+                walk(callee, path, callee_time * share, ancestors | {callee})
+
+    for root in roots:
+        walk(root, '', stats[root][3], {root})
+
+
+class _Sampler:
+    '''Sample the stacks of all threads on each ITIMER_PROF tick, which
+    only counts the CPU time of this process'''
+
+    # Frames of threads waiting on a lock, a queue or a selector
+    IdleFrames = [('selectors.py', 'select'), ('threading.py', 'wait'),
+                  ('queue.py', 'get'), ('thread.py', '_worker'),
+                  ('base_events.py', '_run_once')]
+
+    def __init__(self, interval):
+        self.interval = interval
+
+    def idle(self, frame):
+        return (os.path.basename(frame.f_code.co_filename),
+                frame.f_code.co_name) in self.IdleFrames
+
+    def sample(self, signum, frame):
+        weight = int(self.interval * 1e6)
+        current = threading.get_ident()
+        with StacksLock:
+            for ident, thread_frame in sys._current_frames().items():
+                if ident == current:
+                    # The signal interrupted the main thread at frame
+                    thread_frame = frame
+                if thread_frame is None or self.idle(thread_frame):
+                    continue
+                Stacks[CollapseFrame(thread_frame)] += weight
+
+    def start(self):
+        import signal
+        self.previous = signal.signal(signal.SIGPROF, self.sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        import signal
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self.previous)
+
+
+def WriteCollapsed(output):
+    collapsed_file = os.path.join(output, CollapsedFile)
+    with open(collapsed_file, 'w') as collapsed_f:
+        for stack, weight in sorted(Stacks.items()):
+            if weight > 0:
+                collapsed_f.write('%s %d\n' % (stack, weight))
+    return collapsed_file
+
+
+def Profile(mode, output, func, *args, **kwargs):
+    '''Run func under the profiler and write the profile to output'''
+    global Mode
+    Mode = mode
+    Stacks.clear()
+    start = time.monotonic()
+    if mode == 'cprofile':
+        import cProfile
+        import pstats
+        # Thread CPU time, the child processes and waits are not counted
+        profile = cProfile.Profile(time.thread_time)
+        try:
+            ret = profile.runcall(func, *args, **kwargs)
+        finally:
+            Mode = None
+            os.makedirs(output, exist_ok=True)
+            prof_file = os.path.join(output, ProfileFile)
+            profile.dump_stats(prof_file)
+            _pstats_stacks(pstats.Stats(profile).stats)
+            files = [prof_file, WriteCollapsed(output)]
+    else:
+        sampler = _Sampler(SampleInterval)
+        sampler.start()
+        try:
+            ret = func(*args, **kwargs)
+        finally:
+            sampler.stop()
+            Mode = None
+            os.makedirs(output, exist_ok=True)
+            files = [WriteCollapsed(output)]
+    logger.info('Profile (%s, %.2fs) written to %s' % (
+        mode, time.monotonic() - start, ', '.join(files)))
+    return ret
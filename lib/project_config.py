@@ -16,6 +16,7 @@ import common_utils
 import logging
 import glob
 import multiconfigs
+import run_report
 
 logger = logging.getLogger('Gen-Machineconf')
 
@@ -262,12 +263,18 @@ def PrintSystemConfiguration(args, model, device_id, cpu_info_dict=None):
                 cpu, _cpu.replace(',', ' '),
                 cpu_info_dict[cpu].get('core')))
 
+@run_report.Span('Generate configuration')
 def GenerateConfiguration(args, hw_info, system_conffile, plnx_syshw_file, MCObject=None):
     import yocto_machine
     import update_buildconf
 
     logger.info('Generating configuration files')
 
+    if args.petalinux:
+        import xilinx_mirrors
+        # Resolved while the configuration files are generated
+        xilinx_mirrors.StartNetworkProbe(args.output)
+
     MultiConfDict = {}
     GenMultiConf = True
     # Dont re-trigger the multiconfigs if no changes in project file
@@ -294,23 +301,28 @@ def GenerateConfiguration(args, hw_info, system_conffile, plnx_syshw_file, MCObj
                 args, hw_info['multiconfigs'], system_conffile=system_conffile)
 
         if MCObject:
-            MultiConfDict = MCObject.GenerateMultiConfigs()
+            with run_report.Span('Multiconfigs'):
+                MultiConfDict = MCObject.GenerateMultiConfigs()
 
     if args.petalinux:
         # Layers should be added before generating machine conf files
-        update_buildconf.AddUserLayers(args)
+        with run_report.Span('Add user layers'):
+            update_buildconf.AddUserLayers(args)
 
-    machine_conf_file = yocto_machine.GenerateYoctoMachine(
-        args, system_conffile, plnx_syshw_file, MultiConfDict)
+    with run_report.Span('Machine conf'):
+        machine_conf_file = yocto_machine.GenerateYoctoMachine(
+            args, system_conffile, plnx_syshw_file, MultiConfDict)
 
     if args.petalinux:
         import plnx_machine
 
-        plnx_conf_file = plnx_machine.GeneratePlnxConfig(
-            args, machine_conf_file)
-        update_buildconf.UpdateLocalConf(
-            args, plnx_conf_file, machine_conf_file)
+        with run_report.Span('PetaLinux conf'):
+            plnx_conf_file = plnx_machine.GeneratePlnxConfig(
+                args, machine_conf_file)
+            update_buildconf.UpdateLocalConf(
+                args, plnx_conf_file, machine_conf_file)
 
-    update_buildconf.GenLocalConf(args.localconf,
-                                  machine_conf_file,
-                                  system_conffile, args.petalinux)
+    with run_report.Span('Local conf'):
+        update_buildconf.GenLocalConf(args.localconf,
+                                      machine_conf_file,
+                                      system_conffile, args.petalinux)
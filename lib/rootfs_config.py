@@ -12,6 +12,8 @@
 import os
 import common_utils
 import project_config
+import rootfs_packages
+import update_buildconf
 import logging
 
 logger = logging.getLogger('Gen-Machineconf')
@@ -45,8 +47,6 @@ def GenRootfsConfig(args, system_conffile):
                                     'rootfsconfigs/rootfsconfig_%s' % args.soc_family)
     template_Kconfig = os.path.join(genmachine_scripts,
                                     'rootfsconfigs/Kconfig-%s.part' % arch)
-    rfsconfig_py = os.path.join(genmachine_scripts,
-                                'rootfsconfigs/rootfs_config.py')
     if args.add_rootfsconfig:
         user_cfg = os.path.realpath(args.add_rootfsconfig)
     else:
@@ -62,7 +62,7 @@ def GenRootfsConfig(args, system_conffile):
     rfsKconfig_user = os.path.join(rootfs_cfgdir, 'Kconfig.user')
     rootfs_Kconfig = os.path.join(rootfs_cfgdir, 'Kconfig')
 
-    for file_path in [template_rfsfile, template_Kconfig, rfsconfig_py]:
+    for file_path in [template_rfsfile, template_Kconfig]:
         if not os.path.isfile(file_path):
             raise Exception('%s is not found in tool' % file_path)
 
@@ -71,13 +71,16 @@ def GenRootfsConfig(args, system_conffile):
     if not os.path.isfile(rfsKconfig_part):
         common_utils.CopyFile(template_Kconfig, rfsKconfig_part)
     common_utils.CopyFile(user_cfg, rootfs_cfgdir)
-    # No need to run if user_rootfsconfig doesnot changes
+    # The package sections and summaries come from the user layers
+    user_layers = ' '.join(update_buildconf.GetUserLayers(args, system_conffile))
+    statistics_file = os.path.join(args.output, '.statistics')
+    layers_changed = common_utils.GetConfigValue('USER_RFS_LAYERS', statistics_file) != user_layers
+    # No need to run if user_rootfsconfig and the user layers do not change
     if not common_utils.ValidateHashFile(args.output, 'USER_RFS_CFG', user_cfg) or \
-            not os.path.exists(rfsKconfig_user):
+            layers_changed or not os.path.exists(rfsKconfig_user):
         logger.info('Generating kconfig for rootfs')
-        cmd = 'python3 %s --generate_kconfig %s %s' \
-            % (rfsconfig_py, user_cfg, rootfs_cfgdir)
-        common_utils.RunCmd(cmd, args.output, shell=True)
+        rootfs_packages.GenerateKconfig(user_cfg, rootfs_cfgdir, user_layers)
+        common_utils.UpdateConfigValue('USER_RFS_LAYERS', '"%s"' % user_layers, statistics_file)
     rfsKconfig_str = Kconfig_arch.format(args.soc_family)
     if args.hw_flow == 'sdt':
         rfsKconfig_str += Kconfig_sdt
@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2021-2022, Xilinx, Inc.  All rights reserved.
+# Copyright (C) 2022-2026, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Rootfs package menu (Kconfig.user) generation from a user-rootfsconfig
+# and conversion of the rootfs_config into bitbake variables, used in
+# process by rootfs_config/plnx_machine and by the
+# gen-machine-scripts/rootfsconfigs/rootfs_config.py command line.
+
+import getopt
+import logging
+import os
+import passwd_hash
+import re
+import sys
+
+logger = logging.getLogger('Gen-Machineconf')
+
+# Recipe variables indexed from the layers, read in one pass per recipe
+RecipeVars = ['SUMMARY', 'SECTION', 'LICENSE', 'DESCRIPTION']
+RecipePrefixes = tuple('%s =' % var for var in RecipeVars)
+RecipeSuffixes = ('.bb', '.inc', '.bbclass')
+# {layer realpath: {'dirs': {dir: mtime}, 'recipes': [file, ...],
+#                   'files': {file: [mtime, size, {var: value}]}}}
+LayerIndexes = {}
+LayerIndexLoaded = False
+LayerIndexVersion = 1
+LayerIndexFile = None
+if os.environ.get('BUILDDIR'):
+    LayerIndexFile = os.path.join(os.environ['BUILDDIR'], 'cache',
+                                  'gen-machineconf-layers.json')
+
+
+def fix_kconfig_name(packg):
+    plus_str = re.escape("+")
+    if (re.search(plus_str, packg)):
+        packg = str(packg)
+        packg = re.sub(plus_str, "PLUS", packg)
+    return packg
+
+
+def fix_config_name(packg):
+    plus_str = re.escape("PLUS")
+    if (re.search(plus_str, packg)):
+        packg = str(packg)
+        packg = re.sub(plus_str, "+", packg)
+    return packg
+
+
+def write_list(bb_file, packages):
+    for package in packages:
+        package = "\t\t" + package + " " + "\\" + "\n"
+        bb_file.write(package)
+    bb_file.write('\t\t"\n')
+
+
+def ScanRecipe(filename):
+    '''The RecipeVars assignments of a .bb/.inc/.bbclass file, the last
+    assignment of a variable wins'''
+    values = {}
+    with open(filename, 'r', errors='replace') as files_bb:
+        for line in files_bb:
+            if line.startswith(RecipePrefixes):
+                var = line.split(' ', 1)[0]
+                line = re.sub('"|\n', '', line)
+                values[var] = line.split('=')[1].strip()
+    return values
+
+
+def LayerHead(layer):
+    '''Directory mtimes of layer, the recipe list is reused while they
+    are unchanged'''
+    dirs = {}
+    for dirpath in LayerIndexes.get(layer, {}).get('dirs', {}):
+        try:
+            dirs[dirpath] = os.stat(dirpath).st_mtime_ns
+        except OSError:
+            return None
+    return dirs
+
+
+def ScanLayer(layer):
+    '''Update the index of layer, only the recipes whose mtime or size
+    changed since the last scan are read'''
+    index = LayerIndexes.setdefault(layer, {'dirs': {}, 'recipes': [], 'files': {}})
+    if not index['dirs'] or LayerHead(layer) != index['dirs']:
+        index['dirs'] = {}
+        index['recipes'] = []
+        for root, directories, files in os.walk(layer):
+            index['dirs'][root] = os.stat(root).st_mtime_ns
+            for filename in files:
+                if filename.endswith(RecipeSuffixes):
+                    index['recipes'].append(os.path.join(root, filename))
+    files = {}
+    to_read = []
+    for recipe in index['recipes']:
+        try:
+            st = os.stat(recipe)
+        except OSError:
+            continue
+        entry = index['files'].get(recipe)
+        if entry and entry[:2] == [st.st_mtime_ns, st.st_size]:
+            files[recipe] = entry
+        else:
+            files[recipe] = [st.st_mtime_ns, st.st_size, {}]
+            to_read.append(recipe)
+    if len(to_read) > 64:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor() as executor:
+            scanned = list(executor.map(ScanRecipe, to_read))
+    else:
+        scanned = [ScanRecipe(recipe) for recipe in to_read]
+    for recipe, values in zip(to_read, scanned):
+        files[recipe][2] = values
+    logger.debug('Indexed %s of %s recipes in %s' % (len(to_read), len(files), layer))
+    changed = bool(to_read) or files.keys() != index['files'].keys()
+    index['files'] = files
+    return changed
+
+
+def LoadLayerIndex():
+    global LayerIndexLoaded
+    LayerIndexLoaded = True
+    if not LayerIndexFile or not os.path.isfile(LayerIndexFile):
+        return
+    import json
+    try:
+        with open(LayerIndexFile, 'r') as index_f:
+            index = json.load(index_f)
+        if index.get('version') == LayerIndexVersion:
+            LayerIndexes.update(index['layers'])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+
+def SaveLayerIndex():
+    if not LayerIndexFile:
+        return
+    import json
+    try:
+        os.makedirs(os.path.dirname(LayerIndexFile), exist_ok=True)
+        tmp_file = '%s.%s' % (LayerIndexFile, os.getpid())
+        with open(tmp_file, 'w') as index_f:
+            json.dump({'version': LayerIndexVersion, 'layers': LayerIndexes}, index_f)
+        os.replace(tmp_file, LayerIndexFile)
+    except Exception as e:
+        logger.debug('Unable to write the layer index %s: %s' % (LayerIndexFile, e))
+
+
+def GetLayerValues(Layers):
+    '''{variable: {recipe name: value}} of the RecipeVars over Layers,
+    from the layer index'''
+    if not LayerIndexLoaded:
+        LoadLayerIndex()
+    layer_values = {var: {} for var in RecipeVars}
+    changed = False
+    for layer in Layers:
+        if not layer or not os.path.isdir(layer):
+            continue
+        layer = os.path.realpath(layer)
+        changed = ScanLayer(layer) or changed
+        for recipe in LayerIndexes[layer]['recipes']:
+            if recipe not in LayerIndexes[layer]['files']:
+                continue
+            strg = re.sub(r'\.bb$|\.inc$|\.bbclass$', '', os.path.basename(recipe))
+            strg = strg.split('_')[0]
+            for var, value in LayerIndexes[layer]['files'][recipe][2].items():
+                layer_values[var][strg] = value
+    if changed:
+        SaveLayerIndex()
+    return layer_values
+
+
+def read_lines(filename):
+    '''The lines of filename as the one element lists the parsers expect'''
+    with open(filename, 'r') as fp:
+        return [line.splitlines() for line in fp]
+
+
+class RootfsPackages:
+    '''The packages of a user-rootfsconfig and of a rootfs_config'''
+
+    def __init__(self, user_layer=''):
+        self.user_layer = user_layer
+        self.packages_dict = {}
+        self.packages_section = {}
+        self.summary_dict = {}
+        self.sections_dict = {}
+        self.config_lines = []
+
+    def ExtractBBLayers(self):
+        # user_layer is a layer path or a space separated list of them
+        layer_values = GetLayerValues(self.user_layer.split())
+        self.summary_dict = layer_values['SUMMARY']
+        self.sections_dict = layer_values['SECTION']
+
+    def ExtractPackages(self, packages_user):
+        '''Read the CONFIG_<package> entries of a user-rootfsconfig'''
+        self.packages_dict = {}
+        for line in read_lines(packages_user):
+            line_str = str(line)
+            if (re.search("CONFIG_", line_str)):
+                packg = line_str.split("_")[1]
+                packg = packg.split("'")[0]
+                # getting the packages
+                self.packages_dict[packg] = [packg]
+        self.ParsePackagesToSections()
+
+    def ParsePackagesToSections(self):
+        packages_section = self.packages_section = {}
+        my_regx = re.escape("/")
+        for packg in sorted(self.packages_dict):
+            if packg in self.sections_dict:
+                section_value = self.sections_dict[packg]
+                if (re.search(my_regx, section_value)):
+                    string0 = section_value.split('/')[0]
+                    string1 = section_value.split('/')[1]
+                    packages_section.setdefault(string0, {}).setdefault(string1, []).append(packg)
+                else:
+                    packages_section.setdefault(section_value, {})[packg] = []
+            else:
+                section_value = "misc"
+                if re.search('^lib', packg):
+                    section_value = "libs"
+                packages_section.setdefault(section_value, {})[packg] = []
+
+    def KconfigMenu(self, packg):
+        line = ""
+        for sub_packg in self.packages_dict.get(packg, []):
+            line += "config " + fix_kconfig_name(sub_packg) + "  \n"
+            line += "\t bool \"" + sub_packg + "\"\n"
+            line += "\t help\n"
+            if sub_packg in self.summary_dict:
+                line += "\t" + self.summary_dict[sub_packg] + "\n"
+            line += "\t\n"
+        return line
+
+    def KconfigPart(self, section_key):
+        kconfig = ''
+        for sub_section_key in sorted(self.packages_section[section_key]):
+            if self.packages_section[section_key][sub_section_key]:
+                kconfig += "menu \"" + sub_section_key + " \" \n"
+                for packg in self.packages_section[section_key][sub_section_key]:
+                    kconfig += self.KconfigMenu(packg)
+                kconfig += "endmenu\n"
+            else:
+                kconfig += self.KconfigMenu(str(sub_section_key))
+        return kconfig
+
+    def Kconfig(self):
+        '''Kconfig.user contents, the PETALINUX section first and the
+        others in a user packages menu'''
+        kconfig = ''
+        for section_key in sorted(self.packages_section):
+            if section_key == "PETALINUX":
+                kconfig += self.KconfigPart(section_key)
+        kconfig += "menu \"" + "user packages" + " \" \n"
+        for section_key in sorted(self.packages_section):
+            if section_key != "PETALINUX":
+                kconfig += self.KconfigPart(section_key)
+        kconfig += "endmenu\n"
+        return kconfig
+
+    def ReadConfig(self, config_file):
+        self.config_lines = read_lines(config_file)
+
+    def ReadPackages(self, xilinx_arch):
+        packages = {}
+        packages['image_features'] = []
+        for line in self.config_lines:
+            line_str = str(line)
+            if re.search("#|\n", line_str):
+                continue
+            elif re.search("ADD_EXTRA_USERS", line_str):
+                extra_users = line_str.split('=')[1]
+                packages['extra_users'] = re.sub(
+                    r'"|\]|\\', r'', extra_users).rstrip("'")
+            elif re.search("CREATE_NEW_GROUPS", line_str):
+                new_groups = line_str.split('=')[1]
+                packages['new_groups'] = re.sub(
+                    r'"|\]|\\', r'', new_groups).rstrip("'")
+            elif re.search("ADD_USERS_TO_GROUPS", line_str):
+                users_groups = line_str.split('=')[1]
+                packages['users_groups'] = re.sub(
+                    r'"|\]|\\', r'', users_groups).rstrip("'")
+            elif re.search("ADD_USERS_TO_SUDOERS", line_str):
+                sudo_users = line_str.split('=')[1]
+                packages['sudo_users'] = re.sub(
+                    r'"|\]|\\', r'', sudo_users).rstrip("'")
+            elif re.search("package-feed-uris", line_str):
+                package_feeds = line_str.split('=')[1]
+                packages['package_feeds'] = re.sub(
+                    r'"|\]|\\', r'', package_feeds).rstrip("'").rstrip('/')
+            elif re.search("package-feed-archs", line_str):
+                package_feed_archs = line_str.split('=')[1]
+                packages['package_feed_archs'] = re.sub(
+                    r'"|\]|\\', r'', package_feed_archs).rstrip("'")
+            else:
+                if re.search(r"=y'\]", line_str):
+                    line_str = line_str.split('_')[1]
+                    line_str = line_str.split('=')[0]
+                    line_str = fix_config_name(line_str)
+                    if re.search("inherit-", line_str):
+                        line_str = line_str.replace('inherit-', '')
+                        line_str = line_str.replace('-', '_')
+                        packages.setdefault('inherit_packages',
+                                            []).append(line_str)
+                    if re.search("imageclass-", line_str):
+                        line_str = line_str.replace('imageclass-', '')
+                        line_str = line_str.replace('-', '_')
+                        packages.setdefault('image_classes', []).append(line_str)
+                    elif re.search("mali-backend-", line_str):
+                        line_str = line_str.replace('mali-backend-', '')
+                        packages['mali_backend'] = line_str
+                    elif re.search("Init-manager-", line_str):
+                        line_str = line_str.replace('Init-manager-', '')
+                        packages['Init_manager'] = line_str
+                    elif re.search("default-tune-", line_str):
+                        line_str = line_str.replace('default-tune-', '')
+                        packages['default_tune'] = line_str
+                    elif re.search("imagefeature-", line_str):
+                        line_str = line_str.replace('imagefeature-', '')
+                        packages.setdefault('image_features', []).append(line_str)
+                    elif re.match("system-" + xilinx_arch, line_str) or re.match("subsystem-sdt-flow", line_str):
+                        # do nothing, skipp the package name with "system-<xilinx_arch>". Using to find system type
+                        # do nothing, skipp the package name with "subsystem-sdt-flow". Using to find system type
+                        continue
+                    else:
+                        packages.setdefault('image_packages', []).append(line_str)
+        return packages
+
+    def AddUserParams(self, packages, bb_file):
+        extra_users = packages['extra_users']
+        new_groups = packages['new_groups']
+        image_features = packages['image_features']
+        users_groups = packages['users_groups']
+        user_params = ""
+        groups = {}
+        # Parse the user group and create list for it.
+        # Ex: groups[user] = "group1,group2"
+        if users_groups != "":
+            for user_groups in users_groups.split(";"):
+                if re.search(':', user_groups) and user_groups != "":
+                    user_groups = user_groups.split(":")
+                    groups[user_groups[0]] = user_groups[1]
+        if new_groups != "":
+            for group in new_groups.split(";"):
+                if group:
+                    user_params += 'groupadd -r %s;' % (group)
+
+        if extra_users != "":
+            for param in extra_users.split(";"):
+                if re.search(':', param) and param != "":
+                    param = param.split(":")
+                    # param[0]=userid
+                    # param[1]=passwd
+                    # param[2]=passwd-expire
+                    usercmd = "useradd"
+                    if param[0] == "root":
+                        if not 'debug-tweaks' in image_features:
+                            continue
+                        if param[1] == "root":
+                            logger.warning(
+                                "Root password set to 'root', It is highly recommended to change Root password.")
+                        usercmd = "usermod"
+
+                    if param[1]:
+                        param[1] = passwd_hash.HashPassword(param[1]).replace('$', r'\$')
+                        param[1] = " -p '" + param[1] + "'"
+                    else:
+                        param[1] = " -p ''"
+
+                    av_param = ''
+                    param_str = ''
+                    # Add groups if given for specific user
+                    if param[0] in groups and groups[param[0]]:
+                        for group in groups[param[0]].split(","):
+                            if group:
+                                av_param += 'usermod -a -G ' + \
+                                    group + ' ' + param[0] + ';'
+
+                    # Check the count for passwd-expire
+                    if len(param) == 2:
+                        param_str = usercmd + \
+                            param[1] + ' ' + param[0] + ';' + av_param + ' \\\n'
+                    elif len(param) == 3:
+                        param_str = usercmd + \
+                            param[1] + ' ' + param[0] + ';' + param[2] + \
+                            ' ' + param[0] + ';' + av_param + ' \\\n'
+                    else:
+                        pass
+                    user_params += param_str
+        user_params = 'EXTRA_USERS_PARAMS = "' + user_params + '"\n'
+        bb_file.write(user_params)
+
+    def UpdateCfg(self, cfg_file, xilinx_arch):
+        '''Append the rootfs bitbake variables to cfg_file'''
+        packages = self.ReadPackages(xilinx_arch)
+        with open(cfg_file, 'a') as cfg_file:
+            cfg_file.write('\n#Rootfs configs\n')
+            # Add inherit packages into bb file
+            inherit_str = 'INHERIT += "plnx-deploy extrausers'
+            if 'inherit_packages' in packages.keys():
+                inherit_str = inherit_str + ' '.join(packages['inherit_packages'])
+            inherit_str = inherit_str + '" \n'
+            cfg_file.write(inherit_str)
+
+            # Add image inherit packages
+            if 'image_classes' in packages.keys():
+                image_class = '\nIMAGE_CLASSES += "' + \
+                    ' '.join(packages['image_classes']) + '"\n'
+                cfg_file.write(image_class)
+
+            # Add Init_manager variable
+            if 'Init_manager' in packages.keys():
+                init_managerstr = 'INIT_MANAGER_DEFAULT = "' + \
+                    packages['Init_manager'] + '"\n\n'
+                cfg_file.write(init_managerstr)
+            init_manager = packages['Init_manager']
+            if xilinx_arch in ('zynqmp', 'versal', 'versal-2ve-2vm'):
+                if init_manager == 'sysvinit':
+                    unlock_sstates = 'SIGGEN_LOCKEDSIGS_TYPES = ""\n'
+                    cfg_file.write(unlock_sstates)
+            elif xilinx_arch in ('zynq', 'microblaze'):
+                if init_manager == 'systemd':
+                    unlock_sstates = 'SIGGEN_LOCKEDSIGS_TYPES = ""\n'
+                    cfg_file.write(unlock_sstates)
+            # Add Tune_feature variable
+            if 'default_tune' in packages.keys():
+                default_tunestr = 'DEFAULTTUNE = "cortexa72-cortexa53-crypto"\n'
+                cfg_file.write(default_tunestr)
+            # Add common features into bb file
+            if 'image_features' in packages.keys():
+                cfg_file.write('COMMON_FEATURES:pn-petalinux-image-minimal = "\\\n')
+                write_list(cfg_file, packages['image_features'])
+            cfg_file.write('IMAGE_LINGUAS:' + xilinx_arch + ' = " "\n\n')
+            # Add image install packages into bb file
+            cfg_file.write('IMAGE_INSTALL:pn-petalinux-image-minimal = "\\\n')
+            cfg_file.write("\t\tkernel-modules \\\n")
+            write_list(cfg_file, packages['image_packages'])
+            if 'package_feeds' in packages.keys() and packages['package_feeds']:
+                package_feedstr = 'PACKAGE_FEED_URIS = "' + \
+                    packages['package_feeds'] + '"\n\n'
+                cfg_file.write(package_feedstr)
+            if 'package_feed_archs' in packages.keys() and packages['package_feed_archs']:
+                package_feed_archsstr = 'PACKAGE_FEED_ARCHS = "' + \
+                    packages['package_feed_archs'] + '"\n\n'
+                cfg_file.write(package_feed_archsstr)
+            self.AddUserParams(packages, cfg_file)
+            sudo_users_str = ''
+            sudo_users_pre = 'USERADDEXTENSION:append = " plnx-useradd-sudoers"\n'
+            for user in packages['sudo_users'].split():
+                sudo_users_str += user + ' ALL=(ALL) ALL;'
+            sudo_users_str = sudo_users_pre + 'EXTRA_USERS_SUDOERS = "' + sudo_users_str + '"\n'
+            cfg_file.write(sudo_users_str)
+            if 'mali_backend' in packages.keys():
+                mali_backendstr = 'MALI_BACKEND_DEFAULT = "' + \
+                    packages['mali_backend'] + '"\n\n'
+                cfg_file.write(mali_backendstr)
+
+
+def GenerateKconfig(packages_user, kconf_file_path, user_layer=''):
+    '''Write Kconfig.user for a user-rootfsconfig into kconf_file_path,
+    with the package sections and summaries of the user_layer layers'''
+    rootfs_packages = RootfsPackages(user_layer)
+    rootfs_packages.ExtractBBLayers()
+    rootfs_packages.ExtractPackages(packages_user)
+    with open(os.path.join(kconf_file_path, 'Kconfig.user'), 'w') as kconf_file:
+        kconf_file.write(rootfs_packages.Kconfig())
+
+
+def UpdateCfg(config, cfg_file, xilinx_arch):
+    '''Append the bitbake variables for the rootfs config to cfg_file'''
+    rootfs_packages = RootfsPackages()
+    rootfs_packages.ReadConfig(config)
+    rootfs_packages.UpdateCfg(cfg_file, xilinx_arch)
+
+
+def parse_args(argv):
+    try:
+        opts, args = getopt.getopt(
+            argv, "hk:b:", ["generate_kconfig=", "update_cfg="])
+    except getopt.GetoptError:
+        print('ERROR: valid options --generate_kconfig or --update_cfg')
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print('HELP: ')
+            print(
+                "Usage: python3 rootfs_config.py --generate_kconfig <user_rootfsconfig> <Kconfig Out path>")
+            print(
+                "Usage: python3 rootfs_config.py --update_cfg config <cfg_file> <xilinx_arch>")
+            sys.exit()
+        elif opt in ("-k", "--generate_kconfig"):
+            user_layer = ''
+            if len(argv) > 3:
+                user_layer = argv[3]
+            GenerateKconfig(argv[1], argv[2], user_layer)
+        elif opt in ("-b", "--update_cfg"):
+            UpdateCfg(argv[1], argv[2], argv[3])
+        else:
+            print("Error:")
+            print(
+                "Usage: python3 rootfs_config.py --generate_kconfig <user_rootfsconfig> <Kconfig Out path>")
+            print(
+                "Usage: python3 rootfs_config.py --generate_bb config <cfg_file> <xilinx_arch>")
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Timing of the run phases and external tools, written to
+# <output>/gen-machineconf-timing.json at the end of the run.
+
+import collections
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger('Gen-Machineconf')
+
+ReportFile = 'gen-machineconf-timing.json'
+# Output directory of the report, set once the output is known
+Output = None
+# Print the summary table at the end of the run (--timings)
+ShowSummary = False
+# Chrome trace file to write at the end of the run (--trace)
+TraceFile = None
+
+StartTime = time.monotonic()
+# Finished spans in the order they completed
+Spans = []
+# Instant events (file writes, log messages) recorded while tracing
+Events = []
+Counters = collections.Counter()
+CounterLock = threading.Lock()
+_local = threading.local()
+
+
+def _stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+def AddSpan(name, category, start, duration, **attrs):
+    '''Record a span which was timed by the caller'''
+    stack = _stack()
+    Spans.append(dict(attrs, name=name, category=category,
+                      start=start - StartTime, duration=duration,
+                      thread=threading.get_ident(), depth=len(stack),
+                      thread_name=threading.current_thread().name,
+                      parent=stack[-1].name if stack else None))
+
+
+def AddEvent(name, category, **attrs):
+    '''Record an instant event, only kept while tracing'''
+    if TraceFile:
+        Events.append(dict(attrs, name=name, category=category,
+                           start=time.monotonic() - StartTime,
+                           thread=threading.get_ident(),
+                           thread_name=threading.current_thread().name))
+
+
+class Span:
+    '''Time a phase of the run, usable as a context manager or decorator'''
+
+    def __init__(self, name, category='phase', **attrs):
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.start = time.monotonic()
+        _stack().append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _stack().pop()
+        if exc_type:
+            self.attrs['failed'] = True
+        AddSpan(self.name, self.category, self.start,
+                time.monotonic() - self.start, **self.attrs)
+        return False
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with Span(self.name, self.category, **self.attrs):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def Count(name, value=1):
+    '''Increment a run counter: subprocesses, cache hits, bytes read'''
+    with CounterLock:
+        Counters[name] += value
+
+
+def ToolSummary():
+    tools = {}
+    for span in Spans:
+        if span['category'] != 'tool':
+            continue
+        tool = tools.setdefault(span['name'], {'count': 0, 'wall': 0.0,
+                                               'user': 0.0, 'sys': 0.0})
+        tool['count'] += 1
+        tool['wall'] += span['duration']
+        tool['user'] += span.get('user', 0.0)
+        tool['sys'] += span.get('sys', 0.0)
+    return tools
+
+
+def WriteReport(output):
+    '''Write the json run report into the output directory'''
+    report = {
+        'command': sys.argv,
+        'total': time.monotonic() - StartTime,
+        'phases': [span for span in Spans if span['category'] != 'tool'],
+        'tools': ToolSummary(),
+        'commands': [span for span in Spans if span['category'] == 'tool'],
+        'counters': dict(Counters),
+    }
+    report_file = os.path.join(output, ReportFile)
+    with open(report_file, 'w') as report_f:
+        json.dump(report, report_f, indent=2)
+    logger.debug('Timing report written to %s' % report_file)
+    return report_file
+
+
+def PrintSummary():
+    total = time.monotonic() - StartTime
+    logger.plain('\nTiming summary (%.2fs total)' % total)
+    logger.plain('%-40s %10s %7s' % ('Phase', 'Seconds', '%'))
+    for span in sorted([span for span in Spans if span['category'] != 'tool'],
+                       key=lambda span: span['start']):
+        name = '  ' * span['depth'] + span['name']
+        logger.plain('%-40s %10.2f %6.1f%%' % (name, span['duration'],
+                                              100 * span['duration'] / total))
+    tools = ToolSummary()
+    if tools:
+        logger.plain('\n%-22s %6s %10s %10s %10s' % ('Tool', 'Runs', 'Wall', 'User', 'Sys'))
+        for name, tool in sorted(tools.items(), key=lambda item: -item[1]['wall']):
+            logger.plain('%-22s %6d %10.2f %10.2f %10.2f' % (
+                name, tool['count'], tool['wall'], tool['user'], tool['sys']))
+    if Counters:
+        logger.plain('')
+        for name, value in sorted(Counters.items()):
+            logger.plain('%-40s %10s' % (name, value))
+
+
+def Finish():
+    '''Write the report and print the summary, called at exit'''
+    if Output and os.path.isdir(Output):
+        WriteReport(Output)
+    if TraceFile:
+        WriteTrace(TraceFile)
+    if ShowSummary:
+        PrintSummary()
+
+
+def _audit_hook(event, args):
+    # Must not open files or log from here
+    if event != 'open' or not TraceFile:
+        return
+    path, mode, flags = args
+    if mode:
+        write = any(char in mode for char in 'wax+')
+    else:
+        write = bool(flags & (os.O_WRONLY | os.O_RDWR))
+    if write and isinstance(path, (str, bytes)):
+        path = os.fsdecode(path)
+        if path != TraceFile:
+            AddEvent(os.path.basename(path), 'write', path=path)
+
+
+def StartTrace(filename):
+    '''Record the file writes and write a Chrome trace to filename at exit'''
+    global TraceFile
+    if TraceFile:
+        return
+    TraceFile = os.path.realpath(filename)
+    # Audit hooks can not be removed, TraceFile disables it
+    sys.addaudithook(_audit_hook)
+
+
+def WriteTrace(filename):
+    '''Write the spans and events in the Chrome trace event format, which
+    is loaded by chrome://tracing and Perfetto'''
+    pid = os.getpid()
+    tids = {}
+    events = []
+
+    def tid(record):
+        if record['thread'] not in tids:
+            tids[record['thread']] = len(tids) + 1
+            events.append({'ph': 'M', 'name': 'thread_name', 'pid': pid,
+                           'tid': tids[record['thread']],
+                           'args': {'name': record['thread_name']}})
+        return tids[record['thread']]
+
+    skip = ('name', 'category', 'start', 'duration', 'thread', 'thread_name')
+    for span in sorted(Spans, key=lambda span: span['start']):
+        events.append({'ph': 'X', 'name': span['name'], 'cat': span['category'],
+                       'ts': span['start'] * 1e6, 'dur': span['duration'] * 1e6,
+                       'pid': pid, 'tid': tid(span),
+                       'args': {k: v for k, v in span.items() if k not in skip}})
+    for event in list(Events):
+        events.append({'ph': 'i', 's': 't', 'name': event['name'],
+                       'cat': event['category'], 'ts': event['start'] * 1e6,
+                       'pid': pid, 'tid': tid(event),
+                       'args': {k: v for k, v in event.items() if k not in skip}})
+    events.append({'ph': 'M', 'name': 'process_name', 'pid': pid,
+                   'args': {'name': 'gen-machine-conf'}})
+    with open(filename, 'w') as trace_f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms',
+                   'otherData': {'command': sys.argv}}, trace_f)
+    logger.info('Trace written to %s' % filename)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Precompile the yaml files read by the xsct Tcl scripts into Tcl files
+# they source in one read, see gen-machine-scripts/libs/precompiled_data.tcl.
+#
+# The Tcl parsers build their data with string appends, regexps and eval
+# for every line on every xsct launch. The same data is generated here,
+# following each parser, and only regenerated when the sha256 of the
+# yaml changes:
+#   list:   get_ipinfo of hw-description.tcl
+#   dict:   get_ipinfo of petalinux_hsm.tcl
+#   simple: simple_yaml_parser of libs/simple_yaml_parser.tcl
+# Files with Tcl special characters are left to the Tcl parsers.
+
+import hashlib
+import logging
+import os
+import re
+
+logger = logging.getLogger('Gen-Machineconf')
+
+TclDataVersion = 1
+TclDataEnv = 'GEN_MACHINECONF_TCL_DATA'
+# Characters the Tcl parsers would substitute or quote
+TclSpecialChars = re.compile(r'[][{}$\\";]')
+KeyLine = re.compile(r'^(    )*[A-Za-z0-9_]+:')
+
+
+def CommentLine(line):
+    # "^\s+#.*" is "^s+#.*" once Tcl substituted the backslash
+    return re.match('^#', line) or re.match('^s+#', line)
+
+
+def CheckLine(yaml_file, linenum, line):
+    if TclSpecialChars.search(line):
+        raise Exception('%s:%s has Tcl special characters' % (yaml_file, linenum))
+
+
+def CompileList(yaml_file, lines):
+    '''The ip list string built by get_ipinfo of hw-description.tcl'''
+    data = ''
+    previous_indent_level = -1
+    for linenum, line in enumerate(lines, 1):
+        if CommentLine(line) or not line.strip():
+            continue
+        if KeyLine.match(line):
+            CheckLine(yaml_file, linenum, line)
+            tmpline = line.strip().replace(':', ' ')
+            indent_level = len(re.findall('    ', line))
+            if indent_level < previous_indent_level:
+                data += '}' * (previous_indent_level - indent_level + 1)
+                data += ' {' + tmpline
+            elif indent_level > previous_indent_level:
+                if indent_level - previous_indent_level > 1:
+                    raise Exception('Wrong indentation in line %s of %s' % (linenum, yaml_file))
+                data += ' {' + tmpline
+            else:
+                data += '} {' + tmpline
+            previous_indent_level = indent_level
+    data += '}' * (previous_indent_level + 1)
+    return 'set plnx_precompiled_data {%s}\n' % data
+
+
+def CompileDict(yaml_file, lines):
+    '''The dict set commands get_ipinfo of petalinux_hsm.tcl runs'''
+    cmds = 'set plnx_precompiled_data [dict create]\n'
+    key = []
+    for linenum, line in enumerate(lines, 1):
+        if CommentLine(line) or not line.strip():
+            continue
+        if KeyLine.match(line):
+            CheckLine(yaml_file, linenum, line)
+            trimline = line.strip()
+            tmpkey = trimline.split(':')[0]
+            tmpval = re.sub(tmpkey + ':', '', trimline, count=1).strip()
+            tmpkey = tmpkey.strip()
+            indent_level = len(re.findall('    ', line))
+            key = key[:indent_level] + [tmpkey]
+            if tmpval != '':
+                cmds += 'dict set plnx_precompiled_data {%s} {%s}\n' % (' '.join(key), tmpval)
+    return cmds
+
+
+def CompileSimple(yaml_file, lines):
+    '''The dict set commands simple_yaml_parser evaluates'''
+    cmds = 'set plnx_precompiled_data [dict create]\n'
+    data_depths = {}
+    for linenum, line in enumerate(lines, 1):
+        if CommentLine(line) or line == '':
+            continue
+        CheckLine(yaml_file, linenum, line)
+        data = re.split('[@ ]', line.replace('    ', '-~#%@'))
+        data_depth = data.count('-~#%')
+        if data_depth >= len(data) or not data[data_depth]:
+            raise Exception('%s:%s has no key' % (yaml_file, linenum))
+        data_depths[data_depth] = data[data_depth]
+        if data_depth == 0:
+            continue
+        try:
+            eval_dict_arg = ' '.join(data_depths[depth] for depth in range(data_depth + 1))
+        except KeyError:
+            raise Exception('%s:%s has no parent key' % (yaml_file, linenum))
+        eval_dict_arg = eval_dict_arg.replace(':', '')
+        value = ' '.join(data[data_depth + 1:]).strip()
+        if value == '':
+            continue
+        cmds += 'dict set plnx_precompiled_data %s {%s}\n' % (eval_dict_arg, value)
+    return cmds
+
+
+Compilers = {
+    'list': CompileList,
+    'dict': CompileDict,
+    'simple': CompileSimple,
+}
+
+
+def PrecompileYaml(yaml_file, kind, data_dir):
+    '''Write the <yaml>.<kind>.tcl data of yaml_file to data_dir when its
+    hash changed'''
+    yaml_file = os.path.realpath(yaml_file)
+    with open(yaml_file, 'rb') as yaml_f:
+        content = yaml_f.read()
+    header = '# sha256 %s version %s\n' % (hashlib.sha256(content).hexdigest(), TclDataVersion)
+    data_file = os.path.join(data_dir, '%s.%s.tcl' % (os.path.basename(yaml_file), kind))
+    try:
+        with open(data_file, 'r') as data_f:
+            if data_f.readline() == header:
+                return data_file
+    except OSError:
+        pass
+    try:
+        data = Compilers[kind](yaml_file, content.decode('utf-8').replace('\r\n', '\n').split('\n'))
+    except Exception as e:
+        logger.debug('%s is left to the Tcl parser: %s' % (yaml_file, e))
+        if os.path.exists(data_file):
+            os.remove(data_file)
+        return None
+    os.makedirs(data_dir, exist_ok=True)
+    tmp_file = '%s.%s' % (data_file, os.getpid())
+    with open(tmp_file, 'w') as data_f:
+        data_f.write(header)
+        data_f.write('set plnx_precompiled_file {%s}\n' % yaml_file)
+        data_f.write(data)
+    os.replace(tmp_file, data_file)
+    logger.debug('Precompiled %s into %s' % (yaml_file, data_file))
+    return data_file
+
+
+def PrecompileTclData(yaml_files, output):
+    '''Precompile the (yaml_file, kind) pairs and return the environment
+    pointing the Tcl scripts at them'''
+    data_dir = os.path.join(output, 'tcl-data')
+    for yaml_file, kind in yaml_files:
+        PrecompileYaml(yaml_file, kind, data_dir)
+    return {TclDataEnv: data_dir}
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import logging
+import os
+import threading
+
+import common_utils
+
+logger = logging.getLogger('Gen-Machineconf')
+
+# Number of concurrent tool runs, set from --jobs
+Jobs = None
+
+# Maximum number of concurrent runs of each tool class, None means the
+# job count. xsct and bitbake keep state in the output and build
+# directories so only one of them runs at a time.
+ToolClasses = {
+    'xsct': 1,
+    'bitbake': 1,
+    'lopper': None,
+    'default': None,
+}
+
+
+def GetJobs():
+    '''Job count from --jobs, GEN_MACHINECONF_JOBS or the cpu count'''
+    jobs = Jobs or os.environ.get('GEN_MACHINECONF_JOBS')
+    if not jobs:
+        return os.cpu_count() or 1
+    try:
+        jobs = int(jobs)
+    except ValueError:
+        raise Exception('Invalid number of jobs: %s' % jobs)
+    if jobs < 1:
+        raise Exception('Invalid number of jobs: %s' % jobs)
+    return jobs
+
+
+class ToolScheduler:
+    '''Run independent tool invocations concurrently.
+
+    Every task is a callable run in a worker thread, limited by the job
+    count and by the concurrency of its tool class. The first failure
+    cancels the tasks not started yet, kills the commands of the running
+    ones and is raised from run().'''
+
+    def __init__(self, jobs=None):
+        self.jobs = jobs or GetJobs()
+        self.tasks = []
+
+    def submit(self, func, *args, tool='default', name='', **kwargs):
+        if tool not in ToolClasses:
+            raise Exception('Unknown tool class: %s' % tool)
+        self.tasks.append((func, args, kwargs, tool,
+                           name or getattr(func, '__name__', 'task')))
+        return len(self.tasks) - 1
+
+    def run(self):
+        '''Run the submitted tasks and return their results in submit order'''
+        tasks, self.tasks = self.tasks, []
+        if not tasks:
+            return []
+        # Nothing can overlap, avoid the thread and event loop setup
+        if self.jobs == 1 or len(tasks) == 1:
+            return [func(*args, **kwargs) for func, args, kwargs, _, _ in tasks]
+        import asyncio
+        return asyncio.run(self._run(tasks))
+
+    async def _run(self, tasks):
+        import asyncio
+        import concurrent.futures
+        loop = asyncio.get_running_loop()
+        limit = asyncio.Semaphore(self.jobs)
+        classes = {tool: asyncio.Semaphore(count or self.jobs)
+                   for tool, count in ToolClasses.items()}
+        running = set()
+        running_lock = threading.Lock()
+
+        def call(func, args, kwargs):
+            with running_lock:
+                running.add(threading.get_ident())
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with running_lock:
+                    running.discard(threading.get_ident())
+
+        async def runtask(func, args, kwargs, tool, name):
+            async with classes[tool], limit:
+                logger.debug('Starting %s (%s)' % (name, tool))
+                return await loop.run_in_executor(executor, call, func, args, kwargs)
+
+        cancelled = set()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            futures = [asyncio.ensure_future(runtask(*task)) for task in tasks]
+            done, pending = await asyncio.wait(futures,
+                                               return_when=asyncio.FIRST_EXCEPTION)
+            failed = [future for future in futures
+                      if future in done and future.exception()]
+            if failed:
+                logger.debug('%s failed, cancelling %s task(s)' % (
+                    tasks[futures.index(failed[0])][4], len(pending)))
+                for future in pending:
+                    future.cancel()
+                with running_lock:
+                    cancelled = set(running)
+                common_utils.KillCmds(cancelled)
+                await asyncio.gather(*pending, return_exceptions=True)
+        # The executor waited for the killed tasks to return
+        common_utils.UncancelThreads(cancelled)
+        if failed:
+            raise failed[0].exception()
+        return [future.result() for future in futures]
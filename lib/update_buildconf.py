@@ -35,31 +35,114 @@ def SearchStrInFile(filename, string, remove_if_exists=False):
     return str_found
 
 
-def AddUserLayers(args):
-    bb_layers = []
-    proot = ''
-    builddir = ''
-    bitbake_layers = ''
-    system_conffile = os.path.join(args.output, 'config')
-
-    # Return if sysconf cannot be modified
-    try:
-        bitbake_layers = common_utils.check_tool('bitbake-layers')
-        builddir = os.environ.get('BUILDDIR')
-    except Exception:
-        pass
-
-    if not bitbake_layers or not builddir or not \
-            'UPDATE_USER_LAYERS' in os.environ.keys():
-        logger.debug(
-            'Skip adding layers as no bitbake-layers or builddir found')
+def UpdateIncludes(conf_file, include_strs):
+    '''Move the include_strs lines to the end of conf_file, in one write'''
+    if not include_strs:
         return
-    layers_list = '%s/conf/layerslist' % builddir
-    old_layers = []
-    if os.path.exists(layers_list):
-        with open(layers_list, 'r') as layers_list_f:
-            old_layers = layers_list_f.read().splitlines()
+    lines = ReadConfLines(conf_file)
+    new_lines = [line for line in lines if not any(
+        re.search(include_str, line.replace('\\', '').strip())
+        for include_str in include_strs)]
+    if new_lines and not new_lines[-1].endswith('\n'):
+        new_lines[-1] += '\n'
+    new_lines += ['%s\n' % include_str for include_str in include_strs]
+    if new_lines != lines:
+        WriteConfLines(conf_file, new_lines)
+
+
+def ReadConfLines(conf_file):
+    with open(conf_file, 'r') as conf_f:
+        return conf_f.readlines()
+
+
+def WriteConfLines(conf_file, lines):
+    '''Replace conf_file with lines in one rename'''
+    tmp_file = '%s.%s' % (conf_file, os.getpid())
+    with open(tmp_file, 'w') as conf_f:
+        conf_f.writelines(lines)
+    if os.path.exists(conf_file):
+        shutil.copymode(conf_file, tmp_file)
+    os.replace(tmp_file, conf_file)
+
+
+def CheckLayer(layer):
+    '''As bitbake-layers add-layer, a layer needs a conf/layer.conf'''
+    if not os.path.exists(os.path.join(layer, 'conf', 'layer.conf')):
+        raise Exception('Specified layer directory %s doesn\'t contain a '
+                        'conf/layer.conf file' % layer)
+
+
+def ConfValueTokens(line):
+    return line.replace('\\', ' ').replace('"', ' ').split()
+
+
+def RemoveBBLayers(lines, layers):
+    '''Drop the layers from the BBLAYERS lines'''
+    new_lines = []
+    for line in lines:
+        tokens = ConfValueTokens(line)
+        if not line.lstrip().startswith('#') and set(tokens).intersection(layers):
+            if not set(tokens).difference(layers):
+                # Only the layer is on this line
+                continue
+            for layer in layers:
+                line = re.sub(r'(?<![^\s"])%s(?=[\s"\\]|$)' % re.escape(layer), '', line)
+        new_lines.append(line)
+    return new_lines
+
+
+def AddBBLayers(lines, layers):
+    '''Append the layers to the first BBLAYERS assignment, the way
+    bitbake-layers add-layer edits bblayers.conf'''
+    start = None
+    for index, line in enumerate(lines):
+        if re.match(r'\s*BBLAYERS\s*\??\??=\s*"', line):
+            start = index
+            break
+    if start is None:
+        return lines + ['BBLAYERS += " %s "\n' % ' '.join(layers)]
 
+    # The line with the closing quote of the value
+    end = start
+    quotes = lines[start].count('"')
+    while quotes < 2 and end + 1 < len(lines):
+        end += 1
+        quotes += lines[end].count('"')
+    indent = '  '
+    for line in lines[start + 1:end]:
+        if line.strip():
+            indent = line[:len(line) - len(line.lstrip())]
+            break
+    new_entries = ['%s%s \\\n' % (indent, layer) for layer in layers]
+
+    closing = lines[end]
+    value, quote, rest = closing.rpartition('"')
+    if end > start and not value.strip():
+        # Closing quote on its own line
+        return lines[:end] + new_entries + lines[end:]
+    return lines[:end] + [value.rstrip() + ' \\\n'] + new_entries + \
+        ['%s"%s' % (indent, rest)] + lines[end + 1:]
+
+
+def UpdateBBLayersConf(bblayers_conf, add_layers, remove_layers):
+    '''Add and remove layers of bblayers.conf in one write'''
+    lines = ReadConfLines(bblayers_conf)
+    new_lines = RemoveBBLayers(lines, remove_layers) if remove_layers else lines
+    present = set()
+    for line in new_lines:
+        if not line.lstrip().startswith('#'):
+            present.update(os.path.abspath(token) for token in ConfValueTokens(line))
+    add_layers = [layer for layer in add_layers if layer not in present]
+    if add_layers:
+        new_lines = AddBBLayers(new_lines, add_layers)
+    if new_lines != lines:
+        WriteConfLines(bblayers_conf, new_lines)
+
+
+def GetUserLayers(args, system_conffile):
+    '''The meta-user layer of a PetaLinux project and the
+    CONFIG_USER_LAYER_<n> layers of the config'''
+    bb_layers = []
     proot = os.environ.get('PROOT')
     if proot and args.petalinux:
         bb_layers += os.path.join(proot, 'project-spec', 'meta-user').split()
@@ -75,28 +158,54 @@ def AddUserLayers(args):
             user_layer = user_layer.replace('${PROOT}', proot)
         bb_layers += user_layer.split()
         layer_cnt += 1
+    return bb_layers
+
+
+def AddUserLayers(args):
+    system_conffile = os.path.join(args.output, 'config')
 
-    # Get the layers which to be add
-    add_layers = list(set(bb_layers).difference(old_layers))
+    # Return if sysconf cannot be modified
+    builddir = os.environ.get('BUILDDIR')
+    if not builddir or not 'UPDATE_USER_LAYERS' in os.environ.keys():
+        logger.debug('Skip adding layers as no builddir found')
+        return
+    bblayers_conf = os.path.join(builddir, 'conf', 'bblayers.conf')
+    if not os.path.isfile(bblayers_conf):
+        logger.debug('Skip adding layers as no %s found' % bblayers_conf)
+        return
+    layers_list = '%s/conf/layerslist' % builddir
+    old_layers = []
+    if os.path.exists(layers_list):
+        with open(layers_list, 'r') as layers_list_f:
+            old_layers = layers_list_f.read().splitlines()
+
+    bb_layers = GetUserLayers(args, system_conffile)
+
+    # Get the layers which to be add, missing directories are skipped
+    add_layers = [layer for layer in bb_layers
+                  if layer not in old_layers and os.path.isdir(layer)]
+    add_layers = list(dict.fromkeys(add_layers))
     # Get the layers which to be removed
-    remove_layers = list(set(old_layers).difference(bb_layers))
+    remove_layers = [layer for layer in old_layers if layer not in bb_layers]
 
+    if not add_layers and not remove_layers:
+        return
     if add_layers:
         logger.info('Adding user layers')
-    with open(layers_list, 'a') as layers_list_f:
-        for layer in bb_layers:
-            if layer in add_layers and os.path.isdir(layer):
-                common_utils.Bitbake.shutdown()
-                logger.debug('Adding layer: %s' % layer)
-                command = 'bitbake-layers -F add-layer %s' % (layer)
-                common_utils.RunCmd(command, builddir, shell=True)
-                layers_list_f.write(layer + '\n')
-
+    for layer in add_layers:
+        CheckLayer(layer)
+        logger.debug('Adding layer: %s' % layer)
     for layer in remove_layers:
-        cmd = r'sed -i "\|%s|d"  "%s"' % (layer, layers_list)
-        common_utils.RunCmd(cmd, os.getcwd(), shell=True)
-        cmd = r'sed -i "\|%s|d"  "%s/conf/bblayers.conf"' % (layer, builddir)
-        common_utils.RunCmd(cmd, os.getcwd(), shell=True)
+        logger.debug('Removing layer: %s' % layer)
+
+    UpdateBBLayersConf(bblayers_conf, [os.path.abspath(layer) for layer in add_layers],
+                       remove_layers + [os.path.abspath(layer) for layer in remove_layers])
+    WriteConfLines(layers_list, ['%s\n' % layer for layer in old_layers
+                                 if layer not in remove_layers] +
+                   ['%s\n' % layer for layer in add_layers])
+    # The running bitbake has the old BBLAYERS
+    if common_utils.Bitbake:
+        common_utils.Bitbake.shutdown()
 
 
 def GenLocalConf(conf_file, machine_conf_file, system_conffile, petalinux):
@@ -153,8 +262,4 @@ def UpdateLocalConf(args, plnx_conf_file, machine_conf_file):
                 conf_dir = os.path.join(builddir, 'conf')
                 # Copy plnxtool.conf file to ${TOPDIR}/conf directory
                 localconf_strs += ['include conf/plnxtool.conf']
-            for file_str in localconf_strs:
-                SearchStrInFile(local_conf, file_str, remove_if_exists=True)
-                with open(local_conf, 'a') as local_conf_f:
-                    local_conf_f.write(file_str + '\n')
-                local_conf_f.close()
+            UpdateIncludes(local_conf, localconf_strs)
@@ -9,9 +9,112 @@
 # SPDX-License-Identifier: MIT
 
 import common_utils
+import logging
 import os
 import re
 import shutil
+import threading
+import time
+
+logger = logging.getLogger('Gen-Machineconf')
+
+# XILINX_INT_SITE is resolved in a background thread started with
+# StartNetworkProbe, the result is kept in the output directory for
+# GEN_MACHINECONF_NETWORK_TTL seconds, or GEN_MACHINECONF_NETWORK_NEGATIVE_TTL
+# when the site does not resolve. Timeouts and temporary resolver failures
+# are not kept. GEN_MACHINECONF_OFFLINE=1 skips the probe.
+ProbeThread = None
+ProbeStart = None
+ProbeResults = {}
+
+
+def OfflineEnabled():
+    return os.environ.get('GEN_MACHINECONF_OFFLINE', '0').lower() in ['1', 'yes', 'true']
+
+
+def EnvNumber(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        raise Exception('Invalid %s value: %s' % (name, os.environ[name]))
+
+
+def ProbeCacheFile(output):
+    return os.path.join(output, '.xilinx_network')
+
+
+def ReadProbeCache(output, site):
+    '''Cached reachability of site, None when unknown or expired'''
+    import json
+    try:
+        with open(ProbeCacheFile(output), 'r') as cache_f:
+            reachable, probe_time = json.load(cache_f)[site]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if reachable:
+        ttl = EnvNumber('GEN_MACHINECONF_NETWORK_TTL', 3600)
+    else:
+        ttl = EnvNumber('GEN_MACHINECONF_NETWORK_NEGATIVE_TTL', 300)
+    if time.time() - probe_time > ttl:
+        return None
+    return bool(reachable)
+
+
+def WriteProbeCache(output, site, reachable):
+    import json
+    try:
+        with open(ProbeCacheFile(output), 'w') as cache_f:
+            json.dump({site: [reachable, time.time()]}, cache_f)
+    except OSError as e:
+        logger.debug('Unable to write %s: %s' % (ProbeCacheFile(output), e))
+
+
+def ResolveSite(site):
+    import socket
+    try:
+        ProbeResults[site] = bool(socket.getaddrinfo(site, None))
+    except socket.gaierror as e:
+        # No result when the resolver may succeed on a retry
+        if e.errno != socket.EAI_AGAIN:
+            ProbeResults[site] = False
+    except (OSError, UnicodeError):
+        ProbeResults[site] = False
+
+
+def StartNetworkProbe(output):
+    '''Resolve XILINX_INT_SITE in the background, unless it is cached'''
+    global ProbeThread, ProbeStart
+    site = os.environ.get('XILINX_INT_SITE')
+    if ProbeThread or not site or OfflineEnabled():
+        return
+    if ReadProbeCache(output, site) is not None:
+        return
+    ProbeStart = time.monotonic()
+    ProbeThread = threading.Thread(target=ResolveSite, args=(site,),
+                                   name='xilinx-network-probe', daemon=True)
+    ProbeThread.start()
+
+
+def XilinxNetwork(output):
+    '''Whether XILINX_INT_SITE resolves, waiting for the probe at most
+    GEN_MACHINECONF_NETWORK_TIMEOUT seconds from its start'''
+    site = os.environ.get('XILINX_INT_SITE')
+    if not site or OfflineEnabled():
+        return False
+    reachable = ReadProbeCache(output, site)
+    if reachable is not None:
+        logger.debug('Using the cached reachability of %s: %s' % (site, reachable))
+        return reachable
+    StartNetworkProbe(output)
+    timeout = EnvNumber('GEN_MACHINECONF_NETWORK_TIMEOUT', 3)
+    ProbeThread.join(max(0, timeout - (time.monotonic() - ProbeStart)))
+    reachable = ProbeResults.get(site)
+    if reachable is None:
+        # Not cached, the next run probes again
+        logger.debug('No result resolving %s within %ss' % (site, timeout))
+        return False
+    WriteProbeCache(output, site, reachable)
+    return reachable
 
 
 def ExpandMirrors(mirror_url):
@@ -75,17 +178,8 @@ def GenerateSiteConf(args, arch, xilinx_network):
 
 
 def GenerateMirrors(args, arch):
-    nslookup_exe = common_utils.check_tool('nslookup')
     system_conffile = os.path.join(args.output, 'config')
-    if not nslookup_exe or not 'XILINX_INT_SITE' in os.environ.keys():
-        xilinx_network = False
-    else:
-        cmd = 'nslookup -timeout=10 %s | grep "Address" | \
-                awk \'{print $2}\' | sed -n 2p' % os.environ['XILINX_INT_SITE']
-        stdout, stderr = common_utils.RunCmd(cmd, args.output, shell=True)
-        xilinx_network = False
-        if stdout:
-            xilinx_network = True
+    xilinx_network = XilinxNetwork(args.output)
     mirrors_string = ''
     pre_mirror_url = common_utils.GetConfigValue(
         'CONFIG_PRE_MIRROR_URL', system_conffile)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Read the device and the processors of an XSA without xsct.
+#
+# An XSA is a zip archive, sysdef.xml names the hardware handoff (.hwh)
+# of the top block design, whose SYSTEMINFO carries the DEVICE and whose
+# MODULES are the cells of the design. The hwh is streamed from the zip
+# and parsed with iterparse, stopping as soon as the answer is known.
+#
+# Set GEN_MACHINECONF_XSA_INSPECT=0 to always ask xsct.
+
+import logging
+import os
+
+logger = logging.getLogger('Gen-Machineconf')
+
+# Processor IP_NAMEs get_soc_info looks for, see hw-description.tcl
+ProcIpNames = ['psx_cortexa78', 'psv_cortexa72', 'psu_cortexa53',
+               'ps7_cortexa9', 'microblaze']
+
+# Processing system blocks and the application processor HSI creates
+# for them
+PsProcessors = {
+    'zynq_ultra_ps_e': 'psu_cortexa53',
+    'processing_system7': 'ps7_cortexa9',
+    'versal_cips': 'psv_cortexa72',
+    'psx_wizard': 'psx_cortexa78',
+    'ps_wizard': 'cortexa78',
+}
+
+# Versal Net designs use versal_cips as well
+VersalNetArchs = ['versalnet']
+
+
+def InspectEnabled():
+    return os.environ.get('GEN_MACHINECONF_XSA_INSPECT', '1').lower() not in ['0', 'no', 'false']
+
+
+def LocalName(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def FindHwh(xsa_zip):
+    '''Name of the hwh of the top block design in the XSA'''
+    import xml.etree.ElementTree as ET
+    names = xsa_zip.namelist()
+    if 'sysdef.xml' in names:
+        with xsa_zip.open('sysdef.xml') as sysdef_f:
+            hwh_files = []
+            for event, elem in ET.iterparse(sysdef_f):
+                if LocalName(elem.tag) == 'File' and elem.get('Type') == 'HW_HANDOFF':
+                    if elem.get('BD_TYPE') == 'DEFAULT_BD':
+                        return elem.get('Name')
+                    hwh_files.append(elem.get('Name'))
+            if hwh_files:
+                return hwh_files[0]
+    hwh_files = [name for name in names if name.endswith('.hwh')]
+    if hwh_files:
+        return hwh_files[0]
+    return None
+
+
+def ParseHwh(hwh_f):
+    '''Device, architecture and processors of a hwh, the processing
+    system processor is reported before the soft processors'''
+    import xml.etree.ElementTree as ET
+    hw_info = {'device_id': '', 'arch': '', 'processors': []}
+    soft_procs = []
+    for event, elem in ET.iterparse(hwh_f, events=('start', 'end')):
+        tag = LocalName(elem.tag)
+        if event == 'end':
+            # Drop the parsed ports, parameters and memory maps
+            if tag == 'MODULE':
+                elem.clear()
+        elif tag == 'SYSTEMINFO':
+            hw_info['device_id'] = elem.get('DEVICE', '')
+            hw_info['arch'] = elem.get('ARCH', '')
+        elif tag == 'MODULE':
+            modtype = elem.get('MODTYPE', '')
+            instance = elem.get('INSTANCE', '')
+            if modtype in PsProcessors:
+                proc_name = PsProcessors[modtype]
+                if modtype == 'versal_cips' and hw_info['arch'] in VersalNetArchs:
+                    proc_name = 'psx_cortexa78'
+                hw_info['processors'].append((instance, proc_name))
+                # The processing system decides the soc family
+                break
+            if modtype in ProcIpNames:
+                soft_procs.append((instance, modtype))
+    hw_info['processors'] += soft_procs
+    return hw_info
+
+
+def InspectXsa(hw_file):
+    '''{'device_id', 'arch', 'processors': [(instance, ip_name)],
+    'proc_type'} of an XSA, None when it can not be read without xsct'''
+    if not InspectEnabled():
+        return None
+    import zipfile
+    try:
+        with zipfile.ZipFile(hw_file) as xsa_zip:
+            hwh_file = FindHwh(xsa_zip)
+            if not hwh_file:
+                logger.debug('No hwh found in %s' % hw_file)
+                return None
+            with xsa_zip.open(hwh_file) as hwh_f:
+                hw_info = ParseHwh(hwh_f)
+    except Exception as e:
+        logger.debug('Unable to inspect %s: %s' % (hw_file, e))
+        return None
+    if not hw_info['processors']:
+        logger.debug('No processor found in %s' % hw_file)
+        return None
+    hw_info['proc_type'] = hw_info['processors'][0][1]
+    logger.debug('%s: device %s, processors %s' % (
+        hw_file, hw_info['device_id'],
+        ', '.join('%s (%s)' % proc for proc in hw_info['processors'])))
+    return hw_info
@@ -12,7 +12,6 @@ import os
 import re
 import common_utils
 import project_config
-import glob
 from post_process_config import CheckIP, GetIPProperty
 import logging
 
@@ -582,14 +581,14 @@ def YoctoSdtConfigs(args, arch, dtg_machine, system_conffile, req_conf_file, Mul
 
     if args.soc_family in ('versal', 'versal-2ve-2vm'):
         if os.path.isdir(args.pl):
-            pdis = glob.glob(os.path.join(args.pl, '*.pdi'))
+            pdis = common_utils.GetHwFiles(args.pl, 'pdi', recursive=False)
             if not pdis:
                 raise Exception('Unable to find a pdi file in %s, \
                         use the -p/--pl option to point to the directory containing a .pdi file' % args.pl)
             elif len(pdis) > 1:
                 # To handle the segmented flow where we will have *_boot.pdi and
                 # *_pld.pdi and picking up *_boot.pdi for base boot.
-                seg_pdis = glob.glob(os.path.join(args.pl, '*_boot.pdi'))
+                seg_pdis = common_utils.GetHwFiles(args.pl, 'boot_pdi', recursive=False)
                 if seg_pdis:
                     logger.warning(
                         'Multiple PDI files found, using *_boot.pdi for segmented configuration %s', seg_pdis[0])
@@ -615,7 +614,7 @@ def YoctoSdtConfigs(args, arch, dtg_machine, system_conffile, req_conf_file, Mul
 
     if args.soc_family in ['zynqmp', 'zynq'] and not args.gen_pl_overlay:
         if os.path.isdir(args.pl):
-            bit = glob.glob(os.path.join(args.pl, '*.bit'))
+            bit = common_utils.GetHwFiles(args.pl, 'bit', recursive=False)
             if not bit:
                 logger.warning('Unable to find a bit file in %s, \
                         use the -p/--pl option to point to the directory containing a .bit file' % args.pl)
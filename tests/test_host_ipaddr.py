@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# FindIpAddr on static interface tables, the cases handled by
+# gen-machine-scripts/petalinux-find-ipaddr.
+#
+#   python3 -m unittest discover -s tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.realpath(__file__))), 'lib'))
+
+import host_ipaddr
+from host_ipaddr import FindIpAddr, StaticInterfaceTable
+
+Interfaces = {
+    'eth0': ('down', '10.0.0.1'),
+    'eth1': ('up', '10.0.0.2'),
+    'eth2': ('up', None),
+    'lo': ('unknown', '127.0.0.1'),
+    'wlan0': ('up', '192.168.1.20'),
+}
+
+
+class FindIpAddrTest(unittest.TestCase):
+    def test_auto(self):
+        table = StaticInterfaceTable(Interfaces)
+        self.assertEqual(FindIpAddr('AUTO', table), '10.0.0.2')
+        self.assertEqual(FindIpAddr('auto', table), '10.0.0.2')
+        self.assertEqual(FindIpAddr('', table), '10.0.0.2')
+
+    def test_auto_interface(self):
+        table = StaticInterfaceTable(Interfaces)
+        self.assertEqual(FindIpAddr('AUTO:wlan0', table), '192.168.1.20')
+        self.assertEqual(FindIpAddr('AUTO:eth0', table), '10.0.0.1')
+        # No address on the interface, the spec is kept
+        self.assertEqual(FindIpAddr('AUTO:eth2', table), 'AUTO:eth2')
+
+    def test_missing_interface(self):
+        table = StaticInterfaceTable(Interfaces)
+        with self.assertLogs('Gen-Machineconf', 'WARNING') as logs:
+            self.assertEqual(FindIpAddr('AUTO:eth9', table), '10.0.0.2')
+        self.assertIn('eth9 does not exist', logs.output[0])
+
+    def test_loopback_only(self):
+        table = StaticInterfaceTable({'lo': ('up', '127.0.0.1')})
+        self.assertEqual(FindIpAddr('AUTO', table), '127.0.0.1')
+
+    def test_no_interfaces(self):
+        table = StaticInterfaceTable({})
+        self.assertEqual(FindIpAddr('AUTO', table), 'AUTO')
+        with self.assertLogs('Gen-Machineconf', 'WARNING'):
+            self.assertEqual(FindIpAddr('AUTO:eth0', table), 'AUTO:eth0')
+
+    def test_static_address(self):
+        table = StaticInterfaceTable(Interfaces)
+        self.assertEqual(FindIpAddr('192.168.0.10', table), '192.168.0.10')
+
+    def test_not_memoized(self):
+        host_ipaddr.IpAddrs.clear()
+        FindIpAddr('AUTO', StaticInterfaceTable(Interfaces))
+        self.assertEqual(host_ipaddr.IpAddrs, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
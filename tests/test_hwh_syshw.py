@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# The hwh plnx_syshw_data engine on the sample designs in tests/data,
+# each <design>.hwh is packed into an XSA and its output is checked
+# against <design>.expected_syshw_data. The expected data is the reviewed
+# engine output, not plnx_gen_hwsysconf output: the sample hwh has no
+# bitstream or the rest of an XSA, which HSI needs to open it.
+#
+# Parity with plnx_gen_hwsysconf is checked on real XSAs with xsct in
+# the PATH, listed in GEN_MACHINECONF_PARITY_XSA (separated by ':').
+#
+#   python3 -m unittest discover -s tests
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import zipfile
+
+TestsDir = os.path.dirname(os.path.realpath(__file__))
+TopDir = os.path.dirname(TestsDir)
+DataDir = os.path.join(TestsDir, 'data')
+ScriptsDir = os.path.join(TopDir, 'gen-machine-scripts')
+IpInfoFile = os.path.join(ScriptsDir, 'data', 'ipinfo.yaml')
+sys.path.insert(0, os.path.join(TopDir, 'lib'))
+
+import hwh_syshw
+
+Designs = ['mb_design']
+ParityXsas = [xsa for xsa in os.environ.get('GEN_MACHINECONF_PARITY_XSA', '').split(':') if xsa]
+
+SysDef = '''<?xml version="1.0" encoding="UTF-8"?>
+<Project Name="%s">
+  <File BD_TYPE="DEFAULT_BD" Name="%s.hwh" Type="HW_HANDOFF"/>
+</Project>
+'''
+
+PsModule = '''
+    <MODULE FULLNAME="/zynq_ultra_ps_e_0" INSTANCE="zynq_ultra_ps_e_0" MODTYPE="zynq_ultra_ps_e"
+            VLNV="xilinx.com:ip:zynq_ultra_ps_e:3.5">
+      <PARAMETERS/>
+    </MODULE>
+  </MODULES>'''
+
+
+def MakeXsa(design, outdir, hwh_data=None):
+    '''XSA with the sample hwh of design as its top block design'''
+    if hwh_data is None:
+        with open(os.path.join(DataDir, '%s.hwh' % design), 'r') as hwh_f:
+            hwh_data = hwh_f.read()
+    xsa_file = os.path.join(outdir, '%s.xsa' % design)
+    with zipfile.ZipFile(xsa_file, 'w') as xsa_zip:
+        xsa_zip.writestr('sysdef.xml', SysDef % (design, design))
+        xsa_zip.writestr('%s.hwh' % design, hwh_data)
+    return xsa_file
+
+
+class HwhSysHwEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_expected_output(self):
+        for design in Designs:
+            with self.subTest(design=design):
+                diff = hwh_syshw.ParityDiff(
+                    MakeXsa(design, self.tmpdir), IpInfoFile,
+                    os.path.join(DataDir, '%s.expected_syshw_data' % design))
+                self.assertEqual(diff, [], '\n'.join(diff or []))
+
+    @unittest.skipUnless(shutil.which('xsct') and ParityXsas, 'xsct or GEN_MACHINECONF_PARITY_XSA not set')
+    def test_xsct_parity(self):
+        for xsa_file in ParityXsas:
+            with self.subTest(xsa=xsa_file):
+                outdir = tempfile.mkdtemp(dir=self.tmpdir)
+                subprocess.run(['xsct', '-sdx', '-nodisp',
+                                os.path.join(ScriptsDir, 'hw-description.tcl'),
+                                'plnx_gen_hwsysconf', os.path.abspath(xsa_file)],
+                               cwd=outdir, check=True)
+                diff = hwh_syshw.ParityDiff(xsa_file, IpInfoFile,
+                                            os.path.join(outdir, 'plnx_syshw_data'))
+                if diff is None:
+                    self.skipTest('%s is not supported by the hwh engine' % xsa_file)
+                self.assertEqual(diff, [], '\n'.join(diff))
+
+    def test_ps_design(self):
+        with open(os.path.join(DataDir, 'mb_design.hwh'), 'r') as hwh_f:
+            hwh_data = hwh_f.read().replace('\n  </MODULES>', PsModule)
+        self.assertIsNone(hwh_syshw.GenSysHwData(
+            MakeXsa('ps_design', self.tmpdir, hwh_data), IpInfoFile))
+
+
+if __name__ == '__main__':
+    unittest.main()